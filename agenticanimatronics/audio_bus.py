@@ -0,0 +1,308 @@
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Iterable, Optional
+
+import numpy as np
+from loguru import logger
+
+DROP_OLDEST = "drop_oldest"
+BLOCK = "block"
+
+# Header layout (int64 words) shared by the in-process bus and shared memory readers
+_WRITE_SEQ = 0
+_SLOTS = 1
+_SLOT_BYTES = 2
+_CLOSED = 3
+_LENGTHS = 4
+
+
+def _header_words(slots: int) -> int:
+    return _LENGTHS + slots
+
+
+class Subscription:
+    def __init__(self, bus: "AudioBus", policy: str, name: str):
+        """
+        One consumer's view of an AudioBus. Created with AudioBus.subscribe.
+
+        Chunks are returned as memoryviews into the bus's ring, so nothing is copied per
+        consumer. For BLOCK subscribers a view stays valid at least until the next read. A
+        DROP_OLDEST subscriber that falls a full ring behind can have views overwritten under
+        it, so call bytes() on a chunk that needs to be kept.
+        """
+        self.bus = bus
+        self.policy = policy
+        self.name = name
+        self.cursor = bus.write_seq
+        self.dropped = 0
+        self.closed = False
+
+    @property
+    def lag(self) -> int:
+        """Number of chunks published but not yet read by this subscriber"""
+        return self.bus.write_seq - self.cursor
+
+    def read(self, timeout: Optional[float] = None) -> Optional[memoryview]:
+        """
+        Returns the next chunk, waiting up to `timeout` seconds (forever if None).
+
+        Returns:
+            The chunk, or None if the timeout expired or the bus closed with nothing left to read.
+        """
+        bus = self.bus
+        with bus.condition:
+            if not bus.condition.wait_for(
+                    lambda: self.cursor < bus.write_seq or bus.closed or self.closed, timeout):
+                return None
+            if self.closed or self.cursor >= bus.write_seq:
+                return None
+
+            if self.policy == DROP_OLDEST and self.lag >= bus.slots:
+                # Skip ahead to the oldest chunk that is guaranteed not to be overwritten
+                skipped = self.lag - (bus.slots - 1)
+                self.dropped += skipped
+                self.cursor += skipped
+
+            view = bus.chunk_view(self.cursor)
+            self.cursor += 1
+            bus.condition.notify_all()
+        return view
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        chunk = self.read()
+        if chunk is None:
+            raise StopIteration
+        return chunk
+
+    def close(self):
+        """Stops this subscription and releases any publisher waiting on it"""
+        self.bus.unsubscribe(self)
+
+
+class AudioBus:
+    def __init__(
+            self,
+            source: Optional[Iterable[bytes]] = None,
+            slot_bytes: int = 1600,
+            slots: int = 64,
+            use_shared_memory: bool = False,
+            shared_memory_name: Optional[str] = None,
+    ):
+        """
+        Captures audio once and fans it out to any number of subscribers. Each chunk is copied
+        once into a fixed ring of slots; every subscriber gets its own read cursor and either
+        drops its oldest unread audio when it falls behind or makes the publisher wait.
+
+        Args:
+            source: Iterable of audio chunks to publish when the bus is started, e.g. a
+                MutableMicrophoneStream.
+            slot_bytes: Size of each slot. Larger chunks are split across slots.
+            slots: Number of slots in the ring.
+            use_shared_memory: Back the ring with multiprocessing.shared_memory so other processes
+                can read it with SharedAudioReader without pickling audio.
+            shared_memory_name: Name for the shared memory block. Generated if not given.
+        """
+        self.source = source
+        self.slot_bytes = slot_bytes
+        self.slots = slots
+        self.condition = threading.Condition()
+        self.closed = False
+        self.write_seq = 0
+        self._subscribers: list[Subscription] = []
+        self._thread = None
+
+        header_bytes = _header_words(slots) * 8
+        size = header_bytes + slots * slot_bytes
+        if use_shared_memory:
+            self._shared_memory = shared_memory.SharedMemory(create=True, size=size, name=shared_memory_name)
+            self._buffer = self._shared_memory.buf
+            logger.info(f"🔊 Audio bus shared memory: {self._shared_memory.name}")
+        else:
+            self._shared_memory = None
+            self._buffer = memoryview(bytearray(size))
+
+        self._header = np.ndarray((_header_words(slots),), dtype=np.int64, buffer=self._buffer[:header_bytes])
+        self._header[:] = 0
+        self._header[_SLOTS] = slots
+        self._header[_SLOT_BYTES] = slot_bytes
+        self._slot_views = [
+            self._buffer[header_bytes + i * slot_bytes:header_bytes + (i + 1) * slot_bytes]
+            for i in range(slots)
+        ]
+
+    @property
+    def shared_memory_name(self) -> Optional[str]:
+        """Name other processes pass to SharedAudioReader, or None without shared memory"""
+        return self._shared_memory.name if self._shared_memory else None
+
+    def subscribe(self, policy: str = DROP_OLDEST, name: str = "") -> Subscription:
+        """
+        Adds a subscriber that starts reading from the next published chunk.
+
+        Args:
+            policy: DROP_OLDEST to skip audio when this subscriber falls behind, or BLOCK to
+                hold the publisher back until it catches up.
+            name: Label used in logs.
+        """
+        if policy not in (DROP_OLDEST, BLOCK):
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+        with self.condition:
+            subscription = Subscription(self, policy, name)
+            self._subscribers.append(subscription)
+        logger.debug(f"🔊 Audio bus subscriber added: {name or policy}")
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Removes a subscriber"""
+        with self.condition:
+            subscription.closed = True
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+            self.condition.notify_all()
+
+    def chunk_view(self, seq: int) -> memoryview:
+        """Returns the chunk stored for a sequence number"""
+        index = seq % self.slots
+        return self._slot_views[index][:int(self._header[_LENGTHS + index])]
+
+    def _has_room(self) -> bool:
+        # Blocking subscribers keep one slot spare so the chunk they last read stays intact
+        return self.closed or all(
+            s.policy != BLOCK or self.write_seq - s.cursor < self.slots - 1
+            for s in self._subscribers
+        )
+
+    def publish(self, chunk: bytes):
+        """
+        Copies a chunk into the ring and wakes up subscribers. Blocks while any BLOCK
+        subscriber is a full ring behind.
+        """
+        for start in range(0, len(chunk), self.slot_bytes):
+            part = chunk[start:start + self.slot_bytes]
+            with self.condition:
+                self.condition.wait_for(self._has_room)
+                if self.closed:
+                    return
+                index = self.write_seq % self.slots
+                self._slot_views[index][:len(part)] = part
+                self._header[_LENGTHS + index] = len(part)
+                self.write_seq += 1
+                self._header[_WRITE_SEQ] = self.write_seq
+                self.condition.notify_all()
+
+    def run(self):
+        """Publishes chunks from the source until it is exhausted or the bus is closed"""
+        try:
+            for chunk in self.source:
+                if self.closed:
+                    break
+                self.publish(chunk)
+        except Exception:
+            logger.exception("Error reading from audio bus source")
+        finally:
+            self.close()
+
+    def start(self):
+        """Starts publishing the source on a background thread"""
+        if self.source is None:
+            raise ValueError("AudioBus needs a source to start")
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stops the bus. Subscribers read what is left and then end."""
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            self._header[_CLOSED] = 1
+            self.condition.notify_all()
+
+        for subscription in list(self._subscribers):
+            if subscription.dropped:
+                logger.info(f"🔊 Audio bus subscriber {subscription.name or subscription.policy} "
+                            f"dropped {subscription.dropped} chunks")
+
+    def release(self):
+        """Closes the bus and frees its shared memory block"""
+        self.close()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+        if self._shared_memory:
+            # Views into the block must be released before it can be closed
+            self._slot_views = []
+            self._header = None
+            self._buffer = None
+            self._shared_memory.close()
+            self._shared_memory.unlink()
+            self._shared_memory = None
+
+
+class SharedAudioReader:
+    def __init__(self, name: str, poll_interval: float = 0.005):
+        """
+        Reads an AudioBus ring from another process through shared memory. Remote readers
+        always drop their oldest audio when they fall behind, since they cannot hold the
+        publisher back.
+
+        Args:
+            name: The bus's shared_memory_name.
+            poll_interval: How often to check for new audio while waiting.
+        """
+        self._shared_memory = shared_memory.SharedMemory(name=name)
+        buffer = self._shared_memory.buf
+        words = np.ndarray((_LENGTHS,), dtype=np.int64, buffer=buffer[:_LENGTHS * 8])
+        self.slots = int(words[_SLOTS])
+        self.slot_bytes = int(words[_SLOT_BYTES])
+        header_bytes = _header_words(self.slots) * 8
+        self._header = np.ndarray((_header_words(self.slots),), dtype=np.int64, buffer=buffer[:header_bytes])
+        self._buffer = buffer
+        self._header_bytes = header_bytes
+        self.poll_interval = poll_interval
+        self.cursor = int(self._header[_WRITE_SEQ])
+        self.dropped = 0
+
+    def read(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Returns a copy of the next chunk, or None on timeout or once the bus has closed.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while int(self._header[_WRITE_SEQ]) <= self.cursor:
+            if self._header[_CLOSED] or (deadline is not None and time.monotonic() >= deadline):
+                return None
+            time.sleep(self.poll_interval)
+
+        while True:
+            write_seq = int(self._header[_WRITE_SEQ])
+            if write_seq - self.cursor >= self.slots:
+                skipped = write_seq - self.cursor - (self.slots - 1)
+                self.dropped += skipped
+                self.cursor += skipped
+
+            index = self.cursor % self.slots
+            start = self._header_bytes + index * self.slot_bytes
+            chunk = bytes(self._buffer[start:start + int(self._header[_LENGTHS + index])])
+
+            # If the publisher lapped us while copying, the chunk may be torn - try again
+            if int(self._header[_WRITE_SEQ]) - self.cursor < self.slots:
+                self.cursor += 1
+                return chunk
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        chunk = self.read()
+        if chunk is None:
+            raise StopIteration
+        return chunk
+
+    def close(self):
+        """Detaches from the shared memory block"""
+        self._header = None
+        self._buffer = None
+        self._shared_memory.close()
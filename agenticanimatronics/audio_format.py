@@ -0,0 +1,96 @@
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+# Raw PCM rates ElevenLabs can stream
+PCM_RATES = (8000, 16000, 22050, 24000, 44100, 48000)
+
+
+def parse_output_format(output_format: str) -> tuple[str, int]:
+    """
+    Splits an ElevenLabs output format such as "pcm_24000" or "mp3_22050_32" into its codec and
+    sample rate.
+    """
+    parts = output_format.split("_")
+    if len(parts) < 2 or not parts[1].isdigit():
+        raise ValueError(f"Unrecognised output format '{output_format}'")
+    codec, rate = parts[0], int(parts[1])
+    if codec == "pcm" and rate not in PCM_RATES:
+        raise ValueError(f"PCM output must be one of {PCM_RATES} Hz, not {rate}")
+    return codec, rate
+
+
+class StreamingResampler:
+    def __init__(self, in_rate: int, out_rate: int, taps: int = 31):
+        """
+        Resamples a stream of 16-bit mono PCM chunk by chunk, carrying the interpolation phase
+        and filter history across chunks so there are no clicks at chunk boundaries.
+
+        Samples are linearly interpolated with numpy in one pass per chunk. When downsampling,
+        a windowed-sinc low-pass filter runs first so frequencies above the new Nyquist rate
+        do not alias.
+
+        Args:
+            in_rate: Sample rate of the incoming audio.
+            out_rate: Sample rate to produce.
+            taps: Length of the anti-aliasing filter.
+        """
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.step = in_rate / out_rate
+
+        self._taps = None
+        if out_rate < in_rate:
+            cutoff = 0.5 * out_rate / in_rate
+            n = np.arange(taps) - (taps - 1) / 2
+            kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+            self._taps = (kernel / kernel.sum()).astype(np.float32)
+            self._history = np.zeros(taps - 1, dtype=np.float32)
+
+        self._carry = b""
+        self._prev: Optional[np.float32] = None
+        self._t = 0.0
+
+    def _filter(self, samples: np.ndarray) -> np.ndarray:
+        padded = np.concatenate((self._history, samples))
+        self._history = padded[-(self._taps.size - 1):]
+        return np.convolve(padded, self._taps, mode="valid").astype(np.float32, copy=False)
+
+    def process(self, data: bytes) -> bytes:
+        """Resamples a chunk. Chunks may split samples; the odd byte is kept for the next chunk."""
+        data = self._carry + bytes(data)
+        usable = len(data) - len(data) % 2
+        self._carry = data[usable:]
+        if not usable:
+            return b""
+
+        samples = np.frombuffer(data[:usable], dtype=np.int16).astype(np.float32)
+        if self.in_rate == self.out_rate:
+            return data[:usable]
+        if self._taps is not None:
+            samples = self._filter(samples)
+
+        # x[0] is the last sample of the previous chunk, so interpolation spans the boundary
+        x = samples if self._prev is None else np.concatenate(([self._prev], samples))
+        end = x.size - 1
+        if self._t > end:
+            # Too short to reach the next output sample
+            self._t -= end
+            self._prev = x[-1]
+            return b""
+
+        count = int((end - self._t) // self.step) + 1
+        times = self._t + self.step * np.arange(count)
+        out = np.interp(times, np.arange(x.size), x)
+
+        # Position of the next output sample, relative to this chunk's last sample
+        self._t = times[-1] + self.step - end
+        self._prev = x[-1]
+        return np.clip(np.round(out), -32768, 32767).astype(np.int16).tobytes()
+
+    def stream(self, audio: Iterable[bytes]) -> Iterator[bytes]:
+        """Resamples every chunk of a stream"""
+        for chunk in audio:
+            out = self.process(chunk)
+            if out:
+                yield out
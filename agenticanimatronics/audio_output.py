@@ -0,0 +1,390 @@
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+import pyaudio
+from loguru import logger
+
+from agenticanimatronics.jitter_buffer import JitterBuffer
+from agenticanimatronics.ring_buffer import SPSCRingBuffer
+
+
+class Voice:
+    def __init__(
+            self,
+            name: str,
+            capacity_bytes: int,
+            gain: float = 1.0,
+            ducks_others: bool = False,
+            prebuffer_bytes: int = 0,
+            fade_in_blocks: int = 0,
+            on_start: Optional[Callable[[], None]] = None,
+    ):
+        """
+        One sound playing through an AudioOutputEngine. Created with AudioOutputEngine.play or
+        play_pcm. A producer thread writes 16-bit mono PCM at the engine rate, and the mixer
+        reads it out block by block.
+
+        Args:
+            name: Label used in logs.
+            capacity_bytes: How much audio can be buffered ahead of playback. Writes wait for
+                room rather than dropping audio.
+            gain: Volume multiplier.
+            ducks_others: Lower the volume of every other voice while this one plays.
+            prebuffer_bytes: Audio to buffer before playing, and again after running dry, so a
+                bursty stream plays smoothly instead of stuttering.
+            fade_in_blocks: Number of mixer blocks to fade in over, for crossfading.
+            on_start: Called from the mixer thread when the voice's first audio plays. Must be quick.
+        """
+        self.name = name
+        self.gain = gain
+        self.ducks_others = ducks_others
+        self.done = threading.Event()
+        self.played_bytes = 0
+        self.underruns = 0
+        self.prebuffer_bytes = prebuffer_bytes
+        self.created_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.on_start = on_start
+
+        self._ring = SPSCRingBuffer(capacity_bytes)
+        self._space = threading.Event()
+        self._finished = False
+        self._stopped = False
+        self._fade_gain = 0.0 if fade_in_blocks else 1.0
+        self._fade_target = 1.0
+        self._fade_step = 1.0 / fade_in_blocks if fade_in_blocks else 0.0
+        self._buffering = prebuffer_bytes > 0
+
+    @property
+    def is_playing(self) -> bool:
+        """Whether the voice still has audio to play"""
+        return not self.done.is_set()
+
+    def write(self, data: bytes) -> bool:
+        """
+        Queues audio for playback, waiting while the voice's buffer is full.
+
+        Returns:
+            False if the voice was stopped before all of the audio was queued.
+        """
+        view = memoryview(data)
+        piece = max(1, self._ring.capacity // 2)
+        for start in range(0, len(view), piece):
+            part = view[start:start + piece]
+            while self._ring.free() < len(part):
+                if self._stopped or self.done.is_set():
+                    return False
+                self._space.clear()
+                if self._ring.free() < len(part):
+                    self._space.wait(0.05)
+            if self._stopped:
+                return False
+            self._ring.write(part)
+        return not self._stopped
+
+    def finish(self):
+        """Marks the end of the audio, so the voice ends once its buffer has played out"""
+        self._finished = True
+
+    def stop(self, fade_ms: float = 30, block_ms: float = 20):
+        """Fades the voice out and ends it, discarding anything not yet played"""
+        self._stopped = True
+        self._fade_target = 0.0
+        self._fade_step = max(self._fade_gain, 1e-3) * block_ms / max(fade_ms, block_ms)
+        self._space.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Waits for the voice to finish playing. Returns False on timeout."""
+        return self.done.wait(timeout)
+
+    def _pull(self, out: np.ndarray) -> int:
+        """Copies up to len(out) samples into out and returns how many were copied"""
+        finished = self._finished or self._stopped
+        if self._buffering:
+            if self._ring.available() < self.prebuffer_bytes and not finished:
+                return 0
+            self._buffering = False
+
+        available = min(self._ring.available() // 2, out.size)
+        if available:
+            samples = np.frombuffer(self._ring.read(available * 2, timeout=0), dtype=np.int16)
+            out[:available] = samples
+            if self.started_at is None:
+                self.started_at = time.monotonic()
+                if self.on_start:
+                    self.on_start()
+            self.played_bytes += available * 2
+            self._space.set()
+        if available < out.size and self.played_bytes and not finished:
+            # Playback has started but the producer fell behind, so build the buffer back up
+            self.underruns += 1
+            self._buffering = self.prebuffer_bytes > 0
+        return available
+
+    def _end(self):
+        self._ring.clear()
+        self.done.set()
+        self._space.set()
+
+
+class AudioOutputEngine:
+    def __init__(
+            self,
+            sample_rate: int = 16_000,
+            block_ms: int = 20,
+            device_index: Optional[int] = None,
+            duck_gain: float = 0.3,
+            duck_ms: float = 150,
+            buffer_seconds: float = 10.0,
+    ):
+        """
+        Single in-process audio output. One output stream is opened on the device, and a mixer
+        thread adds up every playing voice (speech, idle clips, effects) block by block, so
+        sounds can overlap without separate players fighting over the device.
+
+        While a voice that ducks others is playing (the pirate's speech), every other voice is
+        smoothly lowered to `duck_gain`.
+
+        Args:
+            sample_rate: Rate of the output stream. All audio played must be 16-bit mono at this rate.
+            block_ms: Size of each mixed block. Smaller blocks mean lower latency.
+            device_index: Output device, or None for the default.
+            duck_gain: Volume of other voices while speech is playing.
+            duck_ms: How long ducking takes to fade in and out.
+            buffer_seconds: How much audio each streaming voice can buffer ahead.
+        """
+        self.sample_rate = sample_rate
+        self.block_ms = block_ms
+        self.block_size = int(sample_rate * block_ms / 1000)
+        self.device_index = device_index
+        self.duck_gain = duck_gain
+        self.duck_step = min(1.0, block_ms / duck_ms) if duck_ms else 1.0
+        self.buffer_bytes = int(sample_rate * buffer_seconds) * 2
+
+        self._voices: list[Voice] = []
+        self._taps: list[SPSCRingBuffer] = []
+        self._voices_lock = threading.Lock()
+        self._duck = 1.0
+        self._running = False
+        self._thread = None
+        self._audio = None
+        self._stream = None
+
+        # Preallocated mixing buffers
+        self._mix = np.zeros(self.block_size, dtype=np.float32)
+        self._samples = np.zeros(self.block_size, dtype=np.int16)
+        self._envelope = np.zeros(self.block_size, dtype=np.float32)
+        self._ramp = np.arange(self.block_size, dtype=np.float32) / self.block_size
+        self._out = np.zeros(self.block_size, dtype=np.int16)
+
+        self.blocks_played = 0
+        # Playback clock: when the last block with any sound in it will have left the speaker
+        self.output_latency = 0.0
+        self.playing_until = 0.0
+
+    def start(self):
+        """Opens the output device and starts the mixer thread"""
+        self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=self.sample_rate,
+            output=True,
+            output_device_index=self.device_index,
+            frames_per_buffer=self.block_size,
+        )
+        try:
+            self.output_latency = float(self._stream.get_output_latency())
+        except Exception:
+            logger.warning("Could not read the output latency - the playback clock may run early")
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logger.info(f"🔊 Audio output started at {self.sample_rate} Hz")
+
+    def reference_tap(self, seconds: float = 1.0) -> SPSCRingBuffer:
+        """
+        Returns a ring buffer that receives a copy of every block sent to the device, e.g. as the
+        reference signal for echo cancellation. The mixer drops blocks rather than wait if the
+        reader falls behind.
+        """
+        tap = SPSCRingBuffer(int(self.sample_rate * seconds) * 2)
+        self._taps.append(tap)
+        return tap
+
+    def _add(self, voice: Voice) -> Voice:
+        with self._voices_lock:
+            self._voices.append(voice)
+        return voice
+
+    def play(
+            self,
+            name: str = "speech",
+            gain: float = 1.0,
+            ducks_others: bool = True,
+            prebuffer_bytes: int = 0,
+            fade_in_ms: float = 0,
+            on_start: Optional[Callable[[], None]] = None,
+    ) -> Voice:
+        """
+        Adds a streaming voice. Write PCM to it with Voice.write and call Voice.finish at the end.
+        """
+        return self._add(Voice(
+            name, self.buffer_bytes, gain, ducks_others, prebuffer_bytes,
+            self._fade_blocks(fade_in_ms), on_start,
+        ))
+
+    def _fade_blocks(self, fade_ms: float) -> int:
+        return int(round(fade_ms / self.block_ms)) if fade_ms > 0 else 0
+
+    def play_stream(
+            self,
+            audio: Iterable[bytes],
+            name: str = "speech",
+            gain: float = 1.0,
+            ducks_others: bool = True,
+            wait: bool = True,
+            jitter_buffer: Optional[JitterBuffer] = None,
+            fade_in_ms: float = 0,
+            on_start: Optional[Callable[[], None]] = None,
+    ) -> Voice:
+        """
+        Plays a stream of PCM chunks, e.g. from a TTS service, as they arrive. Runs on the
+        calling thread until every chunk has been queued, and until playback ends if `wait`.
+
+        With a jitter buffer, playback starts once enough audio has arrived to cover the
+        stream's usual gaps, and chunk arrival times are fed back into it.
+        """
+        prebuffer_bytes = 0
+        if jitter_buffer:
+            jitter_buffer.start_turn()
+            prebuffer_bytes = jitter_buffer.target_bytes
+        voice = self.play(name, gain, ducks_others, prebuffer_bytes, fade_in_ms, on_start)
+        try:
+            for chunk in audio:
+                if jitter_buffer:
+                    jitter_buffer.arrival()
+                if not voice.write(chunk):
+                    break
+        finally:
+            voice.finish()
+        if wait:
+            voice.wait()
+            if jitter_buffer:
+                start_delay = None if voice.started_at is None else 1000 * (voice.started_at - voice.created_at)
+                jitter_buffer.end_turn(1000 * prebuffer_bytes / (2 * self.sample_rate), voice.underruns, start_delay)
+        return voice
+
+    def play_pcm(self, pcm: bytes, name: str = "clip", gain: float = 1.0, ducks_others: bool = False) -> Voice:
+        """Plays a complete clip without waiting for it"""
+        voice = Voice(name, max(len(pcm), 2), gain, ducks_others)
+        voice.write(pcm)
+        voice.finish()
+        return self._add(voice)
+
+    @property
+    def is_playing(self) -> bool:
+        """Whether any voice is playing"""
+        return bool(self._voices)
+
+    def is_audible(self, tail_ms: float = 0) -> bool:
+        """
+        Whether sound is still coming out of the speaker, going by when the last block with
+        sound in it leaves the device rather than by the state of any thread.
+
+        Args:
+            tail_ms: Extra time to allow for the room's reverb to die away.
+        """
+        return time.monotonic() < self.playing_until + tail_ms / 1000
+
+    def stop_all(self, fade_ms: float = 30, name: Optional[str] = None):
+        """
+        Fades out every playing voice, or only the voices with the given name.
+        """
+        with self._voices_lock:
+            voices = [v for v in self._voices if name is None or v.name == name]
+        for voice in voices:
+            voice.stop(fade_ms, self.block_ms)
+
+    def mix_block(self) -> bytes:
+        """Mixes the next block from every playing voice"""
+        self._mix[:] = 0.0
+        with self._voices_lock:
+            voices = list(self._voices)
+
+        target = self.duck_gain if any(v.ducks_others and not v._stopped for v in voices) else 1.0
+        self._duck += (target - self._duck) * self.duck_step
+
+        ended = []
+        audible = False
+        for voice in voices:
+            # Read before pulling, so audio written just before finish() is never cut off
+            finished = voice._finished
+            count = voice._pull(self._samples)
+            gain = voice.gain * (1.0 if voice.ducks_others else self._duck)
+            if count:
+                audible = True
+                start_gain = voice._fade_gain
+                if start_gain != voice._fade_target:
+                    # Linear fade in or out across the block
+                    if voice._fade_target > start_gain:
+                        end_gain = min(voice._fade_target, start_gain + voice._fade_step)
+                    else:
+                        end_gain = max(voice._fade_target, start_gain - voice._fade_step)
+                    np.multiply(self._ramp, end_gain - start_gain, out=self._envelope)
+                    self._envelope += start_gain
+                    self._envelope *= gain
+                    voice._fade_gain = end_gain
+                    self._mix[:count] += self._samples[:count] * self._envelope[:count]
+                else:
+                    self._mix[:count] += self._samples[:count] * (gain * start_gain)
+
+            if not count and (finished or voice._stopped):
+                ended.append(voice)
+            elif voice._stopped and voice._fade_gain <= 0.0:
+                ended.append(voice)
+
+        if ended:
+            with self._voices_lock:
+                for voice in ended:
+                    self._voices.remove(voice)
+            for voice in ended:
+                voice._end()
+
+        if audible:
+            # This block is written after the one ahead of it, then waits behind the device buffer
+            self.playing_until = time.monotonic() + self.output_latency + 2 * self.block_ms / 1000
+
+        np.clip(self._mix, -32768, 32767, out=self._mix)
+        self._out[:] = self._mix
+        self.blocks_played += 1
+        block = self._out.tobytes()
+        for tap in self._taps:
+            tap.write(block)
+        return block
+
+    def _run(self):
+        while self._running:
+            try:
+                self._stream.write(self.mix_block())
+            except Exception:
+                logger.exception("Error writing audio output")
+                self._running = False
+
+    def close(self):
+        """Stops playback and releases the device"""
+        self._running = False
+        self.stop_all(fade_ms=0)
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=1)
+        with self._voices_lock:
+            voices, self._voices = self._voices, []
+        for voice in voices:
+            voice._end()
+        if self._stream:
+            self._stream.stop_stream()
+            self._stream.close()
+        if self._audio:
+            self._audio.terminate()
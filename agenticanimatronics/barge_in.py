@@ -0,0 +1,134 @@
+import math
+from typing import Callable, Iterable, Iterator, Optional
+
+import numpy as np
+from loguru import logger
+
+
+class BargeInDetector:
+    def __init__(
+            self,
+            on_barge_in: Optional[Callable[[], None]] = None,
+            is_speaking: Optional[Callable[[], bool]] = None,
+            sample_rate: int = 16_000,
+            threshold: float = 1000.0,
+            min_speech_ms: float = 100,
+            max_gap_ms: float = 60,
+    ):
+        """
+        Detects a visitor talking over the pirate. Watches the microphone audio while the pirate
+        is speaking and calls `on_barge_in` once per response as soon as enough voiced audio
+        has been heard, so playback can be stopped straight away.
+
+        The threshold is well above the endpointer's, so the pirate's own voice leaking back
+        into the microphone is not mistaken for the visitor.
+
+        Args:
+            on_barge_in: Called when the visitor starts talking over the pirate.
+            is_speaking: Returns whether the pirate is currently speaking.
+            sample_rate: The sample rate of the audio.
+            threshold: RMS level above which a chunk counts as the visitor talking.
+            min_speech_ms: How much voiced audio is needed before interrupting, so coughs and
+                bumps do not cut the pirate off.
+            max_gap_ms: Gaps between voiced chunks shorter than this still count as one onset.
+        """
+        self.on_barge_in = on_barge_in
+        self.is_speaking = is_speaking
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.min_speech_ms = min_speech_ms
+        self.max_gap_ms = max_gap_ms
+
+        self.barge_ins = 0
+        self.reset()
+
+    def reset(self):
+        """Forgets any onset in progress and re-arms the detector"""
+        self.voiced_ms = 0.0
+        self.gap_ms = 0.0
+        self.armed = True
+
+    def _is_voiced(self, samples: np.ndarray) -> bool:
+        if not samples.any():
+            return False
+        rms = math.sqrt(float(np.dot(samples, samples.astype(np.float32))) / samples.size)
+        return rms >= self.threshold
+
+    def process(self, chunk: bytes) -> bool:
+        """
+        Feeds one chunk of 16-bit PCM audio.
+
+        Returns:
+            True if this chunk triggered a barge-in.
+        """
+        if self.is_speaking is None or not self.is_speaking():
+            # Only one barge-in per response
+            self.reset()
+            return False
+
+        samples = np.frombuffer(chunk, dtype=np.int16)
+        if samples.size == 0 or not self.armed:
+            return False
+        duration_ms = 1000.0 * samples.size / self.sample_rate
+
+        if self._is_voiced(samples):
+            self.voiced_ms += duration_ms
+            self.gap_ms = 0.0
+        else:
+            self.gap_ms += duration_ms
+            if self.gap_ms > self.max_gap_ms:
+                self.voiced_ms = 0.0
+
+        if self.voiced_ms < self.min_speech_ms:
+            return False
+
+        self.armed = False
+        self.barge_ins += 1
+        logger.debug(f"Barge-in after {self.voiced_ms:.0f} ms of visitor speech")
+        if self.on_barge_in:
+            self.on_barge_in()
+        return True
+
+
+class SpokenText:
+    def __init__(self):
+        """
+        Tracks which text each stretch of a response's audio belongs to, so a response that
+        was interrupted can be cut back to what the visitor actually heard.
+
+        Call `start` as each piece of text starts producing audio, pass the audio on its way to
+        the speaker through `count`, and set `played_bytes` once playback ends.
+        """
+        self._starts: list[tuple[int, str]] = []
+        self.queued_bytes = 0
+        self.played_bytes = 0
+
+    def start(self, text: str):
+        """Marks the audio that follows as belonging to text"""
+        self._starts.append((self.queued_bytes, text))
+
+    def count(self, audio: Iterable[bytes]) -> Iterator[bytes]:
+        """Passes audio through, counting how much has been queued for playback"""
+        for chunk in audio:
+            self.queued_bytes += len(chunk)
+            yield chunk
+
+    def heard(self, played_bytes: Optional[int] = None) -> str:
+        """
+        Returns the text that had been played. A piece of text cut off part way through is
+        trimmed to roughly the share of its words that were played.
+        """
+        played_bytes = self.played_bytes if played_bytes is None else played_bytes
+        words = []
+        for i, (start, text) in enumerate(self._starts):
+            end = self._starts[i + 1][0] if i + 1 < len(self._starts) else self.queued_bytes
+            if played_bytes <= start:
+                break
+            if played_bytes >= end:
+                words.extend(text.split())
+                continue
+            fraction = (played_bytes - start) / (end - start)
+            text_words = text.split()
+            words.extend(text_words[:math.ceil(fraction * len(text_words))])
+            break
+        return " ".join(words)
@@ -0,0 +1,180 @@
+from collections import deque
+from typing import Optional
+
+import numpy as np
+from loguru import logger
+
+from agenticanimatronics.audio_format import StreamingResampler
+from agenticanimatronics.ring_buffer import SPSCRingBuffer
+
+
+class EchoCanceller:
+    def __init__(
+            self,
+            reference: SPSCRingBuffer,
+            sample_rate: int = 16_000,
+            reference_rate: Optional[int] = None,
+            block_ms: float = 10,
+            filter_ms: float = 300,
+            max_delay_ms: float = 150,
+            step_size: float = 0.8,
+            double_talk_ratio: float = 1.0,
+            double_talk_hangover_ms: float = 100,
+            silence_rms: float = 100.0,
+    ):
+        """
+        Removes the pirate's own voice from the microphone signal. The exact audio being played
+        (read from an AudioOutputEngine reference tap) is passed through an adaptive filter that
+        learns the path from the speaker to the microphone, and the filter's estimate of the
+        echo is subtracted from each microphone chunk.
+
+        The filter is a partitioned-block frequency-domain NLMS: the filter is split into
+        `filter_ms / block_ms` partitions that are all updated at once with numpy FFTs, so a long
+        echo tail costs a handful of vectorized operations per block instead of a loop per sample.
+
+        Adaptation is frozen while the visitor talks over the pirate (Geigel double-talk
+        detection), so their voice is not learned as echo.
+
+        Args:
+            reference: Ring buffer the output engine writes every played block into.
+            sample_rate: Sample rate of the microphone audio.
+            reference_rate: Sample rate of the played audio, if different. It is resampled to
+                `sample_rate`.
+            block_ms: Size of each filter block. Microphone chunks should be a whole number of
+                blocks; any remainder is passed through unprocessed.
+            filter_ms: Longest echo (playback and capture latency plus room reverb) that can be
+                cancelled.
+            max_delay_ms: Most reference audio to hold ahead of the microphone. Older audio is
+                dropped so the reference stays within the filter's reach.
+            step_size: How fast the filter adapts, between 0 and 1.
+            double_talk_ratio: A microphone peak above this fraction of the recent playback peak
+                is taken as the visitor talking, and adaptation pauses.
+            double_talk_hangover_ms: How long adaptation stays paused after double talk.
+            silence_rms: Playback quieter than this is treated as silence and not adapted on.
+        """
+        self.reference = reference
+        self.sample_rate = sample_rate
+        self.block_size = max(1, int(sample_rate * block_ms / 1000))
+        self.partitions = max(1, int(round(filter_ms / block_ms)))
+        self.max_delay = int(sample_rate * max_delay_ms / 1000)
+        self.step_size = step_size
+        self.double_talk_ratio = double_talk_ratio
+        self.hangover_blocks = int(round(double_talk_hangover_ms / block_ms))
+        self.silence_rms = silence_rms
+
+        self._resampler = None
+        if reference_rate and reference_rate != sample_rate:
+            self._resampler = StreamingResampler(reference_rate, sample_rate)
+
+        n = self.block_size
+        bins = n + 1
+        self._weights = np.zeros((self.partitions, bins), dtype=np.complex128)
+        self._spectra = np.zeros((self.partitions, bins), dtype=np.complex128)
+        self._power = np.zeros(bins, dtype=np.float64)
+        self._frame = np.zeros(2 * n, dtype=np.float64)
+        self._error_frame = np.zeros(2 * n, dtype=np.float64)
+        self._peaks = deque([0.0] * self.partitions, maxlen=self.partitions)
+        self._regularization = 2 * n * silence_rms ** 2
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._hangover = 0
+
+        self._mic_energy = 0.0
+        self._error_energy = 0.0
+        self.blocks = 0
+        self.double_talk_blocks = 0
+
+    def _take_reference(self, count: int) -> np.ndarray:
+        """
+        Returns the next `count` samples of played audio, lined up with the microphone chunk.
+        Silence is used when nothing has been played.
+        """
+        data = self.reference.read(self.reference.available(), timeout=0)
+        if self._resampler:
+            data = self._resampler.process(data)
+        if data:
+            samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+            self._pending = np.concatenate((self._pending, samples))
+
+        # Keep the reference from drifting too far ahead of the microphone
+        excess = self._pending.size - (count + self.max_delay)
+        if excess > 0:
+            self._pending = self._pending[excess:]
+
+        out = np.zeros(count, dtype=np.float32)
+        used = min(count, self._pending.size)
+        out[:used] = self._pending[:used]
+        self._pending = self._pending[used:]
+        return out
+
+    def _process_block(self, mic: np.ndarray, reference: np.ndarray) -> np.ndarray:
+        n = self.block_size
+
+        # Overlap-save: each frame is the previous block followed by this one
+        self._frame[:n] = self._frame[n:]
+        self._frame[n:] = reference
+        self._spectra = np.roll(self._spectra, 1, axis=0)
+        self._spectra[0] = np.fft.rfft(self._frame)
+
+        echo_spectrum = np.einsum("pk,pk->k", self._weights, self._spectra)
+        echo = np.fft.irfft(echo_spectrum, n=2 * n)[n:]
+        error = mic - echo
+
+        mic_peak = float(np.max(np.abs(mic)))
+        ref_peak = float(np.max(np.abs(reference)))
+        self._peaks.append(ref_peak)
+        if mic_peak > self.double_talk_ratio * max(self._peaks) and ref_peak > 0:
+            self._hangover = self.hangover_blocks
+            self.double_talk_blocks += 1
+        elif self._hangover:
+            self._hangover -= 1
+
+        current_power = np.abs(self._spectra[0]) ** 2
+        self._power = 0.9 * self._power + 0.1 * current_power
+        active = np.sqrt(np.mean(reference.astype(np.float64) ** 2)) >= self.silence_rms
+        if active and not self._hangover:
+            self._error_frame[n:] = error
+            error_spectrum = np.fft.rfft(self._error_frame)
+            step = self.step_size * error_spectrum / (self.partitions * self._power + self._regularization)
+            # Gradient constrained to the causal half, so each partition stays a linear convolution
+            gradient = np.fft.irfft(np.conj(self._spectra) * step, n=2 * n, axis=1)
+            gradient[:, n:] = 0.0
+            self._weights += np.fft.rfft(gradient, axis=1)
+
+        if active:
+            self._mic_energy = 0.95 * self._mic_energy + 0.05 * float(np.dot(mic, mic))
+            self._error_energy = 0.95 * self._error_energy + 0.05 * float(np.dot(error, error))
+        self.blocks += 1
+        return error
+
+    def process(self, data: bytes) -> bytes:
+        """Cancels the echo in one chunk of 16-bit microphone audio. The chunk keeps its size."""
+        mic = np.frombuffer(data, dtype=np.int16)
+        if mic.size == 0:
+            return data
+        reference = self._take_reference(mic.size)
+
+        out = mic.astype(np.float64)
+        for start in range(0, mic.size - self.block_size + 1, self.block_size):
+            end = start + self.block_size
+            out[start:end] = self._process_block(out[start:end], reference[start:end])
+        return np.clip(np.round(out), -32768, 32767).astype(np.int16).tobytes()
+
+    @property
+    def erle_db(self) -> float:
+        """Echo return loss enhancement: how much quieter the echo is after cancellation"""
+        if not self._error_energy or not self._mic_energy:
+            return 0.0
+        return float(10 * np.log10(self._mic_energy / self._error_energy))
+
+    def reset(self):
+        """Forgets the learned echo path"""
+        self._weights[:] = 0
+        self._spectra[:] = 0
+        self._power[:] = 0
+        self._frame[:] = 0
+        self._hangover = 0
+
+    def log_stats(self):
+        """Logs how well echo is being cancelled"""
+        logger.info(f"🔇 Echo canceller: {self.erle_db:.1f} dB echo reduction, "
+                    f"{self.double_talk_blocks}/{self.blocks} blocks of double talk")
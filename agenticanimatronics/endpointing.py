@@ -0,0 +1,128 @@
+import math
+from typing import Callable, Optional
+
+import numpy as np
+from loguru import logger
+
+from agenticanimatronics.voice_activity import VoiceActivityDetector
+
+
+class Endpointer:
+    def __init__(
+            self,
+            on_endpoint: Optional[Callable[[], None]] = None,
+            sample_rate: int = 16_000,
+            threshold: float = 200.0,
+            min_silence_ms: float = 250,
+            max_silence_ms: float = 700,
+            pause_multiplier: float = 1.6,
+            initial_pause_ms: float = 300,
+            min_pause_ms: float = 100,
+            min_speech_ms: float = 200,
+            adapt_rate: float = 0.25,
+            vad: Optional[VoiceActivityDetector] = None,
+            frame_ms: float = 50,
+    ):
+        """
+        Local end of turn detector. Watches the microphone audio and calls `on_endpoint` as soon
+        as a visitor has stopped talking, instead of waiting for the server's fixed silence
+        threshold.
+
+        The silence window adapts to each visitor: pauses inside an utterance (silence followed
+        by more speech) are tracked, and the window is kept a little longer than a typical
+        mid-sentence pause. Fast talkers get a short window, slow and hesitant talkers a long one.
+
+        Args:
+            on_endpoint: Called when the end of an utterance is detected.
+            sample_rate: The sample rate of the audio.
+            threshold: RMS level above which audio counts as speech, when there is no `vad`.
+            min_silence_ms: Shortest silence window the endpointer will use.
+            max_silence_ms: Longest silence window, normally the server's own threshold.
+            pause_multiplier: How much longer than a typical pause the window is.
+            initial_pause_ms: Typical pause assumed for a new visitor before any are measured.
+            min_pause_ms: Gaps shorter than this are between words and are not counted as pauses.
+            min_speech_ms: Ignore utterances with less speech than this (coughs, clicks).
+            adapt_rate: How quickly the typical pause follows new pauses.
+            vad: The microphone's voice activity detector. Its adaptive threshold, which follows
+                the room's noise floor, is used instead of `threshold`.
+            frame_ms: Chunks are judged a frame at a time, so the pre-roll sent with the start of
+                speech and the quieter hangover after it are told apart from the speech itself.
+        """
+        self.on_endpoint = on_endpoint
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.min_silence_ms = min_silence_ms
+        self.max_silence_ms = max_silence_ms
+        self.pause_multiplier = pause_multiplier
+        self.initial_pause_ms = initial_pause_ms
+        self.min_pause_ms = min_pause_ms
+        self.min_speech_ms = min_speech_ms
+        self.adapt_rate = adapt_rate
+        self.vad = vad
+        self.frame_samples = max(1, int(sample_rate * frame_ms / 1000))
+
+        self.endpoints = 0
+        self.reset()
+
+    def reset(self):
+        """Forgets the current utterance and the visitor's pause statistics"""
+        self.typical_pause_ms = self.initial_pause_ms
+        self.in_utterance = False
+        self.speech_ms = 0.0
+        self.silence_ms = 0.0
+
+    @property
+    def silence_window_ms(self) -> float:
+        """How long a silence has to last before the utterance is ended"""
+        window = self.typical_pause_ms * self.pause_multiplier
+        return min(self.max_silence_ms, max(self.min_silence_ms, window))
+
+    def _is_voiced(self, samples: np.ndarray) -> bool:
+        if not samples.any():
+            return False
+        rms = math.sqrt(float(np.dot(samples, samples.astype(np.float32))) / samples.size)
+        return rms >= (self.vad.adaptive_threshold if self.vad else self.threshold)
+
+    def process(self, chunk: bytes) -> bool:
+        """
+        Feeds one chunk of 16-bit PCM audio.
+
+        Returns:
+            True if this chunk ended an utterance.
+        """
+        samples = np.frombuffer(chunk, dtype=np.int16)
+        ended = False
+        for start in range(0, samples.size, self.frame_samples):
+            ended = self._process_frame(samples[start:start + self.frame_samples]) or ended
+        return ended
+
+    def _process_frame(self, samples: np.ndarray) -> bool:
+        duration_ms = 1000.0 * samples.size / self.sample_rate
+
+        if self._is_voiced(samples):
+            if self.in_utterance and self.silence_ms >= self.min_pause_ms:
+                # Speech resumed, so the silence was a pause inside the utterance
+                self.typical_pause_ms += self.adapt_rate * (self.silence_ms - self.typical_pause_ms)
+            self.in_utterance = True
+            self.speech_ms += duration_ms
+            self.silence_ms = 0.0
+            return False
+
+        if not self.in_utterance:
+            return False
+
+        self.silence_ms += duration_ms
+        if self.silence_ms < self.silence_window_ms:
+            return False
+
+        ended = self.speech_ms >= self.min_speech_ms
+        if ended:
+            self.endpoints += 1
+            logger.debug(f"Local endpoint after {self.silence_ms:.0f} ms of silence "
+                         f"(window {self.silence_window_ms:.0f} ms)")
+            if self.on_endpoint:
+                self.on_endpoint()
+        self.in_utterance = False
+        self.speech_ms = 0.0
+        self.silence_ms = 0.0
+        return ended
@@ -0,0 +1,97 @@
+import inspect
+from typing import AsyncIterator, Iterator, Optional
+
+from agenticanimatronics.llm import LLMHandler
+from agenticanimatronics.pirate_chatbot_module import ConversationSummaryModule, PirateChatBotModule
+
+RESPONSE_INSTRUCTIONS = (
+    "Reply with only Captain Boneheart's spoken words, in plain text without quotes, labels or "
+    "stage directions. Keep it under 50 words."
+)
+SUMMARY_INSTRUCTIONS = "Reply with only the updated summary."
+
+
+class FastPirateChat:
+    def __init__(
+            self,
+            model: str = "gemini/gemini-2.5-flash-lite",
+            llm: Optional[LLMHandler] = None,
+            temperature: float = 0.0,
+            max_tokens: int = 1000,
+    ):
+        """
+        A drop-in replacement for PirateChatBot that talks to the llm directly. The persona is
+        built into a system message once, the conversation history (already in chat message
+        form) is sent as is, and the reply is the completion text, so there is no per-turn
+        prompt formatting or output parsing around the network call.
+
+        Unlike PirateChatBot, nothing is configured globally, so other dspy programs in the
+        process are unaffected. Requests go through the llm handler's event loop and its
+        keep-alive HTTP client; the synchronous methods wait on that loop.
+
+        Args:
+            model: The litellm model name.
+            llm: Sends the requests. Defaults to an LLMHandler for `model` on the shared event loop.
+            temperature: Sampling temperature, the same as dspy's default.
+            max_tokens: Longest response, the same as dspy's default.
+        """
+        self.llm = llm or LLMHandler(model)
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+
+        self.system_message = {
+            "role": "system",
+            "content": f"{inspect.cleandoc(PirateChatBotModule.__doc__)}\n\n{RESPONSE_INSTRUCTIONS}",
+        }
+        self.summary_message = {
+            "role": "system",
+            "content": f"{inspect.cleandoc(ConversationSummaryModule.__doc__)}\n\n{SUMMARY_INSTRUCTIONS}",
+        }
+
+    def messages(self, history: list[dict], user_prompt: str, user_description: str = "") -> list[dict]:
+        """Builds the chat messages for a turn"""
+        content = user_prompt
+        if user_description:
+            content = f"(What the visitor looks like: {user_description})\n{user_prompt}"
+        return [self.system_message, *history, {"role": "user", "content": content}]
+
+    def _options(self) -> dict:
+        return dict(temperature=self.temperature, max_tokens=self.max_tokens)
+
+    def _summary_prompt(self, summary: str, messages: list[dict]) -> list[dict]:
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        prompt = f"Summary so far: {summary or '(none)'}\n\nMessages to fold in:\n{transcript}"
+        return [self.summary_message, {"role": "user", "content": prompt}]
+
+    async def aforward(self, history, user_prompt, user_description="") -> str:
+        response = await self.llm.achat(self.messages(history, user_prompt, user_description), **self._options())
+        return response.choices[0].message.content.strip()
+
+    async def astream(self, history, user_prompt, user_description="") -> AsyncIterator[str]:
+        """Async version of stream. Read it on the llm handler's event loop."""
+        async for chunk in self.llm.astream_chat(
+                self.messages(history, user_prompt, user_description), **self._options()):
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if text:
+                yield text
+
+    async def asummarize(self, summary: str, messages: list[dict]) -> str:
+        """Folds older messages into the running conversation summary"""
+        response = await self.llm.achat(self._summary_prompt(summary, messages), **self._options())
+        return response.choices[0].message.content.strip()
+
+    def forward(self, history, user_prompt, user_description=""):
+        return self.llm.event_loop.run(self.aforward(history, user_prompt, user_description))
+
+    def stream(self, history, user_prompt, user_description="") -> Iterator[str]:
+        """
+        Generates the pirate response like forward, but yields the text as it streams from the
+        model instead of waiting for all of it.
+        """
+        return self.llm.event_loop.iterate(self.astream(history, user_prompt, user_description))
+
+    def summarize(self, summary: str, messages: list[dict]) -> str:
+        """Folds older messages into the running conversation summary"""
+        return self.llm.event_loop.run(self.asummarize(summary, messages))
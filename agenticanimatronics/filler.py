@@ -0,0 +1,146 @@
+import random
+import threading
+from typing import Callable, Iterable, Optional
+
+from loguru import logger
+
+from agenticanimatronics.audio_output import AudioOutputEngine, Voice
+
+FILLER_LINES = [
+    "Arr, let me think on that...",
+    "Hmm, shiver me timbers...",
+    "Ahh, now that be a question...",
+    "Give an old skeleton a moment...",
+    "Let me rattle me bones on that...",
+    "Hmm, hmm, aye...",
+]
+
+
+class FillerPool:
+    def __init__(self, rng: Optional[random.Random] = None):
+        """
+        Short in-character clips, held in memory as PCM, to play while the pirate is thinking.
+        Clips are picked shuffle-bag style: every clip plays once before any repeats, and the
+        same clip is never played twice in a row.
+        """
+        self._rng = rng or random.Random()
+        self._clips: list[tuple[str, bytes]] = []
+        self._bag: list[int] = []
+        self._last: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._clips)
+
+    def add(self, text: str, pcm: bytes):
+        """Adds a rendered clip to the pool"""
+        if not pcm:
+            return
+        with self._lock:
+            self._clips.append((text, pcm))
+            self._bag = []
+
+    def render(self, lines: Iterable[str], synthesize: Callable[[str], Optional[bytes]]):
+        """
+        Renders each line to PCM and adds it to the pool. With a TTS cache behind `synthesize`
+        this only reaches the network the first time a line is ever rendered.
+        """
+        for text in lines:
+            try:
+                self.add(text, synthesize(text))
+            except Exception:
+                logger.exception(f"Could not render filler: {text}")
+        logger.info(f"🦜 {len(self)} filler clips ready")
+
+    def pick(self) -> Optional[tuple[str, bytes]]:
+        """Returns the next (text, pcm) clip, or None if the pool is empty"""
+        with self._lock:
+            if not self._clips:
+                return None
+            if not self._bag:
+                self._bag = list(range(len(self._clips)))
+                self._rng.shuffle(self._bag)
+                # Don't start the new round with the clip that ended the last one
+                if len(self._bag) > 1 and self._bag[-1] == self._last:
+                    self._bag[0], self._bag[-1] = self._bag[-1], self._bag[0]
+            self._last = self._bag.pop()
+            return self._clips[self._last]
+
+
+class FillerPlayer:
+    def __init__(
+            self,
+            engine: AudioOutputEngine,
+            pool: FillerPool,
+            deadline_ms: float = 700,
+            crossfade_ms: float = 150,
+            gain: float = 0.9,
+    ):
+        """
+        Masks thinking time. Armed when a turn starts; if the response has not started playing
+        by the deadline, a filler clip is played, and it is faded out under the response as
+        soon as the response starts.
+
+        Args:
+            engine: Where to play the fillers.
+            pool: The clips to pick from.
+            deadline_ms: How long to wait for the response before playing a filler.
+            crossfade_ms: How long the filler and the response overlap.
+            gain: Volume of the fillers.
+        """
+        self.engine = engine
+        self.pool = pool
+        self.deadline_ms = deadline_ms
+        self.crossfade_ms = crossfade_ms
+        self.gain = gain
+
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._voice: Optional[Voice] = None
+        self._responded = True
+
+        self.fillers_played = 0
+
+    @property
+    def is_playing(self) -> bool:
+        """Whether a filler is playing right now"""
+        voice = self._voice
+        return voice is not None and voice.is_playing
+
+    def arm(self):
+        """Starts the deadline for a new turn"""
+        with self._lock:
+            self._cancel_timer()
+            self._responded = False
+            self._timer = threading.Timer(self.deadline_ms / 1000, self._fire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _fire(self):
+        with self._lock:
+            if self._responded:
+                return
+            clip = self.pool.pick()
+            if clip is None:
+                return
+            text, pcm = clip
+            self._voice = self.engine.play_pcm(pcm, name="filler", gain=self.gain)
+            self.fillers_played += 1
+        logger.debug(f"🦜 Filler: {text}")
+
+    def response_started(self):
+        """Called when the response starts playing. Fades out any filler under it."""
+        with self._lock:
+            self._responded = True
+            self._cancel_timer()
+            if self._voice is not None and self._voice.is_playing:
+                self._voice.stop(self.crossfade_ms, self.engine.block_ms)
+
+    def disarm(self):
+        """Ends the turn without a response, stopping any filler"""
+        self.response_started()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
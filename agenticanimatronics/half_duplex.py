@@ -0,0 +1,33 @@
+from loguru import logger
+
+from agenticanimatronics.audio_output import AudioOutputEngine
+
+
+class HalfDuplexGate:
+    def __init__(self, engine: AudioOutputEngine, tail_ms: float = 150):
+        """
+        Cheap alternative to echo cancellation: closes the microphone while the pirate's voice
+        is coming out of the speaker. Open and closed follow the output engine's playback
+        clock, so the microphone reopens the moment the last sample has played (plus the room's
+        reverb tail) and a visitor's quick reply is not lost.
+
+        Args:
+            engine: The output engine whose playback is gated on.
+            tail_ms: How long after playback ends to keep the microphone closed, for reverb.
+        """
+        self.engine = engine
+        self.tail_ms = tail_ms
+        self._closed = False
+
+        self.closures = 0
+
+    @property
+    def is_closed(self) -> bool:
+        """Whether microphone audio should be discarded right now"""
+        closed = self.engine.is_audible(self.tail_ms)
+        if closed != self._closed:
+            self._closed = closed
+            if closed:
+                self.closures += 1
+            logger.debug("Microphone gated while the pirate speaks" if closed else "Microphone open")
+        return closed
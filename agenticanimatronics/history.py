@@ -0,0 +1,128 @@
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Optional
+
+from loguru import logger
+
+from agenticanimatronics.llm import LLMEventLoop, shared_event_loop
+
+
+def estimate_tokens(messages: list[dict], chars_per_token: float = 4.0) -> int:
+    """Rough token count of chat messages, good enough for budgeting without a tokenizer"""
+    return int(sum(len(m.get("content") or "") + 8 for m in messages) / chars_per_token)
+
+
+class HistoryWindow:
+    def __init__(
+            self,
+            summarize: Callable[[str, list[dict]], Awaitable[str]],
+            keep_turns: int = 4,
+            max_tokens: int = 800,
+            event_loop: Optional[LLMEventLoop] = None,
+    ):
+        """
+        Keeps the history sent to the llm a constant size however long a visitor chats. The last
+        `keep_turns` exchanges are sent word for word, and everything older is folded into a
+        running summary that is sent ahead of them.
+
+        Summaries are written on the llm event loop after a turn ends, so they are never on
+        the critical path. Until one catches up, the oldest exchanges are dropped instead so the
+        prompt stays within `max_tokens`.
+
+        Args:
+            summarize: Async function called as summarize(summary_so_far, messages) that returns
+                the summary with the messages folded in.
+            keep_turns: How many recent exchanges (a visitor message and the pirate's reply)
+                to keep word for word.
+            max_tokens: Most tokens of history to send, summary included.
+            event_loop: The loop summaries are written on, the shared one unless another is given.
+        """
+        self.summarize = summarize
+        self.keep_turns = keep_turns
+        self.max_tokens = max_tokens
+        self._event_loop = event_loop
+
+        self._lock = threading.Lock()
+        self._job: Optional[Future] = None
+        self._epoch = 0
+        self.summary = ""
+        self.summarized = 0
+
+        self.summaries = 0
+        self.trimmed_messages = 0
+
+    @property
+    def event_loop(self) -> LLMEventLoop:
+        if self._event_loop is None:
+            self._event_loop = shared_event_loop()
+        return self._event_loop
+
+    def window(self, history: list[dict]) -> list[dict]:
+        """
+        Returns the history to send with the next prompt. The history itself is returned when it
+        already fits, so nothing is copied for short conversations.
+        """
+        with self._lock:
+            summary, summarized = self.summary, self.summarized
+        if summarized > len(history):
+            # The history was replaced without a reset
+            summary, summarized = "", 0
+
+        recent = history[summarized:]
+        prefix = [{"role": "system", "content": f"Summary of the conversation so far: {summary}"}] if summary else []
+        trimmed = 0
+        while len(recent) > 2 and estimate_tokens(prefix + recent) > self.max_tokens:
+            recent = recent[2:]
+            trimmed += 2
+
+        if trimmed:
+            self.trimmed_messages += trimmed
+            logger.debug(f"📜 Dropped {trimmed} messages the summary hasn't caught up with")
+        if not prefix and not trimmed and not summarized:
+            return history
+        return prefix + recent
+
+    def update(self, history: list[dict]):
+        """
+        Called after each turn. Starts folding exchanges that have fallen out of the verbatim
+        window into the summary, unless a summary is already being written.
+        """
+        with self._lock:
+            if self._job and not self._job.done():
+                return
+            end = len(history) - 2 * self.keep_turns
+            if end <= self.summarized:
+                return
+            older = list(history[self.summarized:end])
+            self._job = self.event_loop.submit(self._fold(self._epoch, self.summary, older, end))
+
+    async def _fold(self, epoch: int, summary: str, messages: list[dict], end: int):
+        try:
+            new_summary = await self.summarize(summary, messages)
+        except Exception:
+            logger.exception("Could not summarize the conversation")
+            return
+        with self._lock:
+            if epoch != self._epoch:
+                return
+            self.summary = new_summary
+            self.summarized = end
+            self.summaries += 1
+        logger.debug(f"📜 Conversation summary: {new_summary}")
+
+    def wait(self, timeout: Optional[float] = None):
+        """Waits for a summary being written in the background"""
+        job = self._job
+        if job:
+            job.result(timeout)
+
+    def reset(self):
+        """Forgets the summary, for a new visitor"""
+        with self._lock:
+            self._epoch += 1
+            if self._job:
+                # The summary is for the last visitor, so there's no need to finish writing it
+                self._job.cancel()
+            self._job = None
+            self.summary = ""
+            self.summarized = 0
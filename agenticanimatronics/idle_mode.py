@@ -5,28 +5,38 @@ import os
 import glob
 import pygame
 from loguru import logger
+from pydub import AudioSegment
 
 
 class IdleMode:
-    def __init__(self, audio_folder="idle_audio"):
+    def __init__(self, audio_folder="idle_audio", output_engine=None, gain=0.8):
         """
         Idle mode that plays random audio files at random intervals
         
         Args:
             audio_folder: Directory containing audio files for idle mode
+            output_engine: Shared AudioOutputEngine to play through. Falls back to pygame if not given.
+            gain: Volume of idle sounds when played through the output engine
         """
         self.audio_folder = audio_folder
         self.is_active = False
         self.idle_thread = None
         self.running = False
+        self.output_engine = output_engine
+        self.gain = gain
+        self._clips = {}  # Decoded PCM by file path, so each file is only decoded once
+        self._voice = None
         
-        # Initialize pygame mixer for audio playback
-        try:
-            pygame.mixer.init()
+        if output_engine:
             self.audio_available = True
-        except Exception:
-            logger.exception("Warning: Audio initialization failed")
-            self.audio_available = False
+        else:
+            # Initialize pygame mixer for audio playback
+            try:
+                pygame.mixer.init()
+                self.audio_available = True
+            except Exception:
+                logger.exception("Warning: Audio initialization failed")
+                self.audio_available = False
         
         # Load available audio files
         self.audio_files = self._load_audio_files()
@@ -86,7 +96,10 @@ class IdleMode:
         self.running = False
         
         # Stop any currently playing audio
-        if self.audio_available:
+        if self.output_engine:
+            if self._voice:
+                self._voice.stop()
+        elif self.audio_available:
             try:
                 pygame.mixer.stop()
             except Exception:
@@ -126,6 +139,12 @@ class IdleMode:
             
             logger.info(f"🎵 Playing idle sound: {os.path.basename(audio_file)}")
             
+            if self.output_engine:
+                self._voice = self.output_engine.play_pcm(self._load_clip(audio_file), name="idle", gain=self.gain)
+                while self._voice.is_playing and self.running and self.is_active:
+                    time.sleep(0.1)
+                return
+            
             # Load and play the audio
             pygame.mixer.music.load(audio_file)
             pygame.mixer.music.play()
@@ -137,6 +156,14 @@ class IdleMode:
         except Exception:
             logger.exception("Error playing audio file")
     
+    def _load_clip(self, audio_file):
+        """Decodes an audio file to 16-bit mono PCM at the output engine's rate"""
+        if audio_file not in self._clips:
+            segment = AudioSegment.from_file(audio_file)
+            segment = segment.set_channels(1).set_frame_rate(self.output_engine.sample_rate).set_sample_width(2)
+            self._clips[audio_file] = segment.raw_data
+        return self._clips[audio_file]
+    
     def is_idle_active(self):
         """Check if idle mode is currently active"""
         return self.is_active
@@ -1,4 +1,4 @@
-
+import asyncio
 
 from agenticanimatronics.image_creation import take_image
 from agenticanimatronics.llm import LLMHandler
@@ -14,3 +14,9 @@ class ImageAnalysis:
         image_location = take_image()
         self.analysis = self.llm.explain_image(image_location, self.prompt)
         queue.put(self.analysis)
+
+    async def analyse(self) -> str:
+        """Takes a photo and describes it, without blocking the event loop on the camera"""
+        image_location = await asyncio.to_thread(take_image)
+        self.analysis = await self.llm.aexplain_image(image_location, self.prompt)
+        return self.analysis
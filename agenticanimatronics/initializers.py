@@ -9,3 +9,13 @@ assembly_ai_key = os.getenv("ASSEMBLY_AI_API_KEY")
 agent_id = os.getenv("AGENT_ID")
 logs_webhook = os.getenv("LOGS_WEBHOOK")
 alerts_webhook = os.getenv("ALERTS_WEBHOOK")
+vosk_model_path = os.getenv("VOSK_MODEL_PATH")
+transcription_backend = os.getenv("TRANSCRIPTION_BACKEND") or "assemblyai"
+speculative = (os.getenv("SPECULATIVE") or "").lower() in ("1", "true", "yes", "on")
+tts_cache_dir = os.getenv("TTS_CACHE_DIR") or ".tts_cache"
+tts_output_format = os.getenv("TTS_OUTPUT_FORMAT") or None
+audio_output_rate = int(os.getenv("AUDIO_OUTPUT_RATE") or 16000)
+echo_handling = os.getenv("ECHO_HANDLING") or "cancel"
+mic_gate_tail_ms = float(os.getenv("MIC_GATE_TAIL_MS") or 150)
+chat_engine = os.getenv("CHAT_ENGINE") or "dspy"
+response_cache_ttl = float(os.getenv("RESPONSE_CACHE_TTL") or 3600)
@@ -0,0 +1,120 @@
+import time
+from collections import deque
+from typing import Optional
+
+import numpy as np
+from loguru import logger
+
+
+class JitterBuffer:
+    def __init__(
+            self,
+            sample_rate: int = 16_000,
+            min_ms: float = 40,
+            max_ms: float = 1000,
+            initial_ms: float = 150,
+            percentile: float = 95,
+            safety: float = 1.5,
+            window: int = 200,
+    ):
+        """
+        Decides how much streamed speech to buffer before playback starts. The gaps between
+        chunks arriving from the TTS stream are measured across turns, and the prebuffer is
+        sized to ride out a typical worst-case gap: short on a clean connection so the pirate
+        starts talking sooner, longer on bursty Wi-Fi so he does not stutter mid-sentence.
+
+        The AudioOutputEngine holds the audio itself; pass this to play_stream to have it
+        prebuffer, rebuffer after an underrun, and record how each turn went.
+
+        Args:
+            sample_rate: Sample rate of the audio being played.
+            min_ms: Smallest prebuffer that will be used.
+            max_ms: Largest prebuffer that will be used.
+            initial_ms: Prebuffer used before any gaps have been measured.
+            percentile: Which percentile of the measured gaps to cover.
+            safety: Multiplier on that gap.
+            window: How many recent gaps to keep.
+        """
+        self.sample_rate = sample_rate
+        self.min_ms = min_ms
+        self.max_ms = max_ms
+        self.initial_ms = initial_ms
+        self.percentile = percentile
+        self.safety = safety
+
+        self._gaps_ms = deque(maxlen=window)
+        self._last_arrival: Optional[float] = None
+        self.turns = deque(maxlen=100)
+
+    @property
+    def jitter_ms(self) -> float:
+        """The measured inter-arrival gap at the chosen percentile"""
+        if not self._gaps_ms:
+            return 0.0
+        return float(np.percentile(self._gaps_ms, self.percentile))
+
+    @property
+    def target_ms(self) -> float:
+        """How much audio to buffer before starting playback"""
+        if len(self._gaps_ms) < 5:
+            return self.initial_ms
+        return min(self.max_ms, max(self.min_ms, self.jitter_ms * self.safety))
+
+    @property
+    def target_bytes(self) -> int:
+        """The prebuffer as a number of bytes of 16-bit mono audio"""
+        return int(self.sample_rate * self.target_ms / 1000) * 2
+
+    def start_turn(self):
+        """Starts measuring a new stream. The wait for its first chunk is latency, not jitter."""
+        self.start_segment()
+
+    def start_segment(self):
+        """
+        Starts a new segment of the stream, e.g. the next sentence of a response. The wait for
+        its first chunk is the TTS service's time to first byte, not jitter.
+        """
+        self._last_arrival = None
+
+    def arrival(self, now: Optional[float] = None):
+        """Records a chunk arriving from the stream"""
+        now = time.monotonic() if now is None else now
+        if self._last_arrival is not None:
+            self._gaps_ms.append(1000 * (now - self._last_arrival))
+        self._last_arrival = now
+
+    def end_turn(self, prebuffer_ms: float, underruns: int, start_delay_ms: Optional[float]):
+        """
+        Records how a turn played out.
+
+        Args:
+            prebuffer_ms: The prebuffer the turn was played with.
+            underruns: How many times playback ran dry and had to rebuffer.
+            start_delay_ms: Time from the stream starting to its audio starting to play.
+        """
+        turn = {
+            "prebuffer_ms": prebuffer_ms,
+            "underruns": underruns,
+            "start_delay_ms": start_delay_ms,
+            "jitter_ms": self.jitter_ms,
+        }
+        self.turns.append(turn)
+        logger.debug(f"🔊 Speech prebuffer {prebuffer_ms:.0f} ms, {underruns} underruns, "
+                     f"jitter {turn['jitter_ms']:.0f} ms")
+
+    def stats(self) -> dict:
+        """Totals over the recorded turns"""
+        turns = list(self.turns)
+        return {
+            "turns": len(turns),
+            "underruns": sum(t["underruns"] for t in turns),
+            "turns_with_underruns": sum(1 for t in turns if t["underruns"]),
+            "mean_prebuffer_ms": float(np.mean([t["prebuffer_ms"] for t in turns])) if turns else 0.0,
+            "jitter_ms": self.jitter_ms,
+        }
+
+    def log_stats(self):
+        """Logs a summary of playback smoothness"""
+        stats = self.stats()
+        logger.info(f"🔊 Speech playback: {stats['turns_with_underruns']}/{stats['turns']} turns stuttered "
+                    f"({stats['underruns']} underruns), mean prebuffer {stats['mean_prebuffer_ms']:.0f} ms")
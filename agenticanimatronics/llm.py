@@ -1,60 +1,264 @@
-from litellm import completion
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Coroutine, Iterator, Optional, TypeVar
+
+from litellm import acompletion, completion
+from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler
 
 from agenticanimatronics.image_creation import encode_image
+from agenticanimatronics.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
 from loguru import logger
 
+T = TypeVar("T")
+
+
+class LLMEventLoop:
+    def __init__(self, max_concurrency: int = 4, timeout: float = 60.0):
+        """
+        One asyncio event loop on a background thread, shared by every async llm request. The
+        requests share one keep-alive HTTP client, so after the first request each one reuses
+        an open connection instead of a fresh TLS handshake, and no thread or process is
+        started per request.
+
+        Args:
+            max_concurrency: Most llm requests in flight at once. Others wait their turn.
+            timeout: HTTP timeout for each request, in seconds.
+        """
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="llm-event-loop", daemon=True)
+        self._thread.start()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.client: AsyncHTTPHandler = self.run(self._create_client(timeout))
+        self.closed = False
+
+    @staticmethod
+    async def _create_client(timeout: float) -> AsyncHTTPHandler:
+        # Created on the loop it will be used from
+        return AsyncHTTPHandler(timeout=timeout)
+
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedules a coroutine on the loop. Cancelling the returned future cancels the coroutine."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Runs a coroutine on the loop and waits for its result, cancelling it on timeout"""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    async def call(self, coro: Coroutine) -> Any:
+        """Awaits a coroutine on the shared loop from any event loop"""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def iterate(self, stream: AsyncIterator[T]) -> Iterator[T]:
+        """
+        Reads an async stream from synchronous code. One task on the loop reads the whole
+        stream and hands items over through a queue, and closing the iterator early cancels it.
+        """
+        items = queue.Queue()
+        end = object()
+
+        async def pump():
+            try:
+                async for item in stream:
+                    items.put((item, None))
+            except Exception as e:
+                items.put((None, e))
+            else:
+                items.put((end, None))
+
+        future = self.submit(pump())
+        try:
+            while True:
+                item, error = items.get()
+                if error is not None:
+                    raise error
+                if item is end:
+                    return
+                yield item
+        finally:
+            future.cancel()
+
+    def close(self):
+        """Closes the HTTP client and stops the loop"""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.run(self.client.close(), timeout=5)
+        except Exception:
+            logger.exception("Could not close the llm HTTP client")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+
+
+_shared_event_loop: Optional[LLMEventLoop] = None
+_shared_event_loop_lock = threading.Lock()
+
+
+def shared_event_loop() -> LLMEventLoop:
+    """Returns the event loop shared by every LLMHandler, starting it on first use"""
+    global _shared_event_loop
+    with _shared_event_loop_lock:
+        if _shared_event_loop is None or _shared_event_loop.closed:
+            _shared_event_loop = LLMEventLoop()
+        return _shared_event_loop
+
+
+def close_shared_event_loop():
+    """Closes the shared event loop, if it was ever started"""
+    with _shared_event_loop_lock:
+        if _shared_event_loop is not None:
+            _shared_event_loop.close()
+
+
+GENERATE_FALLBACK = "Arr, me brain be foggy today, matey! Try again later."
+EXPLAIN_IMAGE_FALLBACK = "A mysterious stranger stands before me"
+
 
 class LLMHandler:
-    def __init__(self, model_name="gemini/gemini-2.5-flash-lite"):
+    def __init__(
+            self,
+            model_name="gemini/gemini-2.5-flash-lite",
+            event_loop: Optional[LLMEventLoop] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            breaker: Optional[CircuitBreaker] = None,
+    ):
         self.model = model_name
+        self._event_loop = event_loop
+        self.retry_policy = retry_policy or RetryPolicy()
+        # Once the provider is down, requests go straight to the fallback line
+        self.breaker = breaker or CircuitBreaker(f"LLM {model_name}")
+
+    @property
+    def event_loop(self) -> LLMEventLoop:
+        """The loop async requests run on, the shared one unless another was given"""
+        if self._event_loop is None:
+            self._event_loop = shared_event_loop()
+        return self._event_loop
+
+    @staticmethod
+    def _image_messages(image_location, prompt):
+        return [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": prompt
+                    },
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:image/jpeg;base64,{encode_image(image_location)}"
+                        },
+                    },
+                ],
+            }
+        ]
+
+    def _content(self, messages) -> str:
+        response = completion(model=self.model, messages=messages)
+        return response.choices[0].message.content
 
     def generate_response(self, prompt):
         messages = [{"role": "user", "content": prompt}]
-        max_retries = 3
-        
-        for attempt in range(max_retries):
-            try:
-                response = completion(model=self.model, messages=messages)
-                out = response.choices[0].message.content
-                logger.info(out)
-                return out
-            except Exception:
-                logger.exception(f"LLM API error (attempt {attempt + 1}/{max_retries})")
-                if attempt == max_retries - 1:
-                    return "Arr, me brain be foggy today, matey! Try again later."
-                import time
-                time.sleep(1)
+        try:
+            out = self.retry_policy.call(lambda: self._content(messages), self.breaker, "LLM request")
+            logger.info(out)
+            return out
+        except CircuitOpenError:
+            logger.warning(f"{self.breaker.name} is unavailable - using the fallback response")
+        except Exception:
+            logger.exception("LLM API error - using the fallback response")
+        return GENERATE_FALLBACK
 
     def explain_image(self, image_location, prompt):
-        max_retries = 3
-        
-        for attempt in range(max_retries):
-            try:
-                messages = [
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": prompt
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{encode_image(image_location)}"
-                                },
-                            },
-                        ],
-                    }
-                ]
-
-                response = completion(model=self.model, messages=messages)
-                out = response.choices[0].message.content
-                logger.info(out)
-                return out
-            except Exception as e:
-                logger.info(f"Image analysis error (attempt {attempt + 1}/{max_retries}): {e}")
-                if attempt == max_retries - 1:
-                    return "A mysterious stranger stands before me"
-                import time
-                time.sleep(1)
+        try:
+            out = self.retry_policy.call(
+                lambda: self._content(self._image_messages(image_location, prompt)), self.breaker, "Image analysis")
+            logger.info(out)
+            return out
+        except CircuitOpenError:
+            logger.warning(f"{self.breaker.name} is unavailable - using the fallback description")
+        except Exception as e:
+            logger.info(f"Image analysis error: {e}")
+        return EXPLAIN_IMAGE_FALLBACK
+
+    async def achat(self, messages, **kwargs):
+        """
+        Sends chat messages on the shared event loop and returns the litellm response. Extra
+        arguments are passed to acompletion. No retries, so callers can apply their own.
+        """
+        return await self.event_loop.call(self._achat(messages, **kwargs))
+
+    async def _achat(self, messages, **kwargs):
+        async with self.event_loop.semaphore:
+            return await acompletion(model=self.model, messages=messages, client=self.event_loop.client, **kwargs)
+
+    async def astream_chat(self, messages, **kwargs) -> AsyncIterator:
+        """
+        Streams the response to chat messages chunk by chunk. The stream must be read on the
+        event loop, e.g. through event_loop.iterate from synchronous code.
+        """
+        async with self.event_loop.semaphore:
+            response = await acompletion(
+                model=self.model, messages=messages, stream=True, client=self.event_loop.client, **kwargs)
+            async for chunk in response:
+                yield chunk
+
+    async def _acomplete(self, messages) -> str:
+        response = await self._achat(messages)
+        return response.choices[0].message.content
+
+    async def agenerate(self, prompt) -> str:
+        """
+        Async version of generate_response. The request runs on the shared event loop and can be
+        cancelled by cancelling the awaiting task.
+        """
+        return await self.event_loop.call(self._agenerate(prompt))
+
+    async def _agenerate(self, prompt) -> str:
+        messages = [{"role": "user", "content": prompt}]
+        try:
+            out = await self.retry_policy.acall(lambda: self._acomplete(messages), self.breaker, "LLM request")
+            logger.info(out)
+            return out
+        except CircuitOpenError:
+            logger.warning(f"{self.breaker.name} is unavailable - using the fallback response")
+        except Exception:
+            logger.exception("LLM API error - using the fallback response")
+        return GENERATE_FALLBACK
+
+    async def aexplain_image(self, image_location, prompt) -> str:
+        """
+        Async version of explain_image. The request runs on the shared event loop and can be
+        cancelled by cancelling the awaiting task.
+        """
+        return await self.event_loop.call(self._aexplain_image(image_location, prompt))
+
+    async def _aexplain_image(self, image_location, prompt) -> str:
+        async def attempt():
+            messages = await asyncio.to_thread(self._image_messages, image_location, prompt)
+            return await self._acomplete(messages)
+
+        try:
+            out = await self.retry_policy.acall(attempt, self.breaker, "Image analysis")
+            logger.info(out)
+            return out
+        except CircuitOpenError:
+            logger.warning(f"{self.breaker.name} is unavailable - using the fallback description")
+        except Exception as e:
+            logger.info(f"Image analysis error: {e}")
+        return EXPLAIN_IMAGE_FALLBACK
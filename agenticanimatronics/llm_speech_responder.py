@@ -1,62 +1,300 @@
+import threading
 import time
+from typing import Iterable, Iterator, Optional
 
-import pyaudio
 from elevenlabs import ElevenLabs, stream, VoiceSettings
 
+from agenticanimatronics.audio_format import StreamingResampler, parse_output_format
+from agenticanimatronics.audio_output import AudioOutputEngine
+from agenticanimatronics.barge_in import SpokenText
+from agenticanimatronics.fast_chat import FastPirateChat
+from agenticanimatronics.filler import FILLER_LINES, FillerPlayer, FillerPool
+from agenticanimatronics.history import HistoryWindow
 from agenticanimatronics.initializers import eleven_labs_key
+from agenticanimatronics.jitter_buffer import JitterBuffer
 from agenticanimatronics.llm import LLMHandler
 from agenticanimatronics.pirate_chatbot_module import PirateChatBot
+from agenticanimatronics.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, prime
+from agenticanimatronics.response_cache import ResponseCache
+from agenticanimatronics.sentence_segmenter import SentenceSegmenter
+from agenticanimatronics.speculation import SpeculativeGenerator
+from agenticanimatronics.tts_cache import TTSCache
+from agenticanimatronics.tts_prefetch import TTSPrefetcher
 from loguru import logger
 
+TTS_MODEL = "eleven_multilingual_v2"
+TTS_OUTPUT_FORMAT = "mp3_22050_32"
+FALLBACK_RESPONSE = "Arr, something went wrong with me voice, matey!"
+
 class LLMSpeechResponder:
     @logger.catch
-    def __init__(self, eleven_labs_voice_id):
+    def __init__(
+            self,
+            eleven_labs_voice_id,
+            streaming=False,
+            tts_cache: Optional[TTSCache] = None,
+            output_engine: Optional[AudioOutputEngine] = None,
+            output_format: Optional[str] = None,
+            fillers: bool = False,
+            response_cache: Optional[ResponseCache] = None,
+            response_cache_turns: int = 2,
+            chat_engine: str = "dspy",
+    ):
         """
         Takes user input and generates an llm response and then uses elevenlabs to stream the response as speech.
         :param eleven_labs_voice_id:
+        :param streaming: Stream the llm response and start speaking each sentence as soon as it is
+            complete, instead of waiting for the whole response.
+        :param tts_cache: Reuse previously synthesized audio for lines the pirate has said before.
+        :param output_engine: Play speech through the shared in-process audio output instead of
+            an mpv player per response.
+        :param output_format: ElevenLabs output format, e.g. "pcm_24000" or "mp3_22050_32". The output
+            engine only takes raw PCM, which is played as it streams and resampled to the engine's
+            rate if needed, while mpv without an engine only takes MP3. Defaults to PCM at the
+            engine's rate.
+        :param fillers: Play a short in-character filler ("Arr, let me think on that...") through the
+            output engine if the response has not started playing soon after the user stops talking.
+        :param response_cache: Answer questions visitors ask over and over from earlier answers
+            instead of calling the llm.
+        :param response_cache_turns: Only use the response cache for this many opening turns of a
+            conversation, before answers come to depend on what was said earlier.
+        :param chat_engine: "dspy" to generate responses with the PirateChatBot dspy program, or "fast"
+            to send the same persona straight to the llm with FastPirateChat, skipping dspy's
+            prompt formatting and output parsing.
         """
         self.llm = LLMHandler()
-        self.pirate_chatbot = PirateChatBot()
+        if chat_engine not in ("dspy", "fast"):
+            logger.warning(f"Unknown chat engine {chat_engine} - using dspy")
+        self.pirate_chatbot = FastPirateChat() if chat_engine == "fast" else PirateChatBot()
         self.eleven_labs_voice_id = eleven_labs_voice_id
         self.eleven_labs_client = ElevenLabs(api_key=eleven_labs_key)
+        self.voice_settings = dict(
+            stability=0.5,  # A balanced setting for natural but consistent voice
+            similarity_boost=0.75,
+            style=0.0,
+            use_speaker_boost=True,
+            speed=1.0,
+        )
+        self.tts_cache = tts_cache
+        self.retry_policy = RetryPolicy()
+        # Fail fast to silence or the fallback line while a provider is down
+        self.tts_breaker = CircuitBreaker("ElevenLabs")
+        self.chat_breaker = CircuitBreaker("Pirate chat")
+        self.output_engine = output_engine
+        # Sizes the speech prebuffer from how bursty the TTS stream has been
+        self.jitter_buffer = JitterBuffer(sample_rate=output_engine.sample_rate) if output_engine else None
+        # The output engine takes raw PCM at its own rate, so by default no decoding is needed
+        default_format = f"pcm_{output_engine.sample_rate}" if output_engine else TTS_OUTPUT_FORMAT
+        self.output_format = output_format or default_format
+        self.output_codec, self.output_rate = parse_output_format(self.output_format)
+        # An MP3 would have to arrive in full before it could be decoded, delaying speech and barge-in
+        if self.output_codec != ("pcm" if output_engine else "mp3"):
+            logger.warning(f"Can't play {self.output_format} here - using {default_format}")
+            self.output_format = default_format
+            self.output_codec, self.output_rate = parse_output_format(default_format)
         self.conversation_history = []
+        # Older turns are folded into a summary so the prompt stops growing
+        self.history_window = HistoryWindow(self.pirate_chatbot.asummarize)
+        self.streaming = streaming
+        self.speculator = SpeculativeGenerator(self.forward)
+        self.prefetcher = TTSPrefetcher(self.synthesize)
+        self.response_cache = response_cache
+        self.response_cache_turns = response_cache_turns
+        self.filler = None
+        if fillers and output_engine:
+            self.filler_pool = FillerPool()
+            self.filler = FillerPlayer(output_engine, self.filler_pool)
+            # Rendered once in the background; the TTS cache makes later startups instant
+            threading.Thread(
+                target=self.filler_pool.render, args=(FILLER_LINES, self.render_pcm), daemon=True).start()
         self.interrupt_lock = False  # A lock to ignore user conversation while agent is speaking
+        # Set when the visitor talks over the current response
+        self.interrupted = threading.Event()
+        self.speaking = False
+        self.spoken_text: Optional[SpokenText] = None
+
+    def synthesize(self, text: str) -> Optional[Iterator[bytes]]:
+        """
+        Requests speech for text from ElevenLabs, retrying on errors.
+
+        Returns:
+            An iterator of audio bytes as they arrive, or None if every attempt failed.
+        """
+        cache_key = None
+        if self.tts_cache:
+            cache_key = self.tts_cache.key(
+                self.eleven_labs_voice_id, text, TTS_MODEL, self.output_format, self.voice_settings)
+            cached = self.tts_cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Playing speech from the TTS cache")
+                return self.tts_cache.stream(cached)
+
+        logger.debug("Converting to speech")
 
-        # Initialize audio playback components
-        self.audio_player = pyaudio.PyAudio()
+        def request():
+            # Perform the text-to-speech conversion. The stream is lazy, so nothing is requested
+            # until it is read; priming it raises connection and HTTP errors here to be retried.
+            return prime(self.eleven_labs_client.generate(
+                voice=self.eleven_labs_voice_id,
+                model=TTS_MODEL,
+                optimize_streaming_latency=3,
+                output_format=self.output_format,
+                text=text,
+                stream=True,
+                voice_settings=VoiceSettings(**self.voice_settings),
+            ))
+
+        try:
+            response = self.retry_policy.call(request, self.tts_breaker, "ElevenLabs request")
+        except CircuitOpenError:
+            logger.warning("ElevenLabs is unavailable - pirate voice is silent")
+            return None
+        except Exception:
+            logger.exception("Could not generate speech - pirate voice is silent")
+            return None
+        # A stream that breaks part way still counts against the service
+        response = self.tts_breaker.guard(response)
+        if self.tts_cache:
+            return self.tts_cache.record(cache_key, response)
+        return response
 
     def text_to_speech_stream(self, text: str) -> bytes:
         """
         Convert text to speech using ElevenLabs API and return a stream of audio bytes.
         """
-        logger.debug("Converting to speech")
-        max_retries = 3
-        
-        for attempt in range(max_retries):
+        response = self.synthesize(text)
+        if response is None:
+            return None
+        spoken_text = SpokenText()
+        spoken_text.start(text)
+        return self.play(response, spoken_text)
+
+    def render_pcm(self, text: str) -> Optional[bytes]:
+        """Synthesizes text to a complete PCM clip at the output engine's rate"""
+        response = self.synthesize(text)
+        if response is None:
+            return None
+        return b"".join(self._engine_audio(response))
+
+    def play(self, audio: Iterable[bytes], spoken_text: Optional[SpokenText] = None):
+        """
+        Plays synthesized audio and waits for it to finish.
+
+        Args:
+            audio: The synthesized audio.
+            spoken_text: Tracks how much of the response was played, in case it is interrupted.
+        """
+        if self.output_engine:
+            if self.interrupted.is_set():
+                # The visitor talked over the filler before the pirate said anything
+                return None
+            fade_in_ms, on_start = 0, None
+            if self.filler:
+                # Crossfade from a filler that is still playing into the response
+                fade_in_ms = self.filler.crossfade_ms if self.filler.is_playing else 0
+                on_start = self.filler.response_started
+            audio = self._engine_audio(audio)
+            if spoken_text:
+                self.spoken_text = spoken_text
+                audio = spoken_text.count(audio)
+            self.speaking = True
             try:
-                # Perform the text-to-speech conversion
-                response = self.eleven_labs_client.generate(
-                    voice=self.eleven_labs_voice_id,
-                    optimize_streaming_latency=3,
-                    output_format="mp3_22050_32",
-                    text=text,
-                    stream=True,
-                    voice_settings=VoiceSettings(
-                        stability=0.5,  # A balanced setting for natural but consistent voice
-                        similarity_boost=0.75,
-                        style=0.0,
-                        use_speaker_boost=True,
-                        speed=1.0,
-                    ),
-                )
-                return stream(response)
-            except Exception as e:
-                logger.warning(f"ElevenLabs API error (attempt {attempt + 1}/{max_retries}) {e}")
-                if attempt == max_retries - 1:
-                    logger.exception("Could not generate speech - pirate voice is silent")
-                    return None
-                import time
-                time.sleep(1)
+                voice = self.output_engine.play_stream(
+                    audio, name="speech", jitter_buffer=self.jitter_buffer,
+                    fade_in_ms=fade_in_ms, on_start=on_start)
+            finally:
+                self.speaking = False
+            if spoken_text and voice:
+                spoken_text.played_bytes = voice.played_bytes
+            return voice
+        return stream(audio)
+
+    @property
+    def is_speaking(self) -> bool:
+        """Whether the pirate's speech, or a filler, is playing through the output engine"""
+        return self.speaking or bool(self.filler and self.filler.is_playing)
+
+    def _engine_audio(self, audio: Iterable[bytes]) -> Iterable[bytes]:
+        """Converts synthesized audio to PCM at the output engine's rate"""
+        engine_rate = self.output_engine.sample_rate
+        if self.output_rate != engine_rate:
+            return StreamingResampler(self.output_rate, engine_rate).stream(audio)
+        return audio
+
+    def speak(self, segments: Iterable[str]) -> bytes:
+        """
+        Speaks text segments in order. The next few segments are synthesized while the current
+        one plays, and all of the audio plays through a single stream so there are no gaps
+        from restarting the player between segments.
+        """
+        spoken_text = SpokenText()
+
+        def on_segment(text: str):
+            spoken_text.start(text)
+            if self.jitter_buffer:
+                self.jitter_buffer.start_segment()
+
+        return self.play(self.prefetcher.audio(segments, on_segment=on_segment), spoken_text)
+
+    def interrupt(self):
+        """
+        Stops the response the visitor has started talking over. The turn ends as soon as the
+        speech has faded out, and only the part the visitor heard is kept in the history.
+        """
+        self.interrupted.set()
+        self.cancel_speech()
+
+    def _heard(self, pirate_response: str) -> str:
+        """Cuts an interrupted response back to what was played before the interruption"""
+        if not self.interrupted.is_set():
+            return pirate_response
+        heard = self.spoken_text.heard() if self.spoken_text else ""
+        logger.info(f"✋ Interrupted after: {heard}")
+        return f"{heard}..."
+
+    def cancel_speech(self):
+        """Abandons the current response, cancelling speech that has not been synthesized yet"""
+        self.prefetcher.cancel()
+        if self.filler:
+            self.filler.disarm()
+        if self.output_engine:
+            self.output_engine.stop_all(name="speech")
+
+    def stream_response(self, user_description: str, user_response: str) -> str:
+        """
+        Streams the pirate response from the llm and speaks it a sentence at a time as it arrives.
+
+        Returns:
+            The full text of the response.
+        """
+        start = time.perf_counter()
+
+        def request():
+            # Waits for the first token, so a provider that is down fails here to be retried
+            return prime(self.pirate_chatbot.stream(
+                history=self.history_window.window(self.conversation_history),
+                user_prompt=user_response,
+                user_description=user_description,
+            ))
+
+        tokens = self.chat_breaker.guard(self.retry_policy.call(request, self.chat_breaker, "Pirate chat stream"))
+        spoken = []
+
+        def segments():
+            try:
+                for segment in SentenceSegmenter().segment(tokens):
+                    if not spoken:
+                        logger.debug(f"First sentence ready after {time.perf_counter() - start:.2f} seconds")
+                    logger.info(f"Pirate says: {segment}")
+                    spoken.append(segment)
+                    yield segment
+            except Exception:
+                if not spoken:
+                    raise
+                logger.exception("Response stream failed part way through")
+
+        self.speak(segments())
+        return " ".join(spoken)
 
     def update_conversational_history(self, user_response: str, assistant_response: str):
         """
@@ -65,32 +303,113 @@ class LLMSpeechResponder:
         logger.debug("Updating conversational history")
         self.conversation_history.append({"role": "user", "content": user_response})
         self.conversation_history.append({"role": "assistant", "content": assistant_response})
+        self.history_window.update(self.conversation_history)
+
+    def forward(self, history: list[dict], user_prompt: str, user_description: str = "") -> str:
+        """
+        Generates the pirate response, sending only the recent history and a summary of the rest.
+        """
+        return self.retry_policy.call(lambda: self.pirate_chatbot.forward(
+            history=self.history_window.window(history),
+            user_prompt=user_prompt,
+            user_description=user_description,
+        ), self.chat_breaker, "Pirate chat")
+
+    def _cacheable(self) -> bool:
+        """Whether this turn's answer can be shared with other visitors"""
+        return self.response_cache is not None and len(self.conversation_history) < 2 * self.response_cache_turns
+
+    def _cached_response(self, user_description: str, user_response: str) -> Optional[str]:
+        """
+        Looks the question up in the response cache. A question cached with only a few answers
+        gets another written in the background, so repeat visitors hear some variety.
+        """
+        if not self._cacheable():
+            return None
+        pirate_response = self.response_cache.get(user_response, user_description)
+        if pirate_response is not None and self.response_cache.wants_variant(user_response, user_description):
+            threading.Thread(
+                target=self._add_variant, args=(user_description, user_response), daemon=True).start()
+        return pirate_response
+
+    def _add_variant(self, user_description: str, user_response: str):
+        try:
+            pirate_response = self.forward(history=[], user_prompt=user_response, user_description=user_description)
+        except Exception:
+            logger.exception("Could not write another cached answer")
+            return
+        self.response_cache.put(user_response, pirate_response, user_description)
+
+    def _remember(self, user_description: str, user_response: str, pirate_response: str):
+        """Caches a complete answer so the next visitor to ask the same thing gets it straight away"""
+        if self._cacheable() and pirate_response and not self.interrupted.is_set():
+            self.response_cache.put(user_response, pirate_response, user_description)
+
+    def speculate(self, user_description: str, partial_response: str):
+        """
+        Starts generating a response from a partial transcript, to be reused by generate if the
+        final transcript matches.
+        """
+        self.speculator.on_partial(partial_response, self.conversation_history, user_description)
+
+    def _fall_back(self, user_response: str):
+        """Speaks the fallback line, so the visitor isn't met with silence when there's no answer"""
+        if not self.interrupted.is_set() and self.spoken_text is None:
+            try:
+                self.text_to_speech_stream(FALLBACK_RESPONSE)
+            except Exception:
+                logger.exception("Could not speak the fallback response")
+        self.update_conversational_history(user_response, FALLBACK_RESPONSE)
 
     def generate(self, user_description: str, user_response: str):
         logger.debug(f"Generating response for user input: {user_response}")
 
+        self.interrupted.clear()
+        self.spoken_text = None
+        if self.filler:
+            self.filler.arm()
         try:
             start = time.time()
-            # Get response from pirate chatbot
-            pirate_response = self.pirate_chatbot.forward(
-                history=self.conversation_history,
-                user_prompt=user_response,
-                user_description=user_description,
-            )
+            # A question visitors ask all the time is answered without the llm
+            pirate_response = self._cached_response(user_description, user_response)
+            if pirate_response is not None:
+                self.speculator.cancel()
+            else:
+                # Reuse a speculative response if one was started on a matching partial transcript
+                pirate_response = self.speculator.take(user_response, self.conversation_history, user_description)
+                if pirate_response is None and self.streaming:
+                    pirate_response = self.stream_response(user_description, user_response)
+                    end = time.time()
+                    logger.debug(f"Streamed pirate response took {end-start} seconds")
+                    self._remember(user_description, user_response, pirate_response)
+                    self.update_conversational_history(user_response, self._heard(pirate_response))
+                    return
+
+                if pirate_response is None:
+                    # Get response from pirate chatbot
+                    pirate_response = self.forward(
+                        history=self.conversation_history,
+                        user_prompt=user_response,
+                        user_description=user_description,
+                    )
+                self._remember(user_description, user_response, pirate_response)
             end = time.time()
             logger.debug(f"Pirate response took {end-start} seconds")
             logger.info(f"Pirate responds: {pirate_response}")
 
             # Convert the response to speech and get the audio stream
-            # microphone_stream.mute()
             audio_stream = self.text_to_speech_stream(pirate_response)
-            if audio_stream is None:
+            if audio_stream is None and not self.interrupted.is_set():
                 logger.warning("Speech generation failed - continuing without audio")
-            # microphone_stream.unmute()
-            
+
             # Update conversation history
-            self.update_conversational_history(user_response, pirate_response)
+            self.update_conversational_history(user_response, self._heard(pirate_response))
+        except CircuitOpenError:
+            logger.warning(f"{self.chat_breaker.name} is unavailable - using the fallback response")
+            self._fall_back(user_response)
         except Exception:
             logger.exception("Error in generate method")
-            fallback_response = "Arr, something went wrong with me voice, matey!"
-            self.update_conversational_history(user_response, fallback_response)
+            self._fall_back(user_response)
+        finally:
+            if self.filler:
+                self.filler.disarm()
@@ -1,32 +1,74 @@
-import noisereduce as nr
-import numpy as np
 import assemblyai as aai
 
 import pyaudio
-from array import array
 from typing import Optional
 from loguru import logger
 
+from agenticanimatronics.echo_cancellation import EchoCanceller
+from agenticanimatronics.half_duplex import HalfDuplexGate
+from agenticanimatronics.ring_buffer import PreRollBuffer, SPSCRingBuffer
+from agenticanimatronics.spectral_noise_gate import SpectralNoiseGate
+from agenticanimatronics.voice_activity import VoiceActivityDetector
+
 
 class MutableMicrophoneStream:
-    def __init__(self, sample_rate: int = 44_100, device_index: Optional[int] = None, threshold: int = 500):
+    def __init__(
+            self,
+            sample_rate: int = 44_100,
+            device_index: Optional[int] = None,
+            threshold: int = 200,
+            hangover_ms: int = 300,
+            pre_roll_ms: int = 300,
+            use_callback: bool = False,
+            ring_ms: int = 2000,
+            read_timeout_ms: int = 200,
+            echo_canceller: Optional[EchoCanceller] = None,
+            gate: Optional[HalfDuplexGate] = None,
+    ):
         """
         Creates a stream of audio from the microphone.
 
         Args:
             sample_rate: The sample rate to record audio at.
             device_index: The index of the input device to use. If None, uses the default device.
-            threshold: The threshold input to send audio
+            threshold: The minimum RMS level to send audio. The voice activity detector raises the
+                threshold above this as the room gets louder.
+            hangover_ms: How long to keep sending audio after speech dips below the threshold.
+            pre_roll_ms: How much audio from before speech starts to send ahead of the first
+                voiced chunk, so soft onsets are not clipped by the threshold gate.
+            use_callback: Capture with a PortAudio callback that writes into a ring buffer instead
+                of blocking reads, so downstream stalls do not overflow the device buffer.
+            ring_ms: How much audio the callback ring buffer can hold before it overruns.
+            read_timeout_ms: In callback mode, the longest a read waits for audio before returning
+                silence and counting an underrun.
+            echo_canceller: Removes the pirate's own voice from the audio before the speech gate,
+                so the microphone can stay open while he talks.
+            gate: Produces silence instead of audio while the gate is closed, e.g. while the
+                pirate's voice is playing.
         """
         self._pyaudio = pyaudio.PyAudio()
         logger.info(f"connecting to default device {self._pyaudio.get_default_input_device_info()}")
         self.sample_rate = sample_rate
         self.is_muted = False
-        self.threshold = threshold
+        self.echo_canceller = echo_canceller
+        self.gate = gate
 
         # Reduce chunk size to prevent buffer overflow
         self._chunk_size = int(self.sample_rate * 0.05)  # 50ms instead of 100ms
 
+        self.vad = VoiceActivityDetector(
+            sample_rate=sample_rate,
+            chunk_size=self._chunk_size,
+            threshold=threshold,
+            hangover_ms=hangover_ms,
+        )
+        self._pre_roll = PreRollBuffer(int(sample_rate * pre_roll_ms / 1000) * 2)
+        self._in_speech = False
+
+        self.input_overflows = 0
+        self.read_timeout = read_timeout_ms / 1000
+        self._ring = SPSCRingBuffer(int(sample_rate * ring_ms / 1000) * 2) if use_callback else None
+
         self._stream = self._pyaudio.open(
             format=pyaudio.paInt16,
             channels=1,
@@ -36,13 +78,54 @@ class MutableMicrophoneStream:
             input_device_index=device_index,
             # Add these parameters to help prevent overflow
             start=False,  # Don't start immediately
-            stream_callback=None,
+            stream_callback=self._on_audio if use_callback else None,
         )
 
         # Start the stream after creation
         self._stream.start_stream()
         self._open = True
 
+    @property
+    def threshold(self):
+        """The minimum RMS level to send audio"""
+        return self.vad.threshold
+
+    @threshold.setter
+    def threshold(self, value):
+        self.vad.threshold = value
+
+    @property
+    def overruns(self):
+        """Chunks the capture callback dropped because the ring buffer was full"""
+        return self._ring.overruns if self._ring else 0
+
+    @property
+    def underruns(self):
+        """Reads that timed out waiting for the capture callback and were padded with silence"""
+        return self._ring.underruns if self._ring else 0
+
+    def _on_audio(self, in_data, frame_count, time_info, status_flags):
+        """
+        PortAudio capture callback. Runs on the audio thread, so it only copies into the ring.
+        """
+        if status_flags & pyaudio.paInputOverflow:
+            self.input_overflows += 1
+        self._ring.write(in_data)
+        return None, pyaudio.paContinue
+
+    def read(self, timeout: Optional[float] = None) -> bytes:
+        """
+        Reads one raw chunk of audio, bypassing the mute state and speech gate.
+
+        Args:
+            timeout: In callback mode, the longest to wait in seconds before returning silence.
+                Defaults to the stream's read timeout.
+        """
+        if self._ring is not None:
+            return self._ring.read(self._chunk_size * 2, self.read_timeout if timeout is None else timeout)
+        # Use exception_on_overflow=False to handle overflow gracefully
+        return self._stream.read(self._chunk_size, exception_on_overflow=False)
+
     def __iter__(self):
         """
         Returns the iterator object.
@@ -57,9 +140,9 @@ class MutableMicrophoneStream:
             raise StopIteration
 
         try:
-            if not self.is_muted:
-                # Use exception_on_overflow=False to handle overflow gracefully
-                data = self._stream.read(self._chunk_size, exception_on_overflow=False)
+            gated = self.gate is not None and self.gate.is_closed
+            if not self.is_muted and not gated:
+                data = self.read()
 
                 # Check if we got the expected amount of data
                 expected_bytes = self._chunk_size * 2  # 2 bytes per sample for paInt16
@@ -67,16 +150,24 @@ class MutableMicrophoneStream:
                     # Pad with zeros if we didn't get enough data
                     data += b'\x00' * (expected_bytes - len(data))
 
-                data_chunk = array('h', data)
-                vol = max(data_chunk) if data_chunk else 0
+                if self.echo_canceller:
+                    data = self.echo_canceller.process(data)
 
-                if vol >= self.threshold:
+                if self.vad.process(data):
+                    if not self._in_speech:
+                        # Speech just started - send the audio leading up to it first
+                        self._in_speech = True
+                        return self._pre_roll.drain() + data
                     return data
                 else:
+                    self._in_speech = False
+                    self._pre_roll.write(data)
                     return b'\x00' * (self._chunk_size * 2)
             else:
-                # Still read from stream when muted to prevent buffer overflow
-                _ = self._stream.read(self._chunk_size, exception_on_overflow=False)
+                # Still read from stream when muted or gated to prevent buffer overflow
+                _ = self.read()
+                self._in_speech = False
+                self._pre_roll.clear()
                 return b'\x00' * (self._chunk_size * 2)
 
         except KeyboardInterrupt:
@@ -92,6 +183,10 @@ class MutableMicrophoneStream:
         """
         self._open = False
 
+        if getattr(self, '_ring', None):
+            logger.info(f"Microphone ring buffer: {self.overruns} overruns, {self.underruns} underruns, "
+                        f"{self.input_overflows} device overflows")
+
         if hasattr(self, '_stream') and self._stream:
             if self._stream.is_active():
                 self._stream.stop_stream()
@@ -127,13 +222,27 @@ class MutableMicrophoneStream:
 
 
 class NoiseReducedMicrophoneStream:
-    def __init__(self, sample_rate, energy_threshold=0.01):
+    def __init__(self, sample_rate, energy_threshold=0.01, prop_decrease=0.75, n_fft=512):
+        """
+        Creates a stream of microphone audio with background noise removed chunk by chunk.
+
+        Args:
+            sample_rate: The sample rate to record audio at.
+            energy_threshold: Level (as a fraction of full scale) below which a chunk counts as
+                silence and may refresh the learned noise profile.
+            prop_decrease: How much of the noise to remove, between 0 (none) and 1 (all).
+            n_fft: FFT frame size of the noise gate. Output is delayed by this many samples.
+        """
         self.microphone_stream = aai.extras.MicrophoneStream(sample_rate=sample_rate)
         self.sample_rate = sample_rate
-        self.buffer = np.array([])
-        self.buffer_size = int(sample_rate * 0.5)  # 0.5 seconds buffer
         self.energy_threshold = energy_threshold  # Minimum energy threshold
         self.is_muted = False
+        self.noise_gate = SpectralNoiseGate(sample_rate=sample_rate, n_fft=n_fft, prop_decrease=prop_decrease)
+        self.vad = VoiceActivityDetector(
+            sample_rate=sample_rate,
+            chunk_size=int(sample_rate * 0.1),
+            threshold=energy_threshold * 32768,
+        )
 
     def __iter__(self):
         return self
@@ -142,38 +251,11 @@ class NoiseReducedMicrophoneStream:
         # Get audio chunk from microphone
         audio_chunk = next(self.microphone_stream)
 
-        # Convert bytes to numpy array
-        audio_data = np.frombuffer(audio_chunk, dtype=np.int16)
-
-        # Add to buffer
-        self.buffer = np.append(self.buffer, audio_data)
-
-        # Process when buffer is full
-        if len(self.buffer) >= self.buffer_size:
-            # Convert to float32 for noise reduction
-            float_buffer = self.buffer.astype(np.float32) / 32768.0
-
-            # Apply noise reduction
-            # You can tweak these parameters to change the aggressiveness of the noise reduction
-            reduced_noise = nr.reduce_noise(
-                y=float_buffer,
-                sr=self.sample_rate,
-                prop_decrease=0.75,
-                n_fft=1024
-            )
-
-            # Convert back to int16
-            processed_chunk = (reduced_noise * 32768.0).astype(np.int16)
-
-            # Clear buffer but keep a small overlap
-            overlap = 1024
-            self.buffer = self.buffer[-overlap:] if len(self.buffer) > overlap else np.array([])
-
-            # Convert back to bytes
-            return processed_chunk.tobytes() if not self.is_muted else b''
+        # Only let the noise profile drift during silence so speech is never learned as noise
+        is_speech = self.vad.process(audio_chunk)
+        processed_chunk = self.noise_gate.process(audio_chunk, refresh_noise=not is_speech)
 
-        # If buffer not full, return empty bytes
-        return b''
+        return processed_chunk if not self.is_muted else b'\x00' * len(audio_chunk)
 
     def mute(self):
         """Mute the microphone (produce silence)"""
@@ -1,13 +1,27 @@
+import functools
 import multiprocessing
 import threading
-import pyaudio
 import assemblyai as aai
 
+from agenticanimatronics.audio_bus import AudioBus, BLOCK, DROP_OLDEST
+from agenticanimatronics.audio_output import AudioOutputEngine
+from agenticanimatronics.barge_in import BargeInDetector
 from agenticanimatronics.discord_handler import dual_discord_sink
+from agenticanimatronics.echo_cancellation import EchoCanceller
+from agenticanimatronics.endpointing import Endpointer
+from agenticanimatronics.half_duplex import HalfDuplexGate
 from agenticanimatronics.image_analysis import ImageAnalysis
-from agenticanimatronics.initializers import assembly_ai_key, logs_webhook, alerts_webhook
+from agenticanimatronics.initializers import (
+    assembly_ai_key, logs_webhook, alerts_webhook, tts_cache_dir, tts_output_format, audio_output_rate,
+    echo_handling, mic_gate_tail_ms, response_cache_ttl, chat_engine, speculative, transcription_backend,
+)
+from agenticanimatronics.llm import close_shared_event_loop, shared_event_loop
 from agenticanimatronics.mutable_microphone_stream import MutableMicrophoneStream
+from agenticanimatronics.response_cache import ResponseCache
+from agenticanimatronics.transcription import SupervisedTranscriber, Transcript, create_transcriber
+from agenticanimatronics.uplink import UplinkStream
 from agenticanimatronics.llm_speech_responder import LLMSpeechResponder
+from agenticanimatronics.tts_cache import TTSCache
 from agenticanimatronics.idle_mode import IdleMode
 from loguru import logger
 
@@ -18,43 +32,118 @@ class PirateAgent:
     def __init__(
             self,
             eleven_labs_voice_id="Myn1LuZgd2qPMOg9BNtC",
-            image_prompt="Describe the person/people in this image"
+            image_prompt="Describe the person/people in this image",
+            speculative=speculative,
+            transcription_backend=transcription_backend,
+            streaming=True,
+            echo_handling=echo_handling,
     ):
+        """
+        Args:
+            eleven_labs_voice_id: The ElevenLabs voice the pirate speaks with.
+            image_prompt: The prompt used to describe photos of the visitor.
+            speculative: Enable partial transcripts and start generating a response as soon as a
+                partial looks stable, reusing it if the final transcript matches.
+            transcription_backend: "assemblyai" for cloud transcription or "local" to transcribe
+                on this machine with Vosk.
+            streaming: Stream the response from the llm and start speaking its first sentence
+                while the rest is still being generated.
+            echo_handling: How to stop the pirate hearing himself: "cancel" subtracts his voice
+                from the microphone, "gate" closes the microphone while he is speaking (cheaper on
+                the CPU, but he can't be interrupted), and "none" does neither.
+        """
+        self.speculative = speculative
         try:
-            self.transcriber = aai.RealtimeTranscriber(
+            backend_options = {}
+            if transcription_backend == "assemblyai":
+                backend_options["end_utterance_silence_threshold"] = 700
+            self.transcriber = SupervisedTranscriber(
+                functools.partial(
+                    create_transcriber,
+                    transcription_backend,
+                    disable_partial_transcripts=not speculative,
+                    **backend_options,
+                ),
                 sample_rate=16000,
                 on_data=self.on_data,
                 on_error=self.on_error,
                 on_open=self.on_open,
                 on_close=self.on_close,
-                end_utterance_silence_threshold=700,
-                disable_partial_transcripts=True
             )
         except Exception:
             logger.exception("Error initializing transcriber")
             raise
             
         try:
-            self.microphone_stream = MutableMicrophoneStream(sample_rate=16000)
+            self.microphone_stream = MutableMicrophoneStream(sample_rate=16000, use_callback=True)
         except Exception:
             logger.exception("Error initializing microphone")
             logger.error("Make sure your microphone is connected and permissions are granted")
             raise
+
+        # End turns locally as soon as the visitor stops talking, rather than after the server's 700ms
+        self.endpointer = Endpointer(
+            on_endpoint=self.on_endpoint, sample_rate=16000, max_silence_ms=700, vad=self.microphone_stream.vad)
+
+        # Stop the pirate as soon as the visitor starts talking over him
+        self.barge_in = BargeInDetector(
+            on_barge_in=self.on_barge_in, is_speaking=self.pirate_is_speaking, sample_rate=16000)
+        self.barged_in = False
+
+        # Read the microphone once and fan it out. The transcriber holds the microphone back
+        # rather than lose audio; the local detectors skip audio if they ever fall behind.
+        self.audio_bus = AudioBus(self.microphone_stream)
+        self.listeners = {
+            "endpointer": self.endpointer.process,
+            "barge-in": self.barge_in.process,
+        }
+
+        # Only send speech (plus enough trailing silence to end utterances) to AssemblyAI
+        self.uplink = UplinkStream(self.audio_bus.subscribe(BLOCK, name="uplink"), sample_rate=16000)
             
         self.user_transcript = []
         self.pirate_agent_thread = None
+        # What the visitor said while the last response was wrapping up, answered next
+        self.pending_utterance = None
+        self.responding = False
+        self._turn_lock = threading.Lock()
         
-        # Initialize audio playback components
+        # One audio output shared by the pirate's voice and idle sounds
         try:
-            self.audio_player = pyaudio.PyAudio()
+            self.output_engine = AudioOutputEngine(sample_rate=audio_output_rate)
+            self.output_engine.start()
         except Exception:
-            logger.exception("Error initializing audio player")
-            self.audio_player = None
+            logger.exception("Error initializing audio output - falling back to mpv and pygame")
+            self.output_engine = None
+
+        # Keep the pirate from hearing himself, going by what the speaker is actually playing
+        self.echo_canceller = None
+        self.mic_gate = None
+        if self.output_engine and echo_handling == "cancel":
+            self.echo_canceller = EchoCanceller(
+                self.output_engine.reference_tap(),
+                sample_rate=16000,
+                reference_rate=self.output_engine.sample_rate,
+            )
+            self.microphone_stream.echo_canceller = self.echo_canceller
+        elif self.output_engine and echo_handling == "gate":
+            self.mic_gate = HalfDuplexGate(self.output_engine, tail_ms=mic_gate_tail_ms)
+            self.microphone_stream.gate = self.mic_gate
             
-        self.skipped_pirate_audio = True  # this ensures the last audio from the pirate isn't picked up
-        
         try:
-            self.pirate_agent = LLMSpeechResponder(eleven_labs_voice_id=eleven_labs_voice_id)
+            self.tts_cache = TTSCache(tts_cache_dir)
+            # Shared by every visitor, so it is kept across dialog restarts
+            self.response_cache = ResponseCache(ttl_seconds=response_cache_ttl) if response_cache_ttl > 0 else None
+            self.pirate_agent = LLMSpeechResponder(
+                eleven_labs_voice_id=eleven_labs_voice_id,
+                streaming=streaming,
+                tts_cache=self.tts_cache,
+                output_engine=self.output_engine,
+                output_format=tts_output_format if self.output_engine else None,
+                fillers=True,
+                response_cache=self.response_cache,
+                chat_engine=chat_engine,
+            )
         except Exception:
             logger.exception("Error initializing speech responder")
             raise
@@ -70,7 +159,7 @@ class PirateAgent:
         self.running = True
         
         # Idle mode
-        self.idle_mode = IdleMode()
+        self.idle_mode = IdleMode(output_engine=self.output_engine)
         self.in_idle_mode = False
         
         # Photo update system
@@ -79,10 +168,10 @@ class PirateAgent:
         self.photo_update_running = False
 
     @staticmethod
-    def on_open(session_opened: aai.RealtimeSessionOpened):
-        logger.info("Session ID:", session_opened.session_id)
+    def on_open(session_id: str):
+        logger.info(f"Session ID: {session_id}")
 
-    def on_data(self, transcript: aai.RealtimeTranscript):
+    def on_data(self, transcript: Transcript):
         if self.is_paused or self.in_idle_mode:
             return
             
@@ -93,25 +182,80 @@ class PirateAgent:
         if not transcript.text:
             return
 
-        if isinstance(transcript, aai.RealtimeFinalTranscript):
-            # Create a thread for pirate response
-            if not self.pirate_agent_thread or not self.pirate_agent_thread.is_alive():
-                self.pirate_agent_thread = threading.Thread(
-                    target=self.pirate_agent.generate,
-                    args=(self.user_description, transcript.text),  # Function arguments
-                    daemon=True  # Optional: makes thread exit when main program exits
-                )
-                self.pirate_agent_thread.start()
-            else:
-                logger.debug("Pirate is still speaking")
+        if transcript.is_final:
+            with self._turn_lock:
+                if not self.responding:
+                    # Create a thread for pirate response
+                    self.responding = True
+                    self.barged_in = False
+                    self.pirate_agent_thread = threading.Thread(
+                        target=self.respond,
+                        args=(transcript.text,),  # Function arguments
+                        daemon=True  # Optional: makes thread exit when main program exits
+                    )
+                    self.pirate_agent_thread.start()
+                elif self.barged_in or not self.pirate_is_audible():
+                    # The pirate was interrupted or has stopped talking, so answer as soon as the turn ends
+                    self.pending_utterance = transcript.text
+                else:
+                    logger.debug("Pirate is still speaking")
             logger.info(f"User said: {transcript.text}")
         else:
             # For partial transcripts
-            logger.info(transcript.text, end="\r")
+            logger.debug(f"Partial: {transcript.text}")
+            if self.speculative and not self.responding:
+                self.pirate_agent.speculate(self.user_description, transcript.text)
+
+    def respond(self, user_response: str):
+        """Answers the visitor, then anything they said while that answer was finishing"""
+        try:
+            while user_response:
+                self.pirate_agent.generate(self.user_description, user_response)
+                with self._turn_lock:
+                    user_response, self.pending_utterance = self.pending_utterance, None
+                    self.responding = bool(user_response)
+                    self.barged_in = False
+        except Exception:
+            with self._turn_lock:
+                self.responding = False
+            raise
+
+    def pirate_is_audible(self) -> bool:
+        """
+        Whether the pirate's voice may still be coming out of the speaker, going by the output's
+        playback clock. Without the output engine there is no clock, so he is assumed to be.
+        """
+        if not self.output_engine:
+            return True
+        return self.output_engine.is_audible(mic_gate_tail_ms)
+
+    def pirate_is_speaking(self) -> bool:
+        """Whether the pirate is talking and can be interrupted"""
+        return bool(self.output_engine) and bool(getattr(self.pirate_agent, "is_speaking", False))
+
+    def on_barge_in(self):
+        """Called when the visitor starts talking over the pirate"""
+        if self.is_paused or self.in_idle_mode:
+            return
+        logger.info("✋ Visitor interrupted the pirate")
+        self.barged_in = True
+        try:
+            self.pirate_agent.interrupt()
+        except Exception:
+            logger.exception("Error interrupting the pirate")
+
+    def on_endpoint(self):
+        """Called by the local endpointer when the visitor has stopped talking"""
+        if self.is_paused or self.in_idle_mode:
+            return
+        try:
+            self.transcriber.force_end_utterance()
+        except Exception:
+            logger.exception("Error forcing end of utterance")
 
     @staticmethod
-    def on_error(error: aai.RealtimeError):
-        logger.error("An error occurred:", error)
+    def on_error(error: Exception):
+        logger.error(f"An error occurred: {error!r}")
 
     @staticmethod
     def on_close():
@@ -219,29 +363,18 @@ class PirateAgent:
         try:
             logger.debug("📸 Taking updated photo for user description")
             
-            # Create a new queue for this photo update
-            photo_queue = multiprocessing.Queue()
-            
-            # Start image analysis process
-            photo_process = multiprocessing.Process(
-                target=self.image_analysis.take_and_analyse_image,
-                args=("", photo_queue),
-                daemon=True
-            )
-            photo_process.start()
+            # Runs on the shared llm event loop, reusing its open connection
+            photo_future = shared_event_loop().submit(self.image_analysis.analyse())
             
             # Wait for result with timeout
             try:
-                new_description = photo_queue.get(timeout=10)
+                new_description = photo_future.result(timeout=10)
                 self.user_description = new_description
                 logger.info(f"📸 Updated user description: {new_description[:50]}...")
             except Exception as e:
-                logger.warning(f"📸 Photo update failed {e} - keeping previous description")
-            
-            # Clean up process
-            if photo_process.is_alive():
-                photo_process.terminate()
-                photo_process.join(timeout=1)
+                # Abandons the request if it is still in flight
+                photo_future.cancel()
+                logger.warning(f"📸 Photo update failed {e!r} - keeping previous description")
                 
         except Exception:
             logger.exception("Error updating user photo")
@@ -257,9 +390,20 @@ class PirateAgent:
         self.image_analysis_thread = None
         self.queue = multiprocessing.Queue()
         self.user_transcript = []
+        # A new visitor has their own speaking rhythm
+        self.endpointer.reset()
+        self.barge_in.reset()
+        self.barged_in = False
+        self.pending_utterance = None
         # Clear conversation history in the speech responder
         if hasattr(self.pirate_agent, 'conversation_history'):
             self.pirate_agent.conversation_history = []
+        if hasattr(self.pirate_agent, 'history_window'):
+            self.pirate_agent.history_window.reset()
+        if hasattr(self.pirate_agent, 'speculator'):
+            self.pirate_agent.speculator.cancel()
+        if hasattr(self.pirate_agent, 'cancel_speech'):
+            self.pirate_agent.cancel_speech()
 
     def transcribe(self):
         """
@@ -276,8 +420,11 @@ class PirateAgent:
             
             self.transcriber.connect()
 
+            self.start_listeners()
+            self.audio_bus.start()
+
             # Start streaming audio from the microphone
-            self.transcriber.stream(self.microphone_stream)
+            self.transcriber.stream(self.uplink)
 
             return ' '.join(self.user_transcript)
         except KeyboardInterrupt:
@@ -287,6 +434,20 @@ class PirateAgent:
             logger.exception("Error in transcribe")
             self.running = False
 
+    def start_listeners(self):
+        """Starts a thread feeding microphone audio from the bus to each local detector"""
+        for name, process in self.listeners.items():
+            subscription = self.audio_bus.subscribe(DROP_OLDEST, name=name)
+            threading.Thread(target=self._listen, args=(subscription, process), daemon=True).start()
+
+    @staticmethod
+    def _listen(subscription, process):
+        try:
+            for chunk in subscription:
+                process(chunk)
+        except Exception:
+            logger.exception(f"Error in {subscription.name} listener")
+
     def cleanup(self):
         """
         Clean up resources when done.
@@ -301,8 +462,28 @@ class PirateAgent:
         except Exception as e:
             logger.info(f"Error closing transcriber: {e}")
         
+        try:
+            self.uplink.log_stats()
+            self.transcriber.log_stats()
+            self.tts_cache.log_stats()
+            if self.response_cache is not None:
+                self.response_cache.log_stats()
+            if self.output_engine:
+                self.pirate_agent.jitter_buffer.log_stats()
+                if self.echo_canceller:
+                    self.echo_canceller.log_stats()
+            if self.speculative:
+                self.pirate_agent.speculator.log_stats()
+            self.pirate_agent.chat_breaker.log_stats()
+            self.pirate_agent.tts_breaker.log_stats()
+            self.image_analysis.llm.breaker.log_stats()
+        except Exception:
+            logger.exception("Error logging stats")
+
         # Close microphone stream
         try:
+            if hasattr(self, 'audio_bus'):
+                self.audio_bus.release()
             if hasattr(self, 'microphone_stream'):
                 self.microphone_stream.close()
         except Exception:
@@ -321,12 +502,12 @@ class PirateAgent:
         except Exception:
             logger.exception("Error stopping photo updates")
             
-        # Terminate audio player
+        # Release the audio output
         try:
-            if hasattr(self, 'audio_player') and self.audio_player:
-                self.audio_player.terminate()
+            if getattr(self, 'output_engine', None):
+                self.output_engine.close()
         except Exception:
-            logger.exception("Error terminating audio player")
+            logger.exception("Error closing audio output")
             
         # Join threads
         try:
@@ -341,6 +522,12 @@ class PirateAgent:
         except Exception:
             logger.exception("Error terminating image analysis")
 
+        # Close the llm connections once nothing else will make a request
+        try:
+            close_shared_event_loop()
+        except Exception:
+            logger.exception("Error closing the llm event loop")
+
 
 # Example usage
 def run_pirate_agent():
@@ -1,5 +1,9 @@
+from typing import AsyncIterator, Iterator, Optional
+
 import dspy
 
+from agenticanimatronics.llm import LLMEventLoop, shared_event_loop
+
 
 class PirateChatBotModule(dspy.Signature):
     """
@@ -41,18 +45,80 @@ class PirateChatBotModule(dspy.Signature):
     pirate_response: str = dspy.OutputField(desc="Captain Boneheart's response from his bone throne in under 50 words")
 
 
+class ConversationSummaryModule(dspy.Signature):
+    """
+    Fold older messages from a conversation between a visitor and Captain Boneheart, a skeleton
+    pirate animatronic, into a running summary. Keep what the captain needs to stay consistent:
+    the visitor's name and anything they shared about themselves, questions already asked and
+    answered, promises made, and running jokes. Drop greetings and filler. Under 80 words.
+    """
+    summary: str = dspy.InputField(desc="Summary of the conversation so far, empty if there is none yet")
+    messages: list[dict] = dspy.InputField(desc="Older messages to fold into the summary, oldest first")
+    updated_summary: str = dspy.OutputField(desc="The summary with the messages folded in, under 80 words")
+
+
 class PirateChatBot(dspy.Module):
-    def __init__(self, model="gemini/gemini-2.5-flash-lite"):
+    def __init__(self, model="gemini/gemini-2.5-flash-lite", event_loop: Optional[LLMEventLoop] = None):
         super().__init__()
-        dspy.settings.configure(lm=dspy.LM(model=model))
+        # Retries are left to the caller's RetryPolicy, so an outage isn't retried at two levels
+        dspy.settings.configure(lm=dspy.LM(model=model, num_retries=0))
+        self._event_loop = event_loop
 
         self.prediction = dspy.Predict(
             PirateChatBotModule
         )
+        self.summary_prediction = dspy.Predict(ConversationSummaryModule)
+        self.streaming_prediction = dspy.streamify(
+            self.prediction,
+            stream_listeners=[dspy.streaming.StreamListener(signature_field_name="pirate_response")],
+            is_async_program=True,
+        )
 
-    def forward(self, history, user_prompt, user_description=""):
-        return self.prediction(
+    @property
+    def event_loop(self) -> LLMEventLoop:
+        """The loop requests run on, the shared one unless another was given"""
+        if self._event_loop is None:
+            self._event_loop = shared_event_loop()
+        return self._event_loop
+
+    async def aforward(self, history, user_prompt, user_description=""):
+        prediction = await self.prediction.acall(
             history=history,
             user_prompt=user_prompt,
             user_description=user_description
-        ).pirate_response
+        )
+        return prediction.pirate_response
+
+    async def astream(self, history, user_prompt, user_description="") -> AsyncIterator[str]:
+        """Async version of stream. Read it on the event loop."""
+        streamed = False
+        async for item in self.streaming_prediction(
+                history=history,
+                user_prompt=user_prompt,
+                user_description=user_description
+        ):
+            if isinstance(item, dspy.streaming.StreamResponse):
+                streamed = True
+                yield item.chunk
+            elif isinstance(item, dspy.Prediction) and not streamed:
+                # Cached responses arrive whole, without any stream chunks
+                yield item.pirate_response
+
+    async def asummarize(self, summary: str, messages: list[dict]) -> str:
+        """Folds older messages into the running conversation summary"""
+        prediction = await self.summary_prediction.acall(summary=summary, messages=messages)
+        return prediction.updated_summary
+
+    def forward(self, history, user_prompt, user_description=""):
+        return self.event_loop.run(self.aforward(history, user_prompt, user_description))
+
+    def stream(self, history, user_prompt, user_description="") -> Iterator[str]:
+        """
+        Generates the pirate response like forward, but yields the text as it streams from the
+        model instead of waiting for all of it.
+        """
+        return self.event_loop.iterate(self.astream(history, user_prompt, user_description))
+
+    def summarize(self, summary: str, messages: list[dict]) -> str:
+        """Folds older messages into the running conversation summary"""
+        return self.event_loop.run(self.asummarize(summary, messages))
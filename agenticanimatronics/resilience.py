@@ -0,0 +1,256 @@
+import asyncio
+import itertools
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Iterable, Iterator, Optional, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+
+def prime(stream: Iterable[T]) -> Iterator[T]:
+    """
+    Reads the first item of a lazy stream straight away, so errors connecting to the service
+    behind it are raised by this call (where they can be retried) instead of when the stream is
+    first read. Returns an iterator over the whole stream.
+    """
+    items = iter(stream)
+    try:
+        first = next(items)
+    except StopIteration:
+        return iter(())
+    return itertools.chain([first], items)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose circuit breaker is open"""
+
+    def __init__(self, name: str):
+        super().__init__(f"{name} circuit is open")
+        self.name = name
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+            self,
+            name: str,
+            failure_threshold: int = 5,
+            reset_timeout: float = 30.0,
+            half_open_probes: int = 1,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Stops calling a service that keeps failing. After `failure_threshold` failures in a row
+        the circuit opens and calls fail straight away, so the pirate goes to his fallback line
+        instead of waiting out retries against a provider that is down.
+
+        After `reset_timeout` the circuit is half open: up to `half_open_probes` calls are let
+        through to test the service. A success closes the circuit again, and a failure opens it
+        for another `reset_timeout`.
+
+        Args:
+            name: The service, for logs.
+            failure_threshold: Failures in a row that open the circuit.
+            reset_timeout: How long the circuit stays open before probing, in seconds.
+            half_open_probes: How many probe calls may be in flight while half open.
+            clock: Returns the current time in seconds.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        """closed, open or half_open"""
+        with self._lock:
+            self._update_state()
+            return self._state
+
+    def _update_state(self):
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+            logger.info(f"🔌 {self.name} circuit half open - probing")
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead. Call record_success or record_failure after it."""
+        with self._lock:
+            self._update_state()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"🔌 {self.name} circuit closed - service is back")
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def abandon(self):
+        """Frees the probe slot of a call that was cancelled before it finished"""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or (
+                    self._state == self.CLOSED and self._failures >= self.failure_threshold):
+                self._state = self.OPEN
+                self._opened_at = self.clock()
+                self.trips += 1
+                logger.warning(f"🔌 {self.name} circuit open after {self._failures} failures - "
+                               f"failing fast for {self.reset_timeout:.0f}s")
+
+    def call(self, func: Callable[[], T]) -> T:
+        """
+        Calls func once through the breaker.
+
+        Raises:
+            CircuitOpenError: The breaker is open, so func was not called.
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+        try:
+            result = func()
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def guard(self, stream: Iterable[T]) -> Iterator[T]:
+        """
+        Passes a stream through, recording a failure if it breaks part way and a success once
+        it has been read to the end.
+        """
+        try:
+            yield from stream
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+
+    def stats(self) -> dict:
+        """Breaker state and counters"""
+        return {
+            "state": self.state,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+    def log_stats(self):
+        """Logs how often the service was cut off"""
+        logger.info(f"🔌 {self.name} circuit: {self.state}, tripped {self.trips} times, "
+                    f"{self.rejected} calls failed fast")
+
+
+class RetryPolicy:
+    def __init__(
+            self,
+            max_attempts: int = 3,
+            initial_backoff: float = 0.25,
+            max_backoff: float = 4.0,
+            multiplier: float = 2.0,
+            jitter: float = 0.5,
+            rng: Optional[random.Random] = None,
+    ):
+        """
+        Retries a failing call with exponential backoff and jitter. Each delay is
+        `initial_backoff * multiplier ** attempt`, capped at `max_backoff`, then scaled down
+        by a random factor of up to `jitter`, so clients that failed together don't all retry
+        at the same moment.
+
+        Args:
+            max_attempts: Attempts in total, including the first.
+            initial_backoff: Delay before the first retry, in seconds.
+            max_backoff: Longest delay between attempts, in seconds.
+            multiplier: How much each delay grows over the last.
+            jitter: Fraction (0-1) of each delay that is randomized.
+            rng: Random source for the jitter.
+        """
+        self.max_attempts = max_attempts
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self._rng = rng or random.Random()
+
+    def backoff(self, attempt: int) -> float:
+        """Delay after the given failed attempt, counting from 0"""
+        delay = min(self.max_backoff, self.initial_backoff * self.multiplier ** attempt)
+        return delay * self._rng.uniform(1 - self.jitter, 1.0)
+
+    def call(self, func: Callable[[], T], breaker: Optional[CircuitBreaker] = None, description: str = "Request") -> T:
+        """
+        Calls func until it succeeds or the attempts run out.
+
+        Raises:
+            CircuitOpenError: The breaker is open, so func was not called.
+            Exception: The last error from func once every attempt has failed.
+        """
+        for attempt in range(self.max_attempts):
+            try:
+                return breaker.call(func) if breaker else func()
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                if attempt == self.max_attempts - 1:
+                    raise
+                delay = self.backoff(attempt)
+                logger.warning(f"{description} failed (attempt {attempt + 1}/{self.max_attempts}) {e} - "
+                               f"retrying in {delay:.2f}s")
+                time.sleep(delay)
+
+    async def acall(
+            self,
+            func: Callable[[], Awaitable[T]],
+            breaker: Optional[CircuitBreaker] = None,
+            description: str = "Request",
+    ) -> T:
+        """Async version of call. func is called for each attempt and its result awaited."""
+        for attempt in range(self.max_attempts):
+            if breaker and not breaker.allow():
+                raise CircuitOpenError(breaker.name)
+            try:
+                result = await func()
+            except asyncio.CancelledError:
+                if breaker:
+                    breaker.abandon()
+                raise
+            except Exception as e:
+                if breaker:
+                    breaker.record_failure()
+                if attempt == self.max_attempts - 1:
+                    raise
+                delay = self.backoff(attempt)
+                logger.warning(f"{description} failed (attempt {attempt + 1}/{self.max_attempts}) {e} - "
+                               f"retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+            else:
+                if breaker:
+                    breaker.record_success()
+                return result
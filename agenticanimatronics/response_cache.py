@@ -0,0 +1,215 @@
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+from loguru import logger
+
+from agenticanimatronics.text_normalization import normalize_utterance
+
+# Words in a photo description that change what the pirate would say. Everything else in the
+# description is ignored, so visitors who look alike share cached answers.
+DESCRIPTION_KEYWORDS = (
+    "pirate", "skeleton", "witch", "wizard", "vampire", "zombie", "ghost", "mummy", "monster",
+    "princess", "prince", "superhero", "cat", "dog", "dinosaur", "clown", "ninja", "robot",
+    "fairy", "mermaid", "dragon", "child", "kid", "adult", "family", "group",
+)
+
+
+def description_bucket(description: str, max_keywords: int = 3) -> str:
+    """
+    Reduces a photo description to a few keywords, e.g. "child witch", so answers written for
+    one visitor are reused for others who look the same to the pirate.
+    """
+    words = set(normalize_utterance(description).split())
+    found = sorted(k for k in DESCRIPTION_KEYWORDS if k in words or f"{k}s" in words)
+    return " ".join(found[:max_keywords])
+
+
+def embed(text: str, dimensions: int = 512) -> np.ndarray:
+    """
+    Embeds text as a unit vector of hashed character trigrams, so transcripts that differ by a
+    word or a transcription slip land close together without an embedding model.
+    """
+    vector = np.zeros(dimensions, dtype=np.float32)
+    padded = f" {normalize_utterance(text)} "
+    for i in range(len(padded) - 2):
+        vector[zlib.crc32(padded[i:i + 3].encode("utf-8")) % dimensions] += 1.0
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+@dataclass
+class CachedAnswers:
+    row: int
+    responses: list[tuple[float, str]] = field(default_factory=list)
+    next: int = 0
+
+
+class ResponseCache:
+    def __init__(
+            self,
+            max_entries: int = 500,
+            ttl_seconds: float = 3600,
+            similarity: float = 0.85,
+            max_variants: int = 3,
+            min_words: int = 3,
+            dimensions: int = 512,
+    ):
+        """
+        Remembers the pirate's answers to the questions visitors ask over and over ("who are
+        you?", "trick or treat!"), so repeats are answered without calling the llm. The cached
+        text is spoken through the TTS cache as usual, so a hit is normally served from disk
+        end to end.
+
+        Answers are keyed by the normalized question and a bucket of keywords from the photo
+        description. A question that misses the exact key is matched against every cached
+        question with the same bucket by cosine similarity of their embeddings, held as rows of
+        one numpy matrix so the search is a single matrix-vector product.
+
+        Each key holds up to `max_variants` answers that are handed out in turn, so the pirate
+        does not repeat himself word for word. Answers expire after `ttl_seconds`, and the least
+        recently used key is evicted once there are `max_entries`.
+
+        Args:
+            max_entries: Most questions to remember.
+            ttl_seconds: How long an answer is reused before it is written afresh.
+            similarity: Cosine similarity (0-1) a question needs to reuse another's answers.
+            max_variants: How many different answers to keep for each question.
+            min_words: Questions shorter than this ("yes", "why?") depend on what was said
+                before, and are never cached.
+            dimensions: Size of the question embeddings.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self.max_variants = max_variants
+        self.min_words = min_words
+        self.dimensions = dimensions
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str], CachedAnswers] = OrderedDict()
+        self._embeddings = np.zeros((max_entries, dimensions), dtype=np.float32)
+        # Bucket of the question in each row, or -1 for a free row
+        self._row_buckets = np.full(max_entries, -1, dtype=np.int64)
+        self._row_keys: list[Optional[tuple[str, str]]] = [None] * max_entries
+        self._free = list(range(max_entries - 1, -1, -1))
+        self._bucket_ids: dict[str, int] = {}
+
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def key(self, utterance: str, description: str = "") -> Optional[tuple[str, str]]:
+        """Returns the cache key for a question, or None if the question is too short to cache"""
+        normalized = normalize_utterance(utterance)
+        if len(normalized.split()) < self.min_words:
+            return None
+        return description_bucket(description), normalized
+
+    def get(self, utterance: str, description: str = "") -> Optional[str]:
+        """Returns the next cached answer to a question, or None on a miss"""
+        key = self.key(utterance, description)
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            similar = False
+            if entry is None or not self._expire(key, entry):
+                key = self._nearest(key)
+                entry = self._entries.get(key) if key else None
+                similar = entry is not None
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            _, response = entry.responses[entry.next % len(entry.responses)]
+            entry.next += 1
+            self.hits += 1
+            self.similar_hits += similar
+        logger.debug(f"📜 Answer from the response cache{' (similar question)' if similar else ''}")
+        return response
+
+    def wants_variant(self, utterance: str, description: str = "") -> bool:
+        """Whether a question is cached with fewer than `max_variants` answers"""
+        key = self.key(utterance, description)
+        with self._lock:
+            entry = self._entries.get(key) if key else None
+            return entry is not None and len(entry.responses) < self.max_variants
+
+    def put(self, utterance: str, response: str, description: str = ""):
+        """Adds an answer to a question, replacing its oldest answer once it has enough variants"""
+        key = self.key(utterance, description)
+        if key is None or not response:
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if not self._free:
+                    self._evict(next(iter(self._entries)))
+                entry = CachedAnswers(row=self._free.pop())
+                self._embeddings[entry.row] = embed(key[1], self.dimensions)
+                self._row_buckets[entry.row] = self._bucket_ids.setdefault(key[0], len(self._bucket_ids))
+                self._row_keys[entry.row] = key
+                self._entries[key] = entry
+            if any(cached == response for _, cached in entry.responses):
+                return
+            entry.responses.append((time.monotonic(), response))
+            if len(entry.responses) > self.max_variants:
+                entry.responses.pop(0)
+            self._entries.move_to_end(key)
+
+    def _nearest(self, key: tuple[str, str]) -> Optional[tuple[str, str]]:
+        """Finds the most similar unexpired question in the same bucket"""
+        bucket = self._bucket_ids.get(key[0])
+        if bucket is None:
+            return None
+        similarities = self._embeddings @ embed(key[1], self.dimensions)
+        similarities[self._row_buckets != bucket] = -1.0
+        while True:
+            row = int(np.argmax(similarities))
+            if similarities[row] < self.similarity:
+                return None
+            nearest = self._row_keys[row]
+            if self._expire(nearest, self._entries[nearest]):
+                return nearest
+            similarities[row] = -1.0
+
+    def _expire(self, key: tuple[str, str], entry: CachedAnswers) -> bool:
+        """Drops stale answers. Returns whether the entry has any left."""
+        cutoff = time.monotonic() - self.ttl_seconds
+        entry.responses = [(created, response) for created, response in entry.responses if created >= cutoff]
+        if entry.responses:
+            return True
+        self._evict(key)
+        return False
+
+    def _evict(self, key: tuple[str, str]):
+        entry = self._entries.pop(key)
+        self._row_buckets[entry.row] = -1
+        self._row_keys[entry.row] = None
+        self._free.append(entry.row)
+
+    def clear(self):
+        """Forgets every cached answer"""
+        with self._lock:
+            for key in list(self._entries):
+                self._evict(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def log_stats(self):
+        """Logs how many llm calls the cache saved"""
+        logger.info(f"📜 Response cache: {self.hits} hits ({self.similar_hits} on similar questions), "
+                    f"{self.misses} misses ({100 * self.hit_rate:.0f}% hit rate), {len(self)} questions")
@@ -0,0 +1,163 @@
+import threading
+import time
+
+import numpy as np
+
+
+class PreRollBuffer:
+    def __init__(self, capacity_bytes: int):
+        """
+        Fixed-size ring of the most recent raw audio, used to recover the start of an utterance
+        that arrived before the speech gate opened.
+
+        Args:
+            capacity_bytes: How many bytes of audio to keep. Older audio is overwritten.
+        """
+        self.capacity = capacity_bytes
+        self._buffer = np.zeros(capacity_bytes, dtype=np.uint8)
+        self._write_pos = 0
+        self._filled = 0
+
+    def __len__(self):
+        return self._filled
+
+    def write(self, data: bytes):
+        """
+        Copies a chunk into the ring, overwriting the oldest audio when full.
+        """
+        if self.capacity == 0:
+            return
+
+        chunk = np.frombuffer(data, dtype=np.uint8)
+        if chunk.size >= self.capacity:
+            self._buffer[:] = chunk[-self.capacity:]
+            self._write_pos = 0
+            self._filled = self.capacity
+            return
+
+        end = self._write_pos + chunk.size
+        if end <= self.capacity:
+            self._buffer[self._write_pos:end] = chunk
+        else:
+            split = self.capacity - self._write_pos
+            self._buffer[self._write_pos:] = chunk[:split]
+            self._buffer[:end - self.capacity] = chunk[split:]
+
+        self._write_pos = end % self.capacity
+        self._filled = min(self._filled + chunk.size, self.capacity)
+
+    def drain(self) -> bytes:
+        """
+        Returns the buffered audio oldest first and empties the ring.
+        """
+        if self._filled < self.capacity:
+            start = (self._write_pos - self._filled) % self.capacity if self.capacity else 0
+        else:
+            start = self._write_pos
+
+        if start + self._filled <= self.capacity:
+            out = self._buffer[start:start + self._filled].tobytes()
+        else:
+            out = self._buffer[start:].tobytes() + self._buffer[:self._write_pos].tobytes()
+
+        self.clear()
+        return out
+
+    def clear(self):
+        """Empties the ring without releasing its memory"""
+        self._write_pos = 0
+        self._filled = 0
+
+
+class SPSCRingBuffer:
+    def __init__(self, capacity_bytes: int):
+        """
+        Preallocated single-producer/single-consumer byte ring. The producer (e.g. a PortAudio
+        callback) only advances the write counter and the consumer only advances the read
+        counter, so neither side takes a lock on the data path.
+
+        Args:
+            capacity_bytes: Size of the ring. Writes that do not fit are dropped and counted as
+                overruns rather than blocking the producer.
+        """
+        self.capacity = capacity_bytes
+        self._buffer = np.zeros(capacity_bytes, dtype=np.uint8)
+        self._read_count = 0
+        self._write_count = 0
+        self._data_ready = threading.Event()
+
+        self.overruns = 0
+        self.underruns = 0
+        self.dropped_bytes = 0
+
+    def available(self) -> int:
+        """Number of bytes waiting to be read"""
+        return self._write_count - self._read_count
+
+    def free(self) -> int:
+        """Number of bytes that can be written without overrunning"""
+        return self.capacity - self.available()
+
+    def write(self, data: bytes) -> int:
+        """
+        Copies data into the ring. Producer side only.
+
+        Returns:
+            The number of bytes written, which is 0 when the chunk did not fit.
+        """
+        size = len(data)
+        if size > self.free():
+            self.overruns += 1
+            self.dropped_bytes += size
+            return 0
+
+        chunk = np.frombuffer(data, dtype=np.uint8)
+        start = self._write_count % self.capacity
+        end = start + size
+        if end <= self.capacity:
+            self._buffer[start:end] = chunk
+        else:
+            split = self.capacity - start
+            self._buffer[start:] = chunk[:split]
+            self._buffer[:end - self.capacity] = chunk[split:]
+
+        # Publish only after the bytes are in place
+        self._write_count += size
+        self._data_ready.set()
+        return size
+
+    def _take(self, size: int) -> bytes:
+        start = self._read_count % self.capacity
+        end = start + size
+        if end <= self.capacity:
+            out = self._buffer[start:end].tobytes()
+        else:
+            out = self._buffer[start:].tobytes() + self._buffer[:end - self.capacity].tobytes()
+        self._read_count += size
+        return out
+
+    def read(self, size: int, timeout: float | None = None) -> bytes:
+        """
+        Reads exactly `size` bytes. Consumer side only.
+
+        Blocks for at most `timeout` seconds (forever if None). If the producer has not
+        delivered enough audio by then, whatever is available is returned padded with
+        silence and the read is counted as an underrun, so callers get bounded latency.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.available() < size:
+            self._data_ready.clear()
+            if self.available() >= size:
+                break
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                self.underruns += 1
+                partial = self._take(min(self.available(), size))
+                return partial + b'\x00' * (size - len(partial))
+            self._data_ready.wait(remaining)
+
+        return self._take(size)
+
+    def clear(self):
+        """Discards everything waiting to be read. Consumer side only."""
+        self._read_count = self._write_count
@@ -0,0 +1,79 @@
+import re
+from typing import Iterable, Iterator, Optional
+
+# Words ending in a full stop that do not end a sentence
+ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "st.", "capt.", "cpt.", "mt.", "vs.", "etc.", "e.g.", "i.e."}
+
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s")
+_CLAUSE_END = re.compile(r"[,;:—–]\s|\s-\s")
+
+
+class SentenceSegmenter:
+    def __init__(self, min_clause_chars: int = 40, max_chars: int = 200):
+        """
+        Cuts streamed LLM text into chunks that can be spoken on their own. Text is cut at the
+        end of each sentence, at a clause break (comma, semicolon, dash) once enough text has
+        built up to be worth speaking, and at a word boundary if a chunk gets too long.
+
+        Args:
+            min_clause_chars: Only cut at a clause break once the chunk is at least this long, so
+                short phrases are not spoken with choppy prosody.
+            max_chars: Cut at the last space if a chunk grows past this with no punctuation.
+        """
+        self.min_clause_chars = min_clause_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def _sentence_cut(self) -> Optional[int]:
+        for match in _SENTENCE_END.finditer(self._buffer):
+            words = self._buffer[:match.start() + 1].split()
+            if words and words[-1].lower() in ABBREVIATIONS:
+                continue
+            return match.end()
+        return None
+
+    def _clause_cut(self) -> Optional[int]:
+        for match in _CLAUSE_END.finditer(self._buffer):
+            if match.end() >= self.min_clause_chars:
+                return match.end()
+        return None
+
+    def _length_cut(self) -> Optional[int]:
+        if len(self._buffer) <= self.max_chars:
+            return None
+        space = self._buffer.rfind(" ", 0, self.max_chars)
+        return space + 1 if space > 0 else self.max_chars
+
+    def _next_cut(self) -> Optional[int]:
+        cuts = [cut for cut in (self._sentence_cut(), self._clause_cut(), self._length_cut()) if cut]
+        return min(cuts) if cuts else None
+
+    def feed(self, text: str) -> list[str]:
+        """
+        Adds streamed text.
+
+        Returns:
+            The chunks completed by this text, in order.
+        """
+        self._buffer += text
+        chunks = []
+        while (cut := self._next_cut()) is not None:
+            chunk = self._buffer[:cut].strip()
+            self._buffer = self._buffer[cut:]
+            if chunk:
+                chunks.append(chunk)
+        return chunks
+
+    def flush(self) -> Optional[str]:
+        """Returns whatever text is left once the stream has ended"""
+        chunk = self._buffer.strip()
+        self._buffer = ""
+        return chunk or None
+
+    def segment(self, tokens: Iterable[str]) -> Iterator[str]:
+        """Yields speakable chunks from a stream of tokens as soon as each one is complete"""
+        for token in tokens:
+            yield from self.feed(token)
+        last = self.flush()
+        if last:
+            yield last
@@ -0,0 +1,179 @@
+import numpy as np
+from loguru import logger
+
+
+class SpectralNoiseGate:
+    def __init__(
+            self,
+            sample_rate: int = 16_000,
+            n_fft: int = 512,
+            prop_decrease: float = 0.75,
+            over_subtraction: float = 1.5,
+            learn_seconds: float = 0.5,
+            refresh_rate: float = 0.02,
+            gain_smoothing: float = 0.5,
+            max_chunk_size: int = 4096,
+    ):
+        """
+        Streaming spectral noise gate. Audio goes through a short-time Fourier transform with
+        50% overlapping square-root Hann windows and is rebuilt by overlap-add, so every chunk
+        comes back the same size it went in with a fixed delay of `n_fft` samples.
+
+        The stationary noise profile is learned from the first `learn_seconds` of audio and can
+        be refreshed slowly afterwards from chunks the caller knows to be silence.
+
+        Args:
+            sample_rate: The sample rate of the incoming audio.
+            n_fft: FFT frame size. The hop is half of this.
+            prop_decrease: How much of the noise to remove, between 0 (none) and 1 (all).
+            over_subtraction: Multiplier on the noise profile when working out the gain.
+            learn_seconds: How much initial audio to average into the noise profile.
+            refresh_rate: How quickly the profile follows new silence after it has been learned.
+            gain_smoothing: How much of the previous frame's gain carries over, to avoid
+                "musical noise" from gains jumping between frames.
+            max_chunk_size: Largest expected chunk in samples, used to preallocate buffers.
+        """
+        self.sample_rate = sample_rate
+        self.n_fft = n_fft
+        self.hop = n_fft // 2
+        self.prop_decrease = prop_decrease
+        self.over_subtraction = over_subtraction
+        self.refresh_rate = refresh_rate
+        self.gain_smoothing = gain_smoothing
+        self.learn_frames = max(1, int(learn_seconds * sample_rate / self.hop))
+
+        bins = n_fft // 2 + 1
+        self._window = np.sqrt(np.hanning(n_fft + 1)[:-1]).astype(np.float32)
+        self._frame = np.zeros(n_fft, dtype=np.float32)
+        self._windowed = np.zeros(n_fft, dtype=np.float32)
+        self._ola = np.zeros(n_fft, dtype=np.float32)
+        self._mag = np.zeros(bins, dtype=np.float32)
+        self._gain = np.ones(bins, dtype=np.float32)
+        self._prev_gain = np.ones(bins, dtype=np.float32)
+        self.noise_profile = np.zeros(bins, dtype=np.float32)
+        self._frames_learned = 0
+
+        # Samples waiting for a full hop, and processed samples waiting to be returned. The
+        # output queue starts with one hop of silence so a full chunk is always available.
+        self._pending = np.zeros(self.hop, dtype=np.float32)
+        self._pending_len = 0
+        self._out_queue = np.zeros(0, dtype=np.float32)
+        self._out_queue_len = self.hop
+        self._allocate(max_chunk_size)
+
+    def _allocate(self, max_chunk_size: int):
+        self.max_chunk_size = max_chunk_size
+        self._in = np.zeros(max_chunk_size, dtype=np.float32)
+        self._out = np.zeros(max_chunk_size, dtype=np.float32)
+        self._out_int16 = np.zeros(max_chunk_size, dtype=np.int16)
+        queued = self._out_queue[:self._out_queue_len]
+        self._out_queue = np.zeros(max_chunk_size + 2 * self.n_fft, dtype=np.float32)
+        self._out_queue[:queued.size] = queued
+
+    @property
+    def is_learned(self) -> bool:
+        """Whether the initial noise profile has been learned"""
+        return self._frames_learned >= self.learn_frames
+
+    def learn_noise(self, data: bytes):
+        """
+        Replaces the noise profile with one measured from a clip of pure background noise.
+        """
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+        frames = [
+            samples[start:start + self.n_fft]
+            for start in range(0, samples.size - self.n_fft + 1, self.hop)
+        ]
+        if not frames:
+            raise ValueError(f"Need at least {self.n_fft} samples to learn a noise profile")
+
+        spectra = np.abs(np.fft.rfft(np.stack(frames) * self._window, axis=1))
+        self.noise_profile[:] = spectra.mean(axis=0)
+        self._frames_learned = self.learn_frames
+        logger.info(f"Learned noise profile from {len(frames)} frames")
+
+    def _update_noise_profile(self, refresh: bool):
+        if not self.is_learned:
+            # Running mean over the initial frames
+            self._frames_learned += 1
+            self.noise_profile += (self._mag - self.noise_profile) / self._frames_learned
+            if self.is_learned:
+                logger.debug(f"Noise profile learned after {self._frames_learned} frames")
+        elif refresh:
+            self.noise_profile += self.refresh_rate * (self._mag - self.noise_profile)
+
+    def _process_frame(self, refresh_noise: bool):
+        np.multiply(self._frame, self._window, out=self._windowed)
+        spectrum = np.fft.rfft(self._windowed)
+        np.abs(spectrum, out=self._mag)
+
+        learned = self.is_learned
+        self._update_noise_profile(refresh_noise)
+
+        if learned:
+            # Spectral subtraction gain, softened by prop_decrease and smoothed over time
+            np.divide(self.noise_profile, self._mag + 1e-9, out=self._gain)
+            self._gain *= -self.over_subtraction
+            self._gain += 1.0
+            np.clip(self._gain, 0.0, 1.0, out=self._gain)
+            self._gain -= 1.0
+            self._gain *= self.prop_decrease
+            self._gain += 1.0
+            self._gain *= 1.0 - self.gain_smoothing
+            self._gain += self.gain_smoothing * self._prev_gain
+            self._prev_gain[:] = self._gain
+            spectrum *= self._gain
+
+        frame_out = np.fft.irfft(spectrum, self.n_fft).astype(np.float32, copy=False)
+        frame_out *= self._window
+        self._ola += frame_out
+
+        # The first hop of the accumulator is now complete
+        end = self._out_queue_len + self.hop
+        self._out_queue[self._out_queue_len:end] = self._ola[:self.hop]
+        self._out_queue_len = end
+        self._ola[:-self.hop] = self._ola[self.hop:]
+        self._ola[-self.hop:] = 0.0
+
+    def process(self, data: bytes, refresh_noise: bool = False) -> bytes:
+        """
+        Removes background noise from a chunk of 16-bit PCM audio.
+
+        Args:
+            data: The chunk to process.
+            refresh_noise: Whether the chunk is known to be silence and can refresh the profile.
+
+        Returns:
+            The processed audio, exactly as many bytes as went in.
+        """
+        samples = np.frombuffer(data, dtype=np.int16)
+        n = samples.size
+        if n > self.max_chunk_size:
+            self._allocate(n)
+
+        chunk = self._in[:n]
+        np.multiply(samples, 1.0 / 32768.0, out=chunk, casting='unsafe')
+
+        pos = 0
+        while pos < n:
+            take = min(self.hop - self._pending_len, n - pos)
+            self._pending[self._pending_len:self._pending_len + take] = chunk[pos:pos + take]
+            self._pending_len += take
+            pos += take
+            if self._pending_len == self.hop:
+                self._frame[:-self.hop] = self._frame[self.hop:]
+                self._frame[-self.hop:] = self._pending
+                self._pending_len = 0
+                self._process_frame(refresh_noise)
+
+        out = self._out[:n]
+        out[:] = self._out_queue[:n]
+        remaining = self._out_queue_len - n
+        self._out_queue[:remaining] = self._out_queue[n:self._out_queue_len]
+        self._out_queue_len = remaining
+
+        out *= 32768.0
+        np.clip(out, -32768, 32767, out=out)
+        out_int16 = self._out_int16[:n]
+        out_int16[:] = out
+        return out_int16.tobytes()
@@ -0,0 +1,208 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from loguru import logger
+
+from agenticanimatronics.text_normalization import normalize_utterance
+
+
+@dataclass
+class Speculation:
+    text: str
+    history_length: int
+    user_description: str
+    future: Future
+    started: float = field(default_factory=time.perf_counter)
+    finished: Optional[float] = None
+
+
+class SpeculativeGenerator:
+    def __init__(
+            self,
+            generate: Callable[..., str],
+            stable_ms: float = 300,
+            min_words: int = 3,
+            max_extra_words: int = 1,
+            result_timeout: float = 30.0,
+    ):
+        """
+        Starts generating a response from partial transcripts before the final one arrives.
+
+        A partial is treated as stable once its words have stayed the same for `stable_ms`.
+        This is timed rather than counted, because not every backend repeats a partial that
+        hasn't changed: Vosk only reports one when its text changes. The speculative response is reused only if the final transcript's words
+        start with exactly the words that were speculated on, so a final that differs by a
+        negation or a name ("is it yours" and "is it not yours") is never answered with the
+        wrong response. Otherwise the speculation is thrown away.
+
+        Cancelling a speculation that has already started does not abort its llm request: it
+        runs to the end in the background and is still billed. At most two run at once.
+
+        Args:
+            generate: Called as generate(history=..., user_prompt=..., user_description=...),
+                e.g. PirateChatBot.forward.
+            stable_ms: How long a partial has to stay the same to count as stable.
+            min_words: Don't speculate on partials shorter than this.
+            max_extra_words: How many words the final transcript may add after the speculated
+                ones and still reuse the speculation.
+            result_timeout: Longest to wait for a matching speculation to finish.
+        """
+        self.generate = generate
+        self.stable_ms = stable_ms
+        self.min_words = min_words
+        self.max_extra_words = max_extra_words
+        self.result_timeout = result_timeout
+
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="speculation")
+        self._lock = threading.Lock()
+        self._current: Optional[Speculation] = None
+        self._last_partial = ""
+        self._timer: Optional[threading.Timer] = None
+
+        self.attempts = 0
+        self.hits = 0
+        self.misses = 0
+        self.time_saved = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of finished turns that reused a speculative response"""
+        decided = self.hits + self.misses
+        return self.hits / decided if decided else 0.0
+
+    def matches(self, final_text: str, speculated: str) -> bool:
+        """Whether a final transcript extends the speculated words by at most `max_extra_words`"""
+        final_words = normalize_utterance(final_text).split()
+        speculated_words = speculated.split()
+        return (final_words[:len(speculated_words)] == speculated_words
+                and len(final_words) - len(speculated_words) <= self.max_extra_words)
+
+    def _run(self, speculation: Speculation, history: list, user_prompt: str) -> str:
+        try:
+            return self.generate(
+                history=history,
+                user_prompt=user_prompt,
+                user_description=speculation.user_description,
+            )
+        finally:
+            speculation.finished = time.perf_counter()
+
+    def _stop_timer(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+    def on_partial(self, text: str, history: list, user_description: str):
+        """
+        Feeds a partial transcript. Once its words have stayed the same for `stable_ms`, a
+        speculative generation starts on it.
+        """
+        normalized = normalize_utterance(text)
+        with self._lock:
+            if normalized == self._last_partial:
+                # Already waiting on, or speculating on, these words
+                return
+
+            self._last_partial = normalized
+            self._stop_timer()
+            if (len(normalized.split()) < self.min_words
+                    or (self._current and self._current.text == normalized)):
+                return
+
+            self._timer = threading.Timer(
+                self.stable_ms / 1000, self._speculate, args=(normalized, list(history), text, user_description))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _speculate(self, normalized: str, history: list, text: str, user_description: str):
+        with self._lock:
+            # A newer partial, a final or a cancel may have come in while the timer fired
+            if (normalized != self._last_partial
+                    or (self._current and self._current.text == normalized)):
+                return
+
+            if self._current:
+                # Only stops it if it hasn't started yet
+                self._current.future.cancel()
+
+            speculation = Speculation(
+                text=normalized,
+                history_length=len(history),
+                user_description=user_description,
+                future=Future(),
+            )
+            speculation.future = self._executor.submit(self._run, speculation, history, text)
+            self._current = speculation
+            self.attempts += 1
+        logger.debug(f"🔮 Speculating on: {text}")
+
+    def take(self, final_text: str, history: list, user_description: str) -> Optional[str]:
+        """
+        Returns the speculative response if it was generated for this final transcript, with the
+        same history and description, or None if the caller has to generate one itself. A
+        speculation that doesn't match is abandoned, but finishes in the background if its
+        request has already started.
+        """
+        with self._lock:
+            speculation = self._current
+            self._current = None
+            self._last_partial = ""
+            self._stop_timer()
+
+        if speculation is None:
+            return None
+
+        arrived = time.perf_counter()
+        if (not self.matches(final_text, speculation.text)
+                or speculation.history_length != len(history)
+                or speculation.user_description != user_description):
+            speculation.future.cancel()
+            self.misses += 1
+            logger.debug(f"🔮 Speculation missed: speculated on \"{speculation.text}\", heard \"{final_text}\"")
+            return None
+
+        try:
+            response = speculation.future.result(timeout=self.result_timeout)
+        except Exception:
+            logger.exception("Speculative generation failed")
+            self.misses += 1
+            return None
+
+        # Time saved is how much of the generation had already happened when the final arrived
+        finished = speculation.finished or arrived
+        saved = max(0.0, min(arrived, finished) - speculation.started)
+        self.hits += 1
+        self.time_saved += saved
+        logger.debug(f"🔮 Speculation hit, saved {saved:.2f}s")
+        return response
+
+    def cancel(self):
+        """
+        Abandons any speculation in flight. A speculation whose request has already started is
+        not aborted; it finishes in the background and its response is discarded.
+        """
+        with self._lock:
+            if self._current:
+                self._current.future.cancel()
+            self._current = None
+            self._last_partial = ""
+            self._stop_timer()
+
+    def stats(self) -> dict:
+        """Speculation counters for tuning how aggressive it is"""
+        return {
+            "attempts": self.attempts,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "time_saved": self.time_saved,
+        }
+
+    def log_stats(self):
+        """Logs a summary of how well speculation is working"""
+        logger.info(f"🔮 Speculation: {self.hits}/{self.hits + self.misses} hits "
+                    f"({100 * self.hit_rate:.0f}%), {self.attempts} attempts, "
+                    f"{self.time_saved:.1f}s saved")
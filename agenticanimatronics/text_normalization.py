@@ -0,0 +1,15 @@
+import re
+
+_PUNCTUATION = re.compile(r"[^\w\s']")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_utterance(text: str) -> str:
+    """
+    Lowercases a transcript and strips punctuation and extra whitespace, so the same words
+    compare equal however the transcriber punctuated them.
+    """
+    if not text:
+        return ""
+    text = _PUNCTUATION.sub(" ", text.lower())
+    return _WHITESPACE.sub(" ", text).strip()
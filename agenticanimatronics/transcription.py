@@ -0,0 +1,430 @@
+import json
+import queue
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+import assemblyai as aai
+from loguru import logger
+
+from agenticanimatronics.initializers import vosk_model_path
+from agenticanimatronics.resilience import RetryPolicy
+
+
+@dataclass
+class Transcript:
+    text: str
+    is_final: bool
+
+
+class TranscriberBackend(ABC):
+    def __init__(
+            self,
+            on_data: Callable[[Transcript], None],
+            on_error: Callable[[Exception], None],
+            on_open: Optional[Callable[[str], None]] = None,
+            on_close: Optional[Callable[[], None]] = None,
+            sample_rate: int = 16_000,
+    ):
+        """
+        A streaming speech to text engine. Audio is pushed in with stream(), and partial and
+        final transcripts come back through on_data as Transcript events.
+
+        Args:
+            on_data: Called with each partial or final transcript.
+            on_error: Called when the engine hits an error.
+            on_open: Called with a session id once the engine is ready for audio.
+            on_close: Called when the session ends.
+            sample_rate: The sample rate of the 16-bit mono audio that will be streamed.
+        """
+        self.on_data = on_data
+        self.on_error = on_error
+        self.on_open = on_open
+        self.on_close = on_close
+        self.sample_rate = sample_rate
+
+    @abstractmethod
+    def connect(self):
+        """Starts a session"""
+
+    @abstractmethod
+    def stream(self, audio: Iterable[bytes]):
+        """Streams audio chunks until the iterable ends or the session closes"""
+
+    @abstractmethod
+    def force_end_utterance(self):
+        """Finalizes the current utterance now instead of waiting for silence"""
+
+    @abstractmethod
+    def close(self):
+        """Ends the session"""
+
+
+class AssemblyAITranscriber(TranscriberBackend):
+    def __init__(
+            self,
+            on_data: Callable[[Transcript], None],
+            on_error: Callable[[Exception], None],
+            on_open: Optional[Callable[[str], None]] = None,
+            on_close: Optional[Callable[[], None]] = None,
+            sample_rate: int = 16_000,
+            end_utterance_silence_threshold: int = 700,
+            disable_partial_transcripts: bool = True,
+    ):
+        """
+        AssemblyAI real-time streaming transcription.
+
+        Args:
+            end_utterance_silence_threshold: Silence in ms after which the server ends an utterance.
+            disable_partial_transcripts: Only send final transcripts.
+        """
+        super().__init__(on_data, on_error, on_open, on_close, sample_rate)
+        self._transcriber = aai.RealtimeTranscriber(
+            sample_rate=sample_rate,
+            on_data=self._on_data,
+            on_error=self.on_error,
+            on_open=self._on_open,
+            on_close=self.on_close,
+            end_utterance_silence_threshold=end_utterance_silence_threshold,
+            disable_partial_transcripts=disable_partial_transcripts
+        )
+
+    def _on_data(self, transcript: aai.RealtimeTranscript):
+        self.on_data(Transcript(
+            text=transcript.text,
+            is_final=isinstance(transcript, aai.RealtimeFinalTranscript),
+        ))
+
+    def _on_open(self, session_opened: aai.RealtimeSessionOpened):
+        if self.on_open:
+            self.on_open(str(session_opened.session_id))
+
+    def connect(self):
+        self._transcriber.connect()
+
+    def stream(self, audio: Iterable[bytes]):
+        self._transcriber.stream(audio)
+
+    def force_end_utterance(self):
+        self._transcriber.force_end_utterance()
+
+    def close(self):
+        self._transcriber.close()
+
+
+class VoskTranscriber(TranscriberBackend):
+    def __init__(
+            self,
+            on_data: Callable[[Transcript], None],
+            on_error: Callable[[Exception], None],
+            on_open: Optional[Callable[[str], None]] = None,
+            on_close: Optional[Callable[[], None]] = None,
+            sample_rate: int = 16_000,
+            model_path: Optional[str] = None,
+            disable_partial_transcripts: bool = True,
+    ):
+        """
+        Offline streaming transcription on the CPU with Vosk, so the prop keeps listening without
+        a network connection. Install with `pip install vosk`.
+
+        Args:
+            model_path: Path to an unpacked Vosk model. Defaults to VOSK_MODEL_PATH from .env.
+                The model is never downloaded at startup, so one of the two must be set.
+            disable_partial_transcripts: Only send final transcripts.
+        """
+        super().__init__(on_data, on_error, on_open, on_close, sample_rate)
+        try:
+            import vosk
+        except ImportError as e:
+            raise ImportError("The local transcriber needs vosk - install it with: pip install vosk") from e
+
+        self._vosk = vosk
+        model_path = model_path or vosk_model_path
+        if not model_path:
+            raise ValueError("The local transcriber needs a Vosk model - download one from "
+                             "https://alphacephei.com/vosk/models and put its folder in .env under VOSK_MODEL_PATH")
+        self._model = vosk.Model(model_path)
+        self.disable_partial_transcripts = disable_partial_transcripts
+        self._recognizer = None
+        self._running = False
+        self._force_end = threading.Event()
+        self._last_partial = ""
+
+    def connect(self):
+        self._recognizer = self._vosk.KaldiRecognizer(self._model, self.sample_rate)
+        self._running = True
+        if self.on_open:
+            self.on_open(f"local-{uuid.uuid4()}")
+
+    def _emit(self, text: str, is_final: bool):
+        if is_final:
+            self._last_partial = ""
+        if text:
+            self.on_data(Transcript(text=text, is_final=is_final))
+
+    def _finalize(self):
+        self._emit(json.loads(self._recognizer.FinalResult()).get("text", ""), True)
+
+    def stream(self, audio: Iterable[bytes]):
+        if self._recognizer is None:
+            raise RuntimeError("connect() must be called before stream()")
+
+        try:
+            for chunk in audio:
+                if not self._running:
+                    break
+
+                # The recognizer is only ever touched from this thread
+                if self._force_end.is_set():
+                    self._force_end.clear()
+                    self._finalize()
+
+                if self._recognizer.AcceptWaveform(bytes(chunk)):
+                    self._emit(json.loads(self._recognizer.Result()).get("text", ""), True)
+                elif not self.disable_partial_transcripts:
+                    partial = json.loads(self._recognizer.PartialResult()).get("partial", "")
+                    if partial != self._last_partial:
+                        self._last_partial = partial
+                        self._emit(partial, False)
+        except Exception as e:
+            logger.exception("Error in local transcriber")
+            self.on_error(e)
+
+    def force_end_utterance(self):
+        self._force_end.set()
+
+    def close(self):
+        self._running = False
+        if self.on_close:
+            self.on_close()
+
+
+def create_transcriber(backend: str, **kwargs) -> TranscriberBackend:
+    """
+    Creates a transcriber by name: "assemblyai" for the cloud service or "local" for Vosk.
+    """
+    backends = {
+        "assemblyai": AssemblyAITranscriber,
+        "local": VoskTranscriber,
+    }
+    if backend not in backends:
+        raise ValueError(f"Unknown transcription backend '{backend}', choose from {sorted(backends)}")
+    return backends[backend](**kwargs)
+
+
+class SupervisedTranscriber(TranscriberBackend):
+    def __init__(
+            self,
+            factory: Callable[..., TranscriberBackend],
+            on_data: Callable[[Transcript], None],
+            on_error: Callable[[Exception], None],
+            on_open: Optional[Callable[[str], None]] = None,
+            on_close: Optional[Callable[[], None]] = None,
+            sample_rate: int = 16_000,
+            replay_seconds: float = 5.0,
+            initial_backoff: float = 0.5,
+            max_backoff: float = 30.0,
+    ):
+        """
+        Keeps a transcription session alive. When the session fails, is closed by the server
+        (e.g. an idle timeout) or stops taking audio, it reconnects with exponential backoff and
+        replays the audio heard since the last final transcript into the new session, so a
+        sentence that was cut off by the outage is not lost.
+
+        Args:
+            factory: Creates a new backend session, called with the callback and sample_rate
+                keyword arguments, e.g. functools.partial(create_transcriber, "assemblyai").
+            replay_seconds: How much recent audio to keep for replay.
+            initial_backoff: Delay before the first reconnect attempt, in seconds.
+            max_backoff: Longest delay between reconnect attempts, in seconds.
+        """
+        super().__init__(on_data, on_error, on_open, on_close, sample_rate)
+        self._factory = factory
+        self.retry_policy = RetryPolicy(initial_backoff=initial_backoff, max_backoff=max_backoff)
+
+        self._max_replay_bytes = int(sample_rate * replay_seconds) * 2
+        self._replay = deque()
+        self._replay_bytes = 0
+        self._replay_lock = threading.Lock()
+
+        self._audio = queue.Queue()
+        self._failed = threading.Event()
+        self._closed = False
+        self._exhausted = False
+        # Identifies the live session, so closes of sessions already given up on are ignored
+        self._generation = 0
+
+        self.reconnects = 0
+        self.outage_seconds = 0.0
+        self.last_outage_seconds = 0.0
+
+        self._session = self._new_session()
+
+    def _new_session(self) -> TranscriberBackend:
+        self._failed.clear()
+        self._generation += 1
+        generation = self._generation
+        return self._factory(
+            on_data=self._on_data,
+            on_error=self._on_error,
+            on_open=self.on_open,
+            on_close=lambda: self._on_close(generation),
+            sample_rate=self.sample_rate,
+        )
+
+    def _on_data(self, transcript: Transcript):
+        if transcript.is_final:
+            # Everything up to here has been transcribed, so it never needs replaying
+            with self._replay_lock:
+                self._replay.clear()
+                self._replay_bytes = 0
+        self.on_data(transcript)
+
+    def _on_error(self, error: Exception):
+        self._failed.set()
+        self.on_error(error)
+
+    def _on_close(self, generation: int):
+        if self._closed:
+            self.on_close()
+        elif generation == self._generation and not self._failed.is_set():
+            # Closed by the server rather than by us, so treat it like an error
+            logger.warning("🔌 Transcription session closed by the server")
+            self._failed.set()
+
+    def _remember(self, chunk: bytes):
+        with self._replay_lock:
+            self._replay.append(chunk)
+            self._replay_bytes += len(chunk)
+            while self._replay_bytes > self._max_replay_bytes:
+                self._replay_bytes -= len(self._replay.popleft())
+
+    def _next_chunk(self, timeout: float) -> Optional[bytes]:
+        """Takes the next live chunk and remembers it for replay, or returns None"""
+        try:
+            chunk = self._audio.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if chunk is None:
+            self._exhausted = True
+            return None
+        self._remember(chunk)
+        return chunk
+
+    def _pump(self, audio: Iterable[bytes]):
+        """Reads the audio source on its own thread so capture never stalls during an outage"""
+        try:
+            for chunk in audio:
+                if self._closed:
+                    break
+                self._audio.put(chunk)
+        except Exception:
+            logger.exception("Error reading audio for transcription")
+        finally:
+            self._audio.put(None)
+
+    def _session_audio(self, replay: list):
+        yield from replay
+        while not (self._failed.is_set() or self._closed or self._exhausted):
+            chunk = self._next_chunk(timeout=0.1)
+            if chunk is not None:
+                yield chunk
+
+    def _backoff(self, attempt: int) -> float:
+        return self.retry_policy.backoff(attempt)
+
+    def _wait(self, seconds: float):
+        """Waits out a backoff delay while still collecting audio for replay"""
+        deadline = time.monotonic() + seconds
+        while not self._closed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if self._exhausted:
+                time.sleep(remaining)
+                return
+            self._next_chunk(timeout=min(0.1, remaining))
+
+    @staticmethod
+    def _discard(session: TranscriberBackend):
+        # Closing a broken session can block on its dead worker threads, so don't wait for it
+        threading.Thread(target=session.close, daemon=True).start()
+
+    def _reconnect(self) -> bool:
+        outage_start = time.monotonic()
+        self._discard(self._session)
+
+        attempt = 0
+        while not self._closed:
+            delay = self._backoff(attempt)
+            logger.warning(f"🔌 Transcription session lost - reconnecting in {delay:.1f}s (attempt {attempt + 1})")
+            self._wait(delay)
+            attempt += 1
+            if self._closed:
+                break
+
+            self._session = self._new_session()
+            try:
+                self._session.connect()
+            except Exception as e:
+                self._on_error(e)
+            if not self._failed.is_set():
+                self.reconnects += 1
+                self.last_outage_seconds = time.monotonic() - outage_start
+                self.outage_seconds += self.last_outage_seconds
+                logger.info(f"🔌 Transcription reconnected after {self.last_outage_seconds:.1f}s, "
+                            f"replaying {self._replay_bytes / (2 * self.sample_rate):.1f}s of audio")
+                return True
+            self._discard(self._session)
+        return False
+
+    def connect(self):
+        self._session.connect()
+
+    def stream(self, audio: Iterable[bytes]):
+        threading.Thread(target=self._pump, args=(audio,), daemon=True).start()
+
+        replay = []
+        while not self._closed:
+            if not self._failed.is_set():
+                try:
+                    self._session.stream(self._session_audio(replay))
+                except Exception as e:
+                    self._on_error(e)
+            if self._closed:
+                break
+            if not self._failed.is_set():
+                if self._exhausted:
+                    break
+                logger.warning("🔌 Transcription session stopped taking audio")
+                self._failed.set()
+            if self._exhausted and not self._replay:
+                # The audio has ended and everything was transcribed, nothing to reconnect for
+                break
+            if not self._reconnect():
+                break
+            with self._replay_lock:
+                replay = list(self._replay)
+
+    def force_end_utterance(self):
+        self._session.force_end_utterance()
+
+    def close(self):
+        self._closed = True
+        self._session.close()
+
+    def stats(self) -> dict:
+        """Reconnection counters"""
+        return {
+            "reconnects": self.reconnects,
+            "outage_seconds": self.outage_seconds,
+            "last_outage_seconds": self.last_outage_seconds,
+        }
+
+    def log_stats(self):
+        """Logs a summary of transcription outages"""
+        logger.info(f"🔌 Transcription: {self.reconnects} reconnects, {self.outage_seconds:.1f}s total outage")
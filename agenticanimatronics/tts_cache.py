@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Iterable, Iterator, Optional
+
+from loguru import logger
+
+
+class TTSCache:
+    def __init__(self, directory: str, max_bytes: int = 200 * 1024 * 1024, read_chunk_size: int = 4096):
+        """
+        On-disk cache of synthesized speech, so lines the pirate says often are played straight
+        from disk instead of going back to ElevenLabs.
+
+        Entries are named by a hash of everything that affects the audio, written atomically
+        (temporary file then rename) so readers in any thread or process never see a partial
+        file, and evicted least recently used first once the cache grows past `max_bytes`.
+
+        Args:
+            directory: Folder to keep the audio in. Created if it does not exist.
+            max_bytes: Total size the cache is trimmed back to after each write.
+            read_chunk_size: Size of the chunks cached audio is played back in.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.read_chunk_size = read_chunk_size
+        self._lock = threading.Lock()
+        self._index: OrderedDict[str, int] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def key(voice_id: str, text: str, model: str, output_format: str, voice_settings: dict) -> str:
+        """Hashes everything that changes the synthesized audio into a cache key"""
+        normalized = " ".join(text.split())
+        identity = json.dumps(
+            [voice_id, normalized, model, output_format, voice_settings],
+            sort_keys=True,
+        )
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.audio")
+
+    def _load_index(self):
+        """Rebuilds the LRU order from the files already on disk, oldest use first"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".audio"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, name[:-len(".audio")], stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+        if entries:
+            logger.info(f"🔈 TTS cache has {len(entries)} lines ({self.size_bytes / 1024:.0f} KB)")
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the cached audio"""
+        return sum(self._index.values())
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Returns the cached audio for a key, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+        except FileNotFoundError:
+            # Never cached, or evicted by another process since
+            with self._lock:
+                self._index.pop(key, None)
+                self.misses += 1
+            return None
+
+        try:
+            # The modification time records recent use for processes that reload the index
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self._index[key] = len(audio)
+            self._index.move_to_end(key)
+            self.hits += 1
+            self.bytes_saved += len(audio)
+        return audio
+
+    def put(self, key: str, audio: bytes):
+        """Stores audio for a key and evicts old entries if the cache is over its size limit"""
+        if not audio:
+            return
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.replace(temp_path, self._path(key))
+        except Exception:
+            logger.exception("Could not write to the TTS cache")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            self._index[key] = len(audio)
+            self._index.move_to_end(key)
+            self._evict()
+
+    def _evict(self):
+        total = self.size_bytes
+        while total > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            total -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def stream(self, audio: bytes) -> Iterator[bytes]:
+        """Plays back cached audio in chunks, the same shape as a live synthesis stream"""
+        for start in range(0, len(audio), self.read_chunk_size):
+            yield audio[start:start + self.read_chunk_size]
+
+    def record(self, key: str, audio: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Passes a live synthesis stream through and caches it once it has been read to the
+        end. Streams that are abandoned part way are not cached.
+        """
+        chunks = []
+        for chunk in audio:
+            chunks.append(chunk)
+            yield chunk
+        self.put(key, b"".join(chunks))
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        """Cache counters"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "bytes_saved": self.bytes_saved,
+            "entries": len(self._index),
+            "size_bytes": self.size_bytes,
+        }
+
+    def log_stats(self):
+        """Logs a summary of how much synthesis the cache saved"""
+        logger.info(f"🔈 TTS cache: {self.hits} hits, {self.misses} misses ({100 * self.hit_rate:.0f}% hit rate), "
+                    f"{self.bytes_saved / 1024:.0f} KB not downloaded")
@@ -0,0 +1,129 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional
+
+from loguru import logger
+
+
+class _Segment:
+    def __init__(self, text: str):
+        self.text = text
+        self.chunks = queue.Queue()
+        self.future = None
+
+
+class TTSPrefetcher:
+    def __init__(self, synthesize: Callable[[str], Optional[Iterable[bytes]]], lookahead: int = 3):
+        """
+        Synthesizes upcoming text segments ahead of playback. Up to `lookahead` segments are
+        requested at once on a small worker pool, and their audio is handed back strictly in
+        order: the segment being played streams through as its bytes arrive, while the ones
+        behind it buffer until their turn, so there is no dead air between segments.
+
+        Args:
+            synthesize: Turns text into an iterable of audio bytes, or None if it failed.
+            lookahead: How many segments may be in flight or buffered ahead of playback.
+        """
+        self.synthesize = synthesize
+        self.lookahead = lookahead
+        self._executor = ThreadPoolExecutor(max_workers=lookahead, thread_name_prefix="tts-prefetch")
+        self._cancelled = threading.Event()
+
+        self.segments = 0
+        self.cancelled_segments = 0
+
+    def _synthesize_into(self, segment: _Segment, cancelled: threading.Event):
+        try:
+            if cancelled.is_set():
+                return
+            audio = self.synthesize(segment.text)
+            for chunk in audio or []:
+                if cancelled.is_set():
+                    break
+                segment.chunks.put(chunk)
+        except Exception:
+            logger.exception(f"Error synthesizing segment: {segment.text}")
+        finally:
+            segment.chunks.put(None)
+
+    @staticmethod
+    def _get(items: queue.Queue, cancelled: threading.Event):
+        """Waits for the next item, giving up with None once the turn is cancelled"""
+        while not cancelled.is_set():
+            try:
+                return items.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def audio(
+            self,
+            segments: Iterable[str],
+            on_segment: Optional[Callable[[str], None]] = None,
+    ) -> Iterator[bytes]:
+        """
+        Yields the audio for each segment in order. Segments are read on a background thread,
+        so a slow source (such as a streaming llm) never holds up playback of what is ready.
+
+        Starting a new turn cancels any previous one, as does closing the returned iterator.
+
+        Args:
+            segments: The text to speak, one segment at a time.
+            on_segment: Called with each segment's text just before its audio is yielded.
+        """
+        self.cancel()
+        cancelled = self._cancelled = threading.Event()
+        ordered = queue.Queue()
+        slots = threading.Semaphore(self.lookahead)
+        errors = []
+
+        def feed():
+            try:
+                for text in segments:
+                    while not slots.acquire(timeout=0.1):
+                        if cancelled.is_set():
+                            return
+                    if cancelled.is_set():
+                        return
+                    segment = _Segment(text)
+                    segment.future = self._executor.submit(self._synthesize_into, segment, cancelled)
+                    self.segments += 1
+                    ordered.put(segment)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                ordered.put(None)
+
+        threading.Thread(target=feed, daemon=True).start()
+
+        try:
+            while (segment := self._get(ordered, cancelled)) is not None:
+                if on_segment:
+                    on_segment(segment.text)
+                while (chunk := self._get(segment.chunks, cancelled)) is not None:
+                    yield chunk
+                slots.release()
+            if errors:
+                raise errors[0]
+        finally:
+            cancelled.set()
+            self._abandon(ordered)
+
+    def _abandon(self, ordered: queue.Queue):
+        while True:
+            try:
+                segment = ordered.get_nowait()
+            except queue.Empty:
+                return
+            if segment is not None and segment.future.cancel():
+                self.cancelled_segments += 1
+
+    def cancel(self):
+        """Abandons the current turn, cancelling any syntheses that have not started"""
+        self._cancelled.set()
+
+    def close(self):
+        """Cancels the current turn and shuts down the worker pool"""
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,104 @@
+from typing import Iterable, Iterator
+
+import numpy as np
+from loguru import logger
+
+
+class UplinkStream:
+    def __init__(
+            self,
+            source: Iterable[bytes],
+            sample_rate: int = 16_000,
+            frame_ms: int = 100,
+            trailing_silence_ms: int = 1500,
+            keepalive_ms: int = 5000,
+    ):
+        """
+        Sits between the microphone and the transcriber. Long runs of silence (muted, idle or
+        below the speech threshold, all of which arrive as zeros) are not sent, and small chunks
+        are combined into larger frames to cut down on websocket messages.
+
+        Args:
+            source: Iterable of 16-bit mono PCM chunks, e.g. an AudioBus subscription.
+            sample_rate: The sample rate of the source audio.
+            frame_ms: Chunks are combined until a frame holds at least this much audio.
+            trailing_silence_ms: How much silence to keep sending after speech. This must be longer
+                than the transcriber's end of utterance silence threshold or utterances never end.
+            keepalive_ms: While suppressing, send one frame of silence after this much audio so
+                the session is not closed for inactivity.
+        """
+        self.source = source
+        self.sample_rate = sample_rate
+        self.frame_bytes = int(sample_rate * frame_ms / 1000) * 2
+        self.trailing_silence_bytes = int(sample_rate * trailing_silence_ms / 1000) * 2
+        self.keepalive_bytes = int(sample_rate * keepalive_ms / 1000) * 2
+
+        self.bytes_in = 0
+        self.bytes_sent = 0
+        self.frames_sent = 0
+        self.chunks_suppressed = 0
+        self.keepalives_sent = 0
+
+        self._frame = bytearray()
+        # Start as if a long silence had already been sent, so startup silence is suppressed
+        self._silence_run = self.trailing_silence_bytes
+        self._suppressed_since_send = 0
+
+    @staticmethod
+    def is_silent(chunk: bytes) -> bool:
+        """Whether a chunk is all zeros, which is how the microphone stream reports silence"""
+        return not np.frombuffer(chunk, dtype=np.uint8).any()
+
+    def _emit(self) -> bytes:
+        frame = bytes(self._frame)
+        self._frame.clear()
+        self.bytes_sent += len(frame)
+        self.frames_sent += 1
+        return frame
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self.source:
+            self.bytes_in += len(chunk)
+            keepalive = False
+
+            if self.is_silent(chunk):
+                self._silence_run += len(chunk)
+                if self._silence_run > self.trailing_silence_bytes:
+                    self._suppressed_since_send += len(chunk)
+                    if self._suppressed_since_send < self.keepalive_bytes:
+                        self.chunks_suppressed += 1
+                        if self._frame:
+                            yield self._emit()
+                        continue
+                    self.keepalives_sent += 1
+                    keepalive = True
+            else:
+                self._silence_run = 0
+
+            self._suppressed_since_send = 0
+            self._frame += chunk
+            if len(self._frame) >= self.frame_bytes or keepalive:
+                yield self._emit()
+
+        if self._frame:
+            yield self._emit()
+
+    def stats(self) -> dict:
+        """Counters describing how much audio was actually sent upstream"""
+        return {
+            "bytes_in": self.bytes_in,
+            "bytes_sent": self.bytes_sent,
+            "frames_sent": self.frames_sent,
+            "chunks_suppressed": self.chunks_suppressed,
+            "keepalives_sent": self.keepalives_sent,
+            "bytes_saved_pct": 100.0 * (1 - self.bytes_sent / self.bytes_in) if self.bytes_in else 0.0,
+        }
+
+    def log_stats(self):
+        """Logs a summary of the uplink savings"""
+        stats = self.stats()
+        logger.info(
+            f"📡 Uplink sent {stats['bytes_sent']:,} of {stats['bytes_in']:,} bytes "
+            f"in {stats['frames_sent']:,} frames ({stats['bytes_saved_pct']:.1f}% saved, "
+            f"{stats['keepalives_sent']} keep-alives)"
+        )
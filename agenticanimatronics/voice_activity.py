@@ -0,0 +1,118 @@
+import math
+
+import numpy as np
+from loguru import logger
+
+
+class VoiceActivityDetector:
+    def __init__(
+            self,
+            sample_rate: int = 16_000,
+            chunk_size: int = 800,
+            threshold: float = 200.0,
+            hangover_ms: int = 300,
+            snr_ratio: float = 3.0,
+            fricative_zcr: float = 0.3,
+            noise_attack: float = 0.02,
+            noise_release: float = 0.2,
+    ):
+        """
+        Energy and zero-crossing based voice activity detector for 16-bit PCM chunks.
+
+        A chunk counts as speech when its RMS rises above the adaptive threshold, or when it
+        is a quieter chunk with a high zero-crossing rate (soft fricatives like "s" and "f").
+        The threshold follows the room's noise floor, so it recalibrates as the party gets louder.
+
+        Args:
+            sample_rate: The sample rate of the incoming audio.
+            chunk_size: The expected number of samples per chunk, used to preallocate buffers.
+            threshold: Minimum RMS level for speech; the adaptive threshold never drops below it.
+            hangover_ms: How long speech stays open after the last voiced chunk.
+            snr_ratio: How far above the noise floor a chunk must be to count as speech.
+            fricative_zcr: Zero-crossing rate above which a quiet chunk still counts as speech.
+            noise_attack: How quickly the noise floor rises towards louder background noise.
+            noise_release: How quickly the noise floor falls towards quieter background noise.
+        """
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.snr_ratio = snr_ratio
+        self.fricative_zcr = fricative_zcr
+        self.noise_attack = noise_attack
+        self.noise_release = noise_release
+        self.hangover_ms = hangover_ms
+
+        self._chunk_ms = 1000.0 * chunk_size / sample_rate
+        self._hangover_chunks = math.ceil(hangover_ms / self._chunk_ms) if hangover_ms > 0 else 0
+        self._scratch = np.zeros(chunk_size, dtype=np.float32)
+
+        self.noise_floor = threshold / snr_ratio
+        self.rms = 0.0
+        self.zcr = 0.0
+        self.is_speech = False
+        self._hangover_left = 0
+
+    @property
+    def adaptive_threshold(self) -> float:
+        """The RMS level a chunk currently has to reach to count as speech"""
+        return max(self.threshold, self.noise_floor * self.snr_ratio)
+
+    def _features(self, data: bytes) -> tuple[float, float]:
+        """Computes RMS and zero-crossing rate of a chunk without copying the raw buffer"""
+        samples = np.frombuffer(data, dtype=np.int16)
+        n = samples.size
+        if n == 0:
+            return 0.0, 0.0
+
+        if n > self._scratch.size:
+            self._scratch = np.zeros(n, dtype=np.float32)
+        scratch = self._scratch[:n]
+        np.copyto(scratch, samples, casting='unsafe')
+
+        rms = math.sqrt(float(np.dot(scratch, scratch)) / n)
+        signs = np.signbit(samples)
+        zcr = float(np.count_nonzero(signs[1:] != signs[:-1])) / n
+        return rms, zcr
+
+    def _update_noise_floor(self, rms: float, voiced: bool):
+        """
+        Tracks the background level, falling quickly and rising slowly. The floor keeps creeping
+        up during speech too, so a room that stays loud is eventually learned as background.
+        """
+        if rms < self.noise_floor:
+            rate = self.noise_release
+        elif voiced:
+            rate = self.noise_attack * 0.1
+        else:
+            rate = self.noise_attack
+        self.noise_floor += rate * (rms - self.noise_floor)
+
+    def process(self, data: bytes) -> bool:
+        """
+        Classifies a chunk of audio and returns whether speech is currently open.
+        """
+        self.rms, self.zcr = self._features(data)
+        threshold = self.adaptive_threshold
+
+        voiced = self.rms >= threshold or (
+            self.rms >= threshold / 2 and self.zcr >= self.fricative_zcr
+        )
+
+        self._update_noise_floor(self.rms, voiced)
+
+        if voiced:
+            if not self.is_speech:
+                logger.debug(f"Speech started (rms={self.rms:.0f}, threshold={threshold:.0f})")
+            self._hangover_left = self._hangover_chunks
+            self.is_speech = True
+        else:
+            if self._hangover_left > 0:
+                self._hangover_left -= 1
+            else:
+                self.is_speech = False
+
+        return self.is_speech
+
+    def reset(self):
+        """Closes any open speech segment without forgetting the learned noise floor"""
+        self.is_speech = False
+        self._hangover_left = 0
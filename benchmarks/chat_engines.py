@@ -0,0 +1,95 @@
+"""
+Compares the local cost of the two chat engines: the PirateChatBot dspy program and
+FastPirateChat. The llm is replaced by a canned reply, so what is timed is everything around
+the network call (prompt formatting, output parsing, and for FastPirateChat the hop to the shared
+event loop), and the prompt each engine would send is counted in tokens.
+
+    python benchmarks/chat_engines.py --turns 4 --iterations 200
+"""
+import argparse
+import statistics
+import time
+
+import dspy
+import litellm
+from loguru import logger
+
+from agenticanimatronics import llm
+from agenticanimatronics.fast_chat import FastPirateChat
+from agenticanimatronics.pirate_chatbot_module import PirateChatBotModule
+
+MODEL = "gemini/gemini-2.5-flash-lite"
+REPLY = "Arr, from me golden throne I decree ye be the finest neon-clad matey I've seen this century!"
+DESCRIPTION = "A tall adult in a witch costume with a pointed hat and a green cape"
+
+
+def make_history(turns: int) -> list[dict]:
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"Tell me about your parrot, part {i}. Does he talk much?"})
+        history.append({"role": "assistant", "content": REPLY})
+    return history
+
+
+class CannedCompletion:
+    """Stands in for litellm.completion and acompletion, recording the messages it was sent"""
+
+    def __init__(self, content: str):
+        self.content = content
+        self.messages = None
+
+    def __call__(self, model, messages, **kwargs):
+        self.messages = messages
+        return litellm.ModelResponse(
+            choices=[{"message": {"role": "assistant", "content": self.content}}],
+            usage={"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        )
+
+    async def acompletion(self, model, messages, **kwargs):
+        return self(model, messages, **kwargs)
+
+
+def time_calls(call, iterations: int) -> list[float]:
+    call()  # Warm up
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        timings.append(1000 * (time.perf_counter() - start))
+    return timings
+
+
+def report(name: str, timings: list[float], messages: list[dict]):
+    tokens = litellm.token_counter(model=MODEL, messages=messages)
+    logger.info(f"{name:>6}: median {statistics.median(timings):.3f} ms, "
+                f"p95 {sorted(timings)[int(0.95 * (len(timings) - 1))]:.3f} ms, {tokens} prompt tokens")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=4, help="Exchanges of history sent with the prompt")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    history = make_history(args.turns)
+    prompt = "What do you think of my costume?"
+
+    # The dspy path, as PirateChatBot runs it, minus the network and dspy's response cache
+    canned = CannedCompletion(f"[[ ## pirate_response ## ]]\n{REPLY}\n\n[[ ## completed ## ]]")
+    litellm.completion = canned
+    predict = dspy.Predict(PirateChatBotModule)
+    with dspy.context(lm=dspy.LM(model=MODEL, cache=False)):
+        timings = time_calls(
+            lambda: predict(history=history, user_prompt=prompt, user_description=DESCRIPTION), args.iterations)
+    report("dspy", timings, canned.messages)
+
+    canned = CannedCompletion(REPLY)
+    llm.acompletion = canned.acompletion
+    fast = FastPirateChat(model=MODEL)
+    timings = time_calls(lambda: fast.forward(history, prompt, DESCRIPTION), args.iterations)
+    report("fast", timings, canned.messages)
+    llm.close_shared_event_loop()
+
+
+if __name__ == "__main__":
+    main()
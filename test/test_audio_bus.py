@@ -0,0 +1,168 @@
+import threading
+
+import pytest
+
+from agenticanimatronics.audio_bus import AudioBus, SharedAudioReader, BLOCK, DROP_OLDEST
+
+
+def chunk(i, size=4):
+    return bytes([i % 256]) * size
+
+
+@pytest.fixture
+def bus():
+    """Fixture that creates a small in-process AudioBus"""
+    bus = AudioBus(slot_bytes=4, slots=4)
+    yield bus
+    bus.release()
+
+
+class TestAudioBus:
+    """Test cases for AudioBus class"""
+
+    def test_fan_out_to_all_subscribers(self, bus):
+        """Test that every subscriber sees every chunk"""
+        first = bus.subscribe()
+        second = bus.subscribe()
+
+        bus.publish(chunk(1))
+        bus.publish(chunk(2))
+
+        assert [bytes(first.read(0)), bytes(first.read(0))] == [chunk(1), chunk(2)]
+        assert [bytes(second.read(0)), bytes(second.read(0))] == [chunk(1), chunk(2)]
+
+    def test_chunks_are_views_not_copies(self, bus):
+        """Test that subscribers get memoryviews into the shared ring"""
+        first = bus.subscribe()
+        second = bus.subscribe()
+        bus.publish(chunk(7))
+
+        view_a = first.read(0)
+        view_b = second.read(0)
+
+        assert isinstance(view_a, memoryview)
+        assert view_a.obj is view_b.obj
+
+    def test_subscriber_starts_at_live_audio(self, bus):
+        """Test that a new subscriber does not see audio published before it joined"""
+        bus.publish(chunk(1))
+        late = bus.subscribe()
+        bus.publish(chunk(2))
+
+        assert bytes(late.read(0)) == chunk(2)
+
+    def test_read_timeout(self, bus):
+        """Test that a read with nothing to read times out"""
+        subscription = bus.subscribe()
+        assert subscription.read(timeout=0.01) is None
+
+    def test_drop_oldest_skips_ahead(self, bus):
+        """Test that a slow drop-oldest subscriber loses its oldest audio"""
+        slow = bus.subscribe(DROP_OLDEST)
+        for i in range(10):
+            bus.publish(chunk(i))
+
+        assert bytes(slow.read(0)) == chunk(7)
+        assert slow.dropped == 7
+
+    def test_block_holds_publisher_back(self, bus):
+        """Test that a blocking subscriber makes the publisher wait until it catches up"""
+        blocking = bus.subscribe(BLOCK)
+        published = []
+
+        def publish():
+            for i in range(6):
+                bus.publish(chunk(i))
+                published.append(i)
+
+        publisher = threading.Thread(target=publish)
+        publisher.start()
+        publisher.join(timeout=0.2)
+        assert publisher.is_alive()
+        assert len(published) == 3
+
+        received = [bytes(blocking.read(1)) for _ in range(6)]
+        publisher.join(timeout=1)
+
+        assert received == [chunk(i) for i in range(6)]
+        assert blocking.dropped == 0
+
+    def test_large_chunk_is_split(self, bus):
+        """Test that a chunk bigger than a slot is spread across slots"""
+        subscription = bus.subscribe()
+        bus.publish(b'abcdefghij')
+
+        parts = [bytes(subscription.read(0)) for _ in range(3)]
+
+        assert parts == [b'abcd', b'efgh', b'ij']
+
+    def test_source_ends_subscriptions(self):
+        """Test that iterating a subscription ends when the source is exhausted"""
+        bus = AudioBus(source=[chunk(1), chunk(2)], slot_bytes=4, slots=8)
+        subscription = bus.subscribe(BLOCK)
+        bus.start()
+
+        assert [bytes(c) for c in subscription] == [chunk(1), chunk(2)]
+        bus.release()
+
+    def test_unsubscribe_releases_publisher(self, bus):
+        """Test that closing a blocking subscriber unblocks the publisher"""
+        blocking = bus.subscribe(BLOCK)
+        for i in range(3):
+            bus.publish(chunk(i))
+
+        blocking.close()
+        bus.publish(chunk(3))
+
+        assert blocking.read(0) is None
+
+    def test_invalid_policy(self, bus):
+        """Test that unknown backpressure policies are rejected"""
+        with pytest.raises(ValueError):
+            bus.subscribe("drop_newest")
+
+    def test_start_without_source(self, bus):
+        """Test that starting a bus with no source fails"""
+        with pytest.raises(ValueError):
+            bus.start()
+
+
+class TestSharedAudioReader:
+    """Test cases for reading the bus through shared memory"""
+
+    @pytest.fixture
+    def shared_bus(self):
+        """Fixture that creates an AudioBus backed by shared memory"""
+        bus = AudioBus(slot_bytes=4, slots=4, use_shared_memory=True)
+        yield bus
+        bus.release()
+
+    def test_reader_sees_published_audio(self, shared_bus):
+        """Test that a reader attached by name sees chunks published after it attached"""
+        reader = SharedAudioReader(shared_bus.shared_memory_name)
+        shared_bus.publish(chunk(1))
+        shared_bus.publish(b'xy')
+
+        assert reader.read(0.1) == chunk(1)
+        assert reader.read(0.1) == b'xy'
+        assert reader.read(0.01) is None
+        reader.close()
+
+    def test_reader_drops_oldest(self, shared_bus):
+        """Test that a lagging reader skips to recent audio"""
+        reader = SharedAudioReader(shared_bus.shared_memory_name)
+        for i in range(10):
+            shared_bus.publish(chunk(i))
+
+        assert reader.read(0.1) == chunk(7)
+        assert reader.dropped == 7
+        reader.close()
+
+    def test_reader_ends_when_bus_closes(self, shared_bus):
+        """Test that iteration stops once the bus is closed"""
+        reader = SharedAudioReader(shared_bus.shared_memory_name)
+        shared_bus.publish(chunk(1))
+        shared_bus.close()
+
+        assert list(reader) == [chunk(1)]
+        reader.close()
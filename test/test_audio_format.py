@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from agenticanimatronics.audio_format import StreamingResampler, parse_output_format
+
+
+def sine(rate, seconds=0.5, freq=440, amplitude=8000, delay=0.0):
+    t = np.arange(int(rate * seconds)) / rate - delay
+    return amplitude * np.sin(2 * np.pi * freq * t)
+
+
+def chunks(data, sizes):
+    pieces, start, i = [], 0, 0
+    while start < len(data):
+        size = sizes[i % len(sizes)]
+        pieces.append(data[start:start + size])
+        start += size
+        i += 1
+    return pieces
+
+
+class TestParseOutputFormat:
+    """Test cases for parse_output_format"""
+
+    @pytest.mark.parametrize("output_format,expected", [
+        ("pcm_16000", ("pcm", 16000)),
+        ("pcm_24000", ("pcm", 24000)),
+        ("mp3_22050_32", ("mp3", 22050)),
+    ])
+    def test_formats(self, output_format, expected):
+        """Test that the codec and rate are read from the format name"""
+        assert parse_output_format(output_format) == expected
+
+    @pytest.mark.parametrize("output_format", ["pcm", "pcm_12345", "wav_high"])
+    def test_invalid_formats(self, output_format):
+        """Test that unknown formats and rates are rejected"""
+        with pytest.raises(ValueError):
+            parse_output_format(output_format)
+
+
+class TestStreamingResampler:
+    """Test cases for StreamingResampler class"""
+
+    def test_same_rate_passes_through(self):
+        """Test that audio at the target rate is not changed"""
+        data = sine(16000).astype(np.int16).tobytes()
+
+        assert StreamingResampler(16000, 16000).process(data) == data
+
+    @pytest.mark.parametrize("in_rate,out_rate", [(24000, 16000), (22050, 16000), (16000, 48000)])
+    def test_output_length_and_accuracy(self, in_rate, out_rate):
+        """Test that a tone keeps its pitch and duration after resampling"""
+        resampler = StreamingResampler(in_rate, out_rate)
+        out = np.frombuffer(resampler.process(sine(in_rate).astype(np.int16).tobytes()), dtype=np.int16)
+
+        assert abs(out.size - out_rate // 2) <= 2
+        # The anti-aliasing filter delays the audio by half its length
+        delay = 15 / in_rate if out_rate < in_rate else 0
+        expected = sine(out_rate, delay=delay)[:out.size]
+        assert np.abs(out[100:-100] - expected[100:-100]).max() < 100
+
+    @pytest.mark.parametrize("in_rate,out_rate", [(24000, 16000), (16000, 48000)])
+    def test_chunking_does_not_change_output(self, in_rate, out_rate):
+        """Test that chunk boundaries, including ones that split samples, leave no trace"""
+        data = sine(in_rate).astype(np.int16).tobytes()
+        whole = StreamingResampler(in_rate, out_rate).process(data)
+
+        chunked = b"".join(StreamingResampler(in_rate, out_rate).stream(chunks(data, [1, 7, 300, 2, 1001])))
+
+        assert chunked == whole
+
+    def test_downsampling_filters_aliases(self):
+        """Test that a tone above the new Nyquist rate is removed rather than folded down"""
+        resampler = StreamingResampler(24000, 16000)
+        out = np.frombuffer(resampler.process(sine(24000, freq=10000).astype(np.int16).tobytes()), dtype=np.int16)
+
+        assert np.abs(out[100:]).max() < 8000 * 0.1
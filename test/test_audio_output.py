@@ -0,0 +1,262 @@
+import threading
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from agenticanimatronics.audio_output import AudioOutputEngine, Voice
+
+
+def pcm(level, samples):
+    return np.full(samples, level, dtype=np.int16).tobytes()
+
+
+def block_samples(block):
+    return np.frombuffer(block, dtype=np.int16)
+
+
+@pytest.fixture
+def engine():
+    """Engine with 10 sample blocks, mixed by hand without a device"""
+    return AudioOutputEngine(sample_rate=1000, block_ms=10, duck_gain=0.5, duck_ms=0, buffer_seconds=1)
+
+
+class TestAudioOutputEngine:
+    """Test cases for AudioOutputEngine class"""
+
+    def test_silence_when_nothing_plays(self, engine):
+        """Test that the mixer outputs a block of silence with no voices"""
+        block = engine.mix_block()
+
+        assert len(block) == 20
+        assert not block_samples(block).any()
+        assert engine.is_playing is False
+
+    def test_clip_plays_then_ends(self, engine):
+        """Test that a clip is played out block by block and then removed"""
+        voice = engine.play_pcm(pcm(100, 15))
+
+        assert (block_samples(engine.mix_block()) == 100).all()
+        second = block_samples(engine.mix_block())
+        assert (second[:5] == 100).all() and not second[5:].any()
+        engine.mix_block()
+
+        assert voice.done.is_set()
+        assert engine.is_playing is False
+
+    def test_voices_are_mixed_with_gain(self, engine):
+        """Test that overlapping voices are added together at their own volume"""
+        engine.play_pcm(pcm(100, 10))
+        engine.play_pcm(pcm(1000, 10), gain=0.5)
+
+        assert (block_samples(engine.mix_block()) == 600).all()
+
+    def test_mix_is_clipped(self, engine):
+        """Test that loud overlapping voices saturate instead of wrapping around"""
+        engine.play_pcm(pcm(30000, 10))
+        engine.play_pcm(pcm(30000, 10))
+
+        assert (block_samples(engine.mix_block()) == 32767).all()
+
+    def test_speech_ducks_other_voices(self, engine):
+        """Test that other voices are lowered while a ducking voice plays"""
+        engine.play_pcm(pcm(1000, 30), name="idle")
+        speech = engine.play(name="speech")
+        speech.write(pcm(100, 10))
+
+        assert (block_samples(engine.mix_block()) == 600).all()
+        speech.finish()
+        engine.mix_block()
+        assert (block_samples(engine.mix_block()) == 1000).all()
+
+    def test_stop_fades_out(self, engine):
+        """Test that a stopped voice fades to silence and ends"""
+        voice = engine.play_pcm(pcm(1000, 100))
+        voice.stop(fade_ms=10, block_ms=10)
+
+        faded = block_samples(engine.mix_block())
+        assert faded[0] == 1000 and faded[-1] < 200
+        assert np.all(np.diff(faded) <= 0)
+        engine.mix_block()
+        assert voice.done.is_set()
+
+    def test_fade_in(self, engine):
+        """Test that a voice played with a fade in ramps up to full volume"""
+        voice = engine.play(name="speech", fade_in_ms=20)
+        voice.write(pcm(1000, 30))
+
+        first = block_samples(engine.mix_block())
+        assert first[0] == 0 and np.all(np.diff(first) >= 0)
+        engine.mix_block()
+        assert (block_samples(engine.mix_block()) == 1000).all()
+
+    def test_on_start_called_with_first_audio(self, engine):
+        """Test that on_start is called once, when the voice's audio first plays"""
+        on_start = MagicMock()
+        voice = engine.play(name="speech", on_start=on_start)
+        engine.mix_block()
+        on_start.assert_not_called()
+
+        voice.write(pcm(100, 20))
+        engine.mix_block()
+        engine.mix_block()
+
+        on_start.assert_called_once()
+
+    def test_stop_all_by_name(self, engine):
+        """Test that stopping by name leaves other voices playing"""
+        speech = engine.play_pcm(pcm(100, 100), name="speech")
+        idle = engine.play_pcm(pcm(100, 100), name="idle")
+
+        engine.stop_all(fade_ms=0, name="speech")
+        engine.mix_block()
+        engine.mix_block()
+
+        assert speech.done.is_set()
+        assert idle.is_playing
+
+    def test_play_stream_waits_for_room(self, engine):
+        """Test that a stream larger than the voice buffer is played in full"""
+        chunks = [pcm(i, 500) for i in range(1, 5)]
+        played = []
+        voice_holder = {}
+
+        def produce():
+            voice_holder['voice'] = engine.play_stream(chunks, wait=True)
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        while producer.is_alive() or engine.is_playing:
+            played.append(block_samples(engine.mix_block()).copy())
+        producer.join()
+
+        audio = np.concatenate(played)
+        audio = audio[audio != 0]
+        assert audio.size == 2000
+        assert list(np.unique(audio)) == [1, 2, 3, 4]
+        assert voice_holder['voice'].done.is_set()
+
+    def test_underruns_counted_after_start(self, engine):
+        """Test that a stream that runs dry mid-playback counts underruns"""
+        voice = engine.play()
+        engine.mix_block()
+        assert voice.underruns == 0
+
+        voice.write(pcm(100, 10))
+        engine.mix_block()
+        engine.mix_block()
+
+        assert voice.underruns == 1
+
+    def test_reference_tap_gets_played_audio(self, engine):
+        """Test that a reference tap receives exactly the blocks sent to the device"""
+        tap = engine.reference_tap()
+        engine.play_pcm(pcm(100, 10))
+
+        block = engine.mix_block()
+
+        assert tap.read(tap.available(), timeout=0) == block
+
+    def test_playback_clock(self, engine, monkeypatch):
+        """Test that the engine is audible until its last sound has left the device, plus the tail"""
+        now = [100.0]
+        monkeypatch.setattr("agenticanimatronics.audio_output.time.monotonic", lambda: now[0])
+        engine.output_latency = 0.05
+        engine.play_pcm(pcm(100, 10))
+        engine.mix_block()
+        engine.mix_block()
+
+        now[0] = 100.06
+        assert engine.is_audible()
+        now[0] = 100.08
+        assert not engine.is_audible()
+        assert engine.is_audible(tail_ms=50)
+
+    def test_start_and_close(self, engine, monkeypatch):
+        """Test that one output stream is opened and released"""
+        audio = MagicMock()
+        monkeypatch.setattr("pyaudio.PyAudio", lambda: audio)
+        stream = audio.open.return_value
+        stream.write.side_effect = lambda data: threading.Event().wait(0.01)
+
+        engine.start()
+        engine.close()
+
+        audio.open.assert_called_once()
+        assert audio.open.call_args.kwargs['rate'] == 1000
+        assert stream.write.called
+        stream.close.assert_called_once()
+        audio.terminate.assert_called_once()
+
+
+class TestVoice:
+    """Test cases for Voice class"""
+
+    def test_write_after_stop(self):
+        """Test that writing to a stopped voice reports it"""
+        voice = Voice("speech", capacity_bytes=100)
+        voice.stop()
+
+        assert voice.write(b"\x00\x00") is False
+
+
+class TestAudioOutputEnginePrebuffer:
+    """Test cases for prebuffered streaming voices"""
+
+    @pytest.fixture
+    def engine(self):
+        return AudioOutputEngine(sample_rate=1000, block_ms=10, duck_ms=0, buffer_seconds=1)
+
+    def test_waits_for_prebuffer(self, engine):
+        """Test that playback holds off until the prebuffer has filled"""
+        voice = engine.play(prebuffer_bytes=60)
+        voice.write(pcm(100, 20))
+        assert not block_samples(engine.mix_block()).any()
+
+        voice.write(pcm(100, 10))
+        assert (block_samples(engine.mix_block()) == 100).all()
+        assert voice.started_at is not None
+
+    def test_short_stream_plays_when_finished(self, engine):
+        """Test that audio shorter than the prebuffer still plays once the stream ends"""
+        voice = engine.play(prebuffer_bytes=600)
+        voice.write(pcm(100, 10))
+        voice.finish()
+
+        assert (block_samples(engine.mix_block()) == 100).all()
+
+    def test_rebuffers_after_underrun(self, engine):
+        """Test that a stream that runs dry waits to refill instead of stuttering"""
+        voice = engine.play(prebuffer_bytes=40)
+        voice.write(pcm(100, 25))
+        engine.mix_block()
+        engine.mix_block()
+        partial = block_samples(engine.mix_block())
+        assert (partial[:5] == 100).all() and not partial[5:].any()
+        assert voice.underruns == 1
+
+        voice.write(pcm(100, 10))
+        assert not block_samples(engine.mix_block()).any()
+        voice.write(pcm(100, 10))
+        assert (block_samples(engine.mix_block()) == 100).all()
+
+    def test_play_stream_records_turn(self, engine):
+        """Test that a jitter buffer sizes the prebuffer and learns from the stream"""
+        from agenticanimatronics.jitter_buffer import JitterBuffer
+
+        jitter_buffer = JitterBuffer(sample_rate=1000, initial_ms=20)
+        done = threading.Event()
+
+        def mix():
+            while not done.is_set():
+                engine.mix_block()
+
+        mixer = threading.Thread(target=mix)
+        mixer.start()
+        voice = engine.play_stream([pcm(100, 10)] * 5, jitter_buffer=jitter_buffer)
+        done.set()
+        mixer.join()
+
+        assert voice.prebuffer_bytes == 40
+        assert len(jitter_buffer._gaps_ms) == 4
+        assert jitter_buffer.turns[0]["prebuffer_ms"] == 20
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from agenticanimatronics.barge_in import BargeInDetector, SpokenText
+
+
+CHUNK_SIZE = 800  # 50 ms at 16 kHz
+LOUD = np.full(CHUNK_SIZE, 3000, dtype=np.int16).tobytes()
+QUIET = np.full(CHUNK_SIZE, 300, dtype=np.int16).tobytes()
+SILENCE = b'\x00' * CHUNK_SIZE * 2
+
+
+@pytest.fixture
+def on_barge_in():
+    return MagicMock()
+
+
+@pytest.fixture
+def speaking():
+    return {'value': True}
+
+
+@pytest.fixture
+def detector(on_barge_in, speaking):
+    """Fixture that creates a BargeInDetector needing 100 ms of speech"""
+    return BargeInDetector(on_barge_in=on_barge_in, is_speaking=lambda: speaking['value'], sample_rate=16000)
+
+
+def feed(detector, chunks):
+    return [detector.process(chunk) for chunk in chunks]
+
+
+class TestBargeInDetector:
+    """Test cases for BargeInDetector class"""
+
+    def test_barge_in_after_onset(self, detector, on_barge_in):
+        """Test that the visitor talking over the pirate triggers once enough speech is heard"""
+        results = feed(detector, [SILENCE, LOUD, LOUD, LOUD])
+
+        assert results == [False, False, True, False]
+        on_barge_in.assert_called_once()
+
+    def test_quiet_audio_ignored(self, detector, on_barge_in):
+        """Test that audio below the threshold, such as the pirate's own voice, is ignored"""
+        feed(detector, [QUIET] * 10)
+
+        on_barge_in.assert_not_called()
+
+    def test_short_bursts_ignored(self, detector, on_barge_in):
+        """Test that isolated bumps separated by silence do not interrupt the pirate"""
+        feed(detector, [LOUD, SILENCE, SILENCE, LOUD, SILENCE, SILENCE])
+
+        on_barge_in.assert_not_called()
+
+    def test_only_while_speaking(self, detector, on_barge_in, speaking):
+        """Test that speech while the pirate is quiet is left to the normal turn taking"""
+        speaking['value'] = False
+
+        feed(detector, [LOUD] * 5)
+
+        on_barge_in.assert_not_called()
+
+    def test_rearms_for_next_response(self, detector, on_barge_in, speaking):
+        """Test that the detector triggers once per response"""
+        feed(detector, [LOUD] * 5)
+        speaking['value'] = False
+        feed(detector, [SILENCE])
+        speaking['value'] = True
+        feed(detector, [LOUD] * 2)
+
+        assert on_barge_in.call_count == 2
+        assert detector.barge_ins == 2
+
+
+class TestSpokenText:
+    """Test cases for SpokenText class"""
+
+    @pytest.fixture
+    def spoken_text(self):
+        """Two sentences of 100 bytes of audio each"""
+        spoken_text = SpokenText()
+        spoken_text.start("Ahoy there matey!")
+        list(spoken_text.count([b"\x00" * 100]))
+        spoken_text.start("I be Captain Bones of the Black Pearl.")
+        list(spoken_text.count([b"\x00" * 50, b"\x00" * 50]))
+        return spoken_text
+
+    def test_everything_played(self, spoken_text):
+        """Test that a response played to the end is heard in full"""
+        assert spoken_text.heard(200) == "Ahoy there matey! I be Captain Bones of the Black Pearl."
+
+    def test_cut_off_part_way(self, spoken_text):
+        """Test that a sentence cut off part way keeps the share of its words that was played"""
+        assert spoken_text.heard(150) == "Ahoy there matey! I be Captain Bones"
+
+    def test_cut_off_at_sentence_end(self, spoken_text):
+        """Test that nothing of a sentence that had not started is kept"""
+        assert spoken_text.heard(100) == "Ahoy there matey!"
+
+    def test_nothing_played(self, spoken_text):
+        """Test that nothing is heard before playback starts"""
+        assert spoken_text.heard(0) == ""
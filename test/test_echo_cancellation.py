@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from agenticanimatronics.echo_cancellation import EchoCanceller
+from agenticanimatronics.ring_buffer import SPSCRingBuffer
+
+
+SAMPLE_RATE = 16000
+CHUNK_SIZE = 800  # 50 ms
+
+
+def int16(samples):
+    return np.clip(np.round(samples), -32768, 32767).astype(np.int16).tobytes()
+
+
+def energy(data):
+    samples = np.frombuffer(data, dtype=np.int16).astype(np.float64)
+    return float(np.mean(samples ** 2))
+
+
+@pytest.fixture
+def playback():
+    """Six seconds of noisy 'speech' and its echo through a delayed, decaying room response"""
+    rng = np.random.default_rng(0)
+    reference = np.convolve(rng.standard_normal(SAMPLE_RATE * 6) * 3000, np.ones(4) / 4, "same")
+    response = np.zeros(1600)
+    response[480] = 0.4
+    response[481:] = rng.standard_normal(1119) * 0.03 * np.exp(-np.arange(1119) / 200)
+    echo = np.convolve(reference, response)[:reference.size]
+    return reference, echo
+
+
+def run(canceller, ring, reference, microphone, lead=1600):
+    """Feeds the reference ahead of the microphone, as the speaker plays before the mic hears it"""
+    ring.write(int16(reference[:lead]))
+    out = []
+    for start in range(0, reference.size - lead - CHUNK_SIZE, CHUNK_SIZE):
+        ring.write(int16(reference[lead + start:lead + start + CHUNK_SIZE]))
+        out.append(canceller.process(int16(microphone[start:start + CHUNK_SIZE])))
+    return out
+
+
+@pytest.fixture
+def ring():
+    return SPSCRingBuffer(SAMPLE_RATE * 2)
+
+
+@pytest.fixture
+def canceller(ring):
+    return EchoCanceller(ring, sample_rate=SAMPLE_RATE)
+
+
+class TestEchoCanceller:
+    """Test cases for EchoCanceller class"""
+
+    def test_cancels_echo(self, canceller, ring, playback):
+        """Test that the echo of the played audio is removed once the filter has adapted"""
+        reference, echo = playback
+
+        out = run(canceller, ring, reference, echo)
+
+        reduction = 10 * np.log10(energy(int16(echo[-2 * CHUNK_SIZE:])) / energy(out[-1]))
+        assert reduction > 20
+        assert canceller.erle_db > 20
+
+    def test_keeps_visitor_voice(self, canceller, ring, playback):
+        """Test that the visitor talking over the pirate is kept while his echo is removed"""
+        reference, echo = playback
+        run(canceller, ring, reference, echo)
+        voice = np.sin(np.arange(CHUNK_SIZE) * 0.2) * 8000
+
+        ring.write(int16(reference[:CHUNK_SIZE]))
+        out = canceller.process(int16(voice))
+
+        assert energy(out) > 0.5 * energy(int16(voice))
+        assert canceller.double_talk_blocks > 0
+
+    def test_chunks_keep_their_size(self, canceller):
+        """Test that each chunk comes back the same size, including a partial block"""
+        for size in (CHUNK_SIZE, 170):
+            assert len(canceller.process(b"\x00\x01" * size)) == size * 2
+
+    def test_passes_audio_through_without_playback(self, canceller):
+        """Test that the microphone is unchanged while nothing is playing"""
+        mic = int16(np.sin(np.arange(CHUNK_SIZE)) * 1000)
+
+        assert canceller.process(mic) == mic
+
+    def test_reference_kept_within_reach(self, canceller, ring):
+        """Test that a reference backlog is trimmed so it stays within the filter's reach"""
+        ring.write(b"\x00\x10" * SAMPLE_RATE)
+
+        canceller.process(b"\x00\x00" * CHUNK_SIZE)
+
+        assert canceller._pending.size == canceller.max_delay
+
+    def test_resamples_reference(self, ring):
+        """Test that played audio at another rate is converted to the microphone rate"""
+        canceller = EchoCanceller(ring, sample_rate=SAMPLE_RATE, reference_rate=48000)
+        ring.write(b"\x00\x10" * 3 * CHUNK_SIZE)
+
+        reference = canceller._take_reference(CHUNK_SIZE)
+
+        assert reference.size == CHUNK_SIZE
+        assert canceller._pending.size < 10
@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from agenticanimatronics.endpointing import Endpointer
+
+
+CHUNK_SIZE = 800  # 50 ms at 16 kHz
+SPEECH = np.full(CHUNK_SIZE, 2000, dtype=np.int16).tobytes()
+SILENCE = b'\x00' * CHUNK_SIZE * 2
+
+
+@pytest.fixture
+def on_endpoint():
+    return MagicMock()
+
+
+@pytest.fixture
+def endpointer(on_endpoint):
+    """Fixture that creates an Endpointer with a 480 ms starting window"""
+    return Endpointer(on_endpoint=on_endpoint, sample_rate=16000)
+
+
+def feed(endpointer, chunks):
+    return [endpointer.process(chunk) for chunk in chunks]
+
+
+class TestEndpointer:
+    """Test cases for Endpointer class"""
+
+    def test_initial_window(self, endpointer):
+        """Test that a new visitor starts with a window shorter than the server's 700 ms"""
+        assert endpointer.silence_window_ms == pytest.approx(480)
+
+    def test_endpoint_after_silence_window(self, endpointer, on_endpoint):
+        """Test that the utterance ends once the silence window has passed"""
+        results = feed(endpointer, [SPEECH] * 6 + [SILENCE] * 10)
+
+        # 480 ms window = 10 chunks of silence
+        assert results.index(True) == 15
+        on_endpoint.assert_called_once()
+        assert endpointer.endpoints == 1
+
+    def test_no_endpoint_without_speech(self, endpointer, on_endpoint):
+        """Test that silence alone never ends an utterance"""
+        feed(endpointer, [SILENCE] * 40)
+        on_endpoint.assert_not_called()
+
+    def test_short_noise_is_ignored(self, endpointer, on_endpoint):
+        """Test that a click shorter than the minimum speech is not an utterance"""
+        feed(endpointer, [SPEECH] + [SILENCE] * 20)
+        on_endpoint.assert_not_called()
+
+    def test_fast_talker_gets_shorter_window(self, endpointer):
+        """Test that short pauses between phrases shrink the window"""
+        for _ in range(10):
+            feed(endpointer, [SPEECH] * 4 + [SILENCE] * 3)
+
+        assert endpointer.silence_window_ms < 400
+        assert endpointer.silence_window_ms >= endpointer.min_silence_ms
+
+    def test_slow_talker_gets_longer_window(self, endpointer):
+        """Test that long pauses between phrases stretch the window"""
+        for _ in range(10):
+            feed(endpointer, [SPEECH] * 4 + [SILENCE] * 8)
+
+        # 400 ms pauses give a window a little longer than the pause itself
+        assert endpointer.silence_window_ms > 600
+        assert endpointer.silence_window_ms <= endpointer.max_silence_ms
+
+    def test_word_gaps_are_not_pauses(self, endpointer):
+        """Test that gaps between words do not count as pauses"""
+        feed(endpointer, [SPEECH, SILENCE] * 20)
+        assert endpointer.typical_pause_ms == endpointer.initial_pause_ms
+
+    def test_reset(self, endpointer):
+        """Test that reset forgets the visitor's rhythm and the open utterance"""
+        for _ in range(10):
+            feed(endpointer, [SPEECH] * 4 + [SILENCE] * 3)
+        endpointer.reset()
+
+        assert endpointer.typical_pause_ms == endpointer.initial_pause_ms
+        assert endpointer.in_utterance is False
+
+    def test_empty_chunk(self, endpointer):
+        """Test that empty chunks are ignored"""
+        assert endpointer.process(b'') is False
+
+    def test_follows_vad_threshold(self, on_endpoint):
+        """Test that the microphone VAD's adaptive threshold is used instead of the fixed one"""
+        vad = MagicMock(adaptive_threshold=3000.0)
+        endpointer = Endpointer(on_endpoint=on_endpoint, sample_rate=16000, vad=vad)
+
+        feed(endpointer, [SPEECH] * 6 + [SILENCE] * 10)
+
+        assert endpointer.in_utterance is False
+        on_endpoint.assert_not_called()
+
+    def test_quiet_hangover_counts_as_silence(self, on_endpoint):
+        """Test that the hangover audio after speech starts the silence window in a noisy room"""
+        hangover = np.full(CHUNK_SIZE, 500, dtype=np.int16).tobytes()
+        endpointer = Endpointer(on_endpoint=on_endpoint, sample_rate=16000,
+                                vad=MagicMock(adaptive_threshold=1000.0))
+
+        results = feed(endpointer, [SPEECH] * 6 + [hangover] * 10)
+
+        assert results[-1] is True
+        on_endpoint.assert_called_once()
+
+    def test_pre_roll_judged_by_frame(self, endpointer):
+        """Test that pre-roll sent with the start of speech is not counted as speech"""
+        endpointer.process(SILENCE * 5 + SPEECH)
+
+        assert endpointer.in_utterance is True
+        assert endpointer.speech_ms == 50
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from agenticanimatronics.fast_chat import FastPirateChat
+from agenticanimatronics.llm import LLMEventLoop, LLMHandler
+
+
+def completion_response(content):
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = content
+    return response
+
+
+def stream_chunk(content):
+    chunk = MagicMock()
+    chunk.choices = [MagicMock()]
+    chunk.choices[0].delta.content = content
+    return chunk
+
+
+async def stream_chunks(*contents):
+    for content in contents:
+        yield stream_chunk(content)
+
+
+@pytest.fixture
+def completion(monkeypatch):
+    """Stands in for litellm.acompletion"""
+    mock_acompletion = AsyncMock(return_value=completion_response(" Arr, ahoy matey! "))
+    monkeypatch.setattr("agenticanimatronics.llm.acompletion", mock_acompletion)
+    return mock_acompletion
+
+
+@pytest.fixture
+def llm_loop():
+    loop = LLMEventLoop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def chat(completion, llm_loop):
+    return FastPirateChat(llm=LLMHandler("test-model", event_loop=llm_loop))
+
+
+class TestFastPirateChat:
+    """Test cases for FastPirateChat class"""
+
+    def test_forward_returns_reply(self, chat, completion):
+        """Test that the completion text is returned without parsing"""
+        assert chat.forward([], "Hello") == "Arr, ahoy matey!"
+        kwargs = completion.call_args.kwargs
+        assert kwargs["model"] == "test-model"
+        assert kwargs["temperature"] == 0.0
+
+    def test_persona_sent_as_system_message(self, chat, completion):
+        """Test that the persona from the dspy signature leads every prompt"""
+        chat.forward([], "Hello")
+
+        system = completion.call_args.kwargs["messages"][0]
+        assert system["role"] == "system"
+        assert "Captain Boneheart" in system["content"]
+        assert system is chat.system_message
+
+    def test_history_sent_as_is(self, chat, completion):
+        """Test that history messages are sent unchanged, ahead of the new prompt"""
+        history = [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Arr!"}]
+
+        chat.forward(history, "Who are you?")
+
+        messages = completion.call_args.kwargs["messages"]
+        assert messages[1:3] == history
+        assert messages[3] == {"role": "user", "content": "Who are you?"}
+
+    def test_description_added_to_prompt(self, chat):
+        """Test that what the visitor looks like is sent with their prompt"""
+        messages = chat.messages([], "Like my hat?", "A witch")
+
+        assert messages[-1]["content"] == "(What the visitor looks like: A witch)\nLike my hat?"
+
+    def test_stream_yields_text(self, chat, completion):
+        """Test that streamed chunks are yielded as text, skipping empty ones"""
+        completion.return_value = stream_chunks("Arr, ", None, "matey!")
+
+        assert list(chat.stream([], "Hello")) == ["Arr, ", "matey!"]
+        assert completion.call_args.kwargs["stream"] is True
+
+    def test_errors_propagate(self, chat, completion):
+        """Test that llm errors reach the caller, like PirateChatBot"""
+        completion.side_effect = ConnectionError("offline")
+
+        with pytest.raises(ConnectionError):
+            chat.forward([], "Hello")
+
+    def test_requests_share_the_event_loop_client(self, chat, completion, llm_loop):
+        """Test that requests go through the handler's keep-alive HTTP client"""
+        chat.forward([], "Hello")
+
+        assert completion.call_args.kwargs["client"] is llm_loop.client
+
+    def test_aforward(self, chat, completion):
+        """Test that the async path returns the same reply"""
+        assert asyncio.run(chat.aforward([], "Hello")) == "Arr, ahoy matey!"
+
+    def test_summarize(self, chat, completion):
+        """Test that older messages are folded into the summary"""
+        completion.return_value = completion_response("Visitor is called Sam.")
+
+        summary = chat.summarize("", [{"role": "user", "content": "I'm Sam"}])
+
+        assert summary == "Visitor is called Sam."
+        prompt = completion.call_args.kwargs["messages"][-1]["content"]
+        assert "user: I'm Sam" in prompt
@@ -0,0 +1,95 @@
+import random
+import threading
+
+import pytest
+from unittest.mock import MagicMock
+
+from agenticanimatronics.filler import FillerPlayer, FillerPool
+
+
+@pytest.fixture
+def pool():
+    """Pool of three clips with a seeded shuffle"""
+    pool = FillerPool(rng=random.Random(1))
+    for text in ("Arr", "Hmm", "Aye"):
+        pool.add(text, text.encode() * 2)
+    return pool
+
+
+@pytest.fixture
+def engine():
+    """Mock output engine that records the fillers it plays"""
+    engine = MagicMock()
+    engine.block_ms = 20
+    engine.play_pcm.side_effect = lambda pcm, **kwargs: MagicMock(is_playing=True)
+    return engine
+
+
+class TestFillerPool:
+    """Test cases for FillerPool class"""
+
+    def test_every_clip_before_repeats(self, pool):
+        """Test that every clip plays once before any clip repeats"""
+        picks = [pool.pick()[0] for _ in range(3)]
+
+        assert sorted(picks) == ["Arr", "Aye", "Hmm"]
+
+    def test_no_back_to_back_repeats(self, pool):
+        """Test that the same clip is never picked twice in a row, across rounds"""
+        picks = [pool.pick()[0] for _ in range(60)]
+
+        assert all(a != b for a, b in zip(picks, picks[1:]))
+
+    def test_empty_pool(self):
+        """Test that an empty pool has nothing to pick"""
+        assert FillerPool().pick() is None
+
+    def test_render_skips_failures(self):
+        """Test that lines that fail to render are left out"""
+        pool = FillerPool()
+
+        def synthesize(text):
+            if text == "bad":
+                raise RuntimeError("boom")
+            return None if text == "silent" else b"pcm"
+
+        pool.render(["good", "bad", "silent"], synthesize)
+
+        assert len(pool) == 1
+
+
+class TestFillerPlayer:
+    """Test cases for FillerPlayer class"""
+
+    def test_plays_filler_after_deadline(self, pool, engine):
+        """Test that a filler plays if the response has not started by the deadline"""
+        player = FillerPlayer(engine, pool, deadline_ms=10)
+        played = threading.Event()
+        engine.play_pcm.side_effect = lambda pcm, **kwargs: played.set() or MagicMock(is_playing=True)
+
+        player.arm()
+
+        assert played.wait(1)
+        assert engine.play_pcm.call_args.kwargs['name'] == "filler"
+        assert player.fillers_played == 1
+
+    def test_quick_response_suppresses_filler(self, pool, engine):
+        """Test that no filler plays when the response starts before the deadline"""
+        player = FillerPlayer(engine, pool, deadline_ms=50)
+
+        player.arm()
+        player.response_started()
+        threading.Event().wait(0.1)
+
+        engine.play_pcm.assert_not_called()
+
+    def test_response_fades_out_filler(self, pool, engine):
+        """Test that a playing filler is faded out over the crossfade when the response starts"""
+        player = FillerPlayer(engine, pool, crossfade_ms=150)
+        player.arm()
+        player._fire()
+        voice = player._voice
+
+        player.response_started()
+
+        voice.stop.assert_called_once_with(150, 20)
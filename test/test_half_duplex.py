@@ -0,0 +1,17 @@
+from unittest.mock import MagicMock
+
+from agenticanimatronics.half_duplex import HalfDuplexGate
+
+
+class TestHalfDuplexGate:
+    """Test cases for HalfDuplexGate class"""
+
+    def test_follows_playback_clock(self):
+        """Test that the gate is closed exactly while the engine is audible, including the tail"""
+        engine = MagicMock()
+        engine.is_audible.side_effect = [True, True, False]
+        gate = HalfDuplexGate(engine, tail_ms=200)
+
+        assert [gate.is_closed for _ in range(3)] == [True, True, False]
+        engine.is_audible.assert_called_with(200)
+        assert gate.closures == 1
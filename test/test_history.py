@@ -0,0 +1,139 @@
+import asyncio
+import threading
+
+import pytest
+from unittest.mock import AsyncMock
+
+from agenticanimatronics.history import HistoryWindow, estimate_tokens
+from agenticanimatronics.llm import LLMEventLoop
+
+
+def turns(count, words=5):
+    history = []
+    for i in range(count):
+        history.append({"role": "user", "content": " ".join([f"question{i}"] * words)})
+        history.append({"role": "assistant", "content": " ".join([f"answer{i}"] * words)})
+    return history
+
+
+@pytest.fixture
+def event_loop():
+    loop = LLMEventLoop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def summarize():
+    """Summarizer that lists the messages folded into it"""
+    return AsyncMock(side_effect=lambda summary, messages: (
+        summary + " " + " ".join(m["content"].split()[0] for m in messages)).strip())
+
+
+@pytest.fixture
+def window(summarize, event_loop):
+    return HistoryWindow(summarize, keep_turns=2, max_tokens=1000, event_loop=event_loop)
+
+
+class TestHistoryWindow:
+    """Test cases for HistoryWindow class"""
+
+    def test_short_history_passed_through(self, window):
+        """Test that a history that already fits is returned as is, without copying"""
+        history = turns(2)
+
+        assert window.window(history) is history
+
+    def test_older_turns_folded_into_summary(self, window, summarize):
+        """Test that turns beyond the verbatim window are summarized in the background"""
+        history = turns(5)
+        window.update(history)
+        window.wait(timeout=1)
+
+        prompt = window.window(history)
+
+        summarize.assert_called_once_with("", history[:6])
+        assert prompt[0]["role"] == "system"
+        assert prompt[0]["content"].endswith("question0 answer0 question1 answer1 question2 answer2")
+        assert prompt[1:] == history[6:]
+
+    def test_summary_keeps_running(self, window, summarize):
+        """Test that each new summary builds on the last one"""
+        history = turns(3)
+        window.update(history)
+        window.wait(timeout=1)
+        history += turns(4)[6:]
+        window.update(history)
+        window.wait(timeout=1)
+
+        assert summarize.call_args.args == ("question0 answer0", history[2:4])
+        assert window.summarized == 4
+
+    def test_prompt_stays_constant_size(self, event_loop):
+        """Test that the history sent stays within the token budget however long the chat runs"""
+        window = HistoryWindow(AsyncMock(return_value="a short summary"), keep_turns=2, max_tokens=200,
+                               event_loop=event_loop)
+        history = []
+        sizes = []
+        for i in range(30):
+            history += turns(1, words=20)
+            window.update(history)
+            window.wait(timeout=1)
+            sizes.append(estimate_tokens(window.window(history)))
+
+        assert max(sizes) <= 200
+        assert max(sizes[10:]) == min(sizes[10:])
+
+    def test_trims_while_summary_catches_up(self, event_loop):
+        """Test that the oldest turns are dropped if the summary has not caught up yet"""
+        release = threading.Event()
+
+        async def slow_summary(summary, messages):
+            await asyncio.to_thread(release.wait, 1)
+            return "summary"
+
+        window = HistoryWindow(slow_summary, keep_turns=2, max_tokens=100, event_loop=event_loop)
+        history = turns(10, words=10)
+        window.update(history)
+
+        prompt = window.window(history)
+        release.set()
+
+        assert estimate_tokens(prompt) <= 100
+        assert prompt[-1] == history[-1]
+        assert window.trimmed_messages > 0
+
+    def test_failed_summary_keeps_history(self, window, summarize):
+        """Test that a failed summary leaves the turns to be folded in next time"""
+        summarize.side_effect = RuntimeError("llm down")
+        history = turns(5)
+        window.update(history)
+        window.wait(timeout=1)
+
+        assert window.summarized == 0
+        assert window.window(history) is history
+
+    def test_reset_discards_summary(self, window):
+        """Test that a new visitor starts without the last visitor's summary"""
+        history = turns(5)
+        window.update(history)
+        window.wait(timeout=1)
+
+        window.reset()
+
+        new_history = turns(1)
+        assert window.window(new_history) is new_history
+
+    def test_reset_cancels_summary_in_progress(self, event_loop):
+        """Test that a summary still being written for the last visitor is cancelled"""
+        async def never_finishes(summary, messages):
+            await asyncio.sleep(10)
+
+        window = HistoryWindow(never_finishes, keep_turns=2, event_loop=event_loop)
+        window.update(turns(5))
+        job = window._job
+
+        window.reset()
+
+        assert job.cancelled()
+        assert window.summary == ""
@@ -270,4 +270,57 @@ class TestIdleMode:
         
         # Should not have called sleep or play_random_audio
         mock_time.sleep.assert_not_called()
-        idle_mode._play_random_audio.assert_not_called()
\ No newline at end of file
+        idle_mode._play_random_audio.assert_not_called()
+
+class TestIdleModeOutputEngine:
+    """Test cases for IdleMode playing through the shared audio output"""
+
+    @pytest.fixture
+    def engine_idle_mode(self, mock_pygame, mock_file_system, monkeypatch):
+        engine = MagicMock()
+        engine.sample_rate = 16000
+        engine.play_pcm.return_value.is_playing = False
+
+        segment = MagicMock()
+        segment.set_channels.return_value = segment
+        segment.set_frame_rate.return_value = segment
+        segment.set_sample_width.return_value = segment
+        segment.raw_data = b"pcm"
+        from_file = MagicMock(return_value=segment)
+        monkeypatch.setattr("agenticanimatronics.idle_mode.AudioSegment.from_file", from_file)
+
+        idle_mode = IdleMode("test_audio_folder", output_engine=engine)
+        idle_mode.running = True
+        idle_mode.is_active = True
+        return idle_mode, engine, segment, from_file
+
+    def test_does_not_start_pygame(self, engine_idle_mode, mock_pygame):
+        """Test that pygame is left alone when an output engine is given"""
+        idle_mode, _, _, _ = engine_idle_mode
+
+        assert idle_mode.audio_available is True
+        mock_pygame['mixer'].init.assert_not_called()
+
+    def test_plays_decoded_clip(self, engine_idle_mode, mock_pygame, monkeypatch):
+        """Test that clips are decoded once to engine rate PCM and played as idle voices"""
+        idle_mode, engine, segment, from_file = engine_idle_mode
+        idle_mode.audio_files = ['test1.mp3']
+
+        idle_mode._play_random_audio()
+        idle_mode._play_random_audio()
+
+        from_file.assert_called_once_with('test1.mp3')
+        segment.set_frame_rate.assert_called_once_with(16000)
+        assert engine.play_pcm.call_count == 2
+        engine.play_pcm.assert_called_with(b"pcm", name="idle", gain=0.8)
+        mock_pygame['music'].play.assert_not_called()
+
+    def test_stop_stops_clip(self, engine_idle_mode):
+        """Test that stopping idle mode fades out the clip that is playing"""
+        idle_mode, engine, _, _ = engine_idle_mode
+        idle_mode.audio_files = ['test1.mp3']
+        idle_mode._play_random_audio()
+
+        idle_mode.stop()
+
+        engine.play_pcm.return_value.stop.assert_called_once()
@@ -0,0 +1,77 @@
+import pytest
+
+from agenticanimatronics.jitter_buffer import JitterBuffer
+
+
+def feed(jitter_buffer, gaps_ms):
+    jitter_buffer.start_turn()
+    now = 0.0
+    jitter_buffer.arrival(now)
+    for gap in gaps_ms:
+        now += gap / 1000
+        jitter_buffer.arrival(now)
+
+
+class TestJitterBuffer:
+    """Test cases for JitterBuffer class"""
+
+    def test_initial_prebuffer(self):
+        """Test that the initial prebuffer is used until gaps have been measured"""
+        jitter_buffer = JitterBuffer(sample_rate=16000, initial_ms=150)
+
+        assert jitter_buffer.target_ms == 150
+        assert jitter_buffer.target_bytes == 4800
+
+    def test_steady_stream_gets_small_prebuffer(self):
+        """Test that an evenly paced stream starts playing early"""
+        jitter_buffer = JitterBuffer(min_ms=40)
+        feed(jitter_buffer, [20] * 50)
+
+        assert jitter_buffer.target_ms == pytest.approx(40)
+
+    def test_bursty_stream_gets_larger_prebuffer(self):
+        """Test that long gaps between bursts grow the prebuffer to cover them"""
+        jitter_buffer = JitterBuffer(safety=1.5)
+        feed(jitter_buffer, ([5] * 9 + [300]) * 10)
+
+        assert jitter_buffer.target_ms >= 300
+        assert jitter_buffer.target_ms <= jitter_buffer.max_ms
+
+    def test_prebuffer_is_capped(self):
+        """Test that even a terrible connection does not delay speech past the maximum"""
+        jitter_buffer = JitterBuffer(max_ms=1000)
+        feed(jitter_buffer, [5000] * 10)
+
+        assert jitter_buffer.target_ms == 1000
+
+    def test_first_chunk_latency_is_not_jitter(self):
+        """Test that the wait between turns is not counted as a gap"""
+        jitter_buffer = JitterBuffer()
+        feed(jitter_buffer, [20] * 10)
+        jitter_buffer.start_turn()
+        jitter_buffer.arrival(100.0)
+
+        assert max(jitter_buffer._gaps_ms) == pytest.approx(20)
+
+    def test_gap_between_segments_is_not_jitter(self):
+        """Test that waiting for the next sentence's first chunk is not counted as a gap"""
+        jitter_buffer = JitterBuffer()
+        feed(jitter_buffer, [20] * 10)
+        jitter_buffer.start_segment()
+        for now in (1.0, 1.02, 1.04):
+            jitter_buffer.arrival(now)
+
+        assert max(jitter_buffer._gaps_ms) == pytest.approx(20)
+
+    def test_turn_stats(self):
+        """Test that each turn's prebuffer and underruns are recorded"""
+        jitter_buffer = JitterBuffer()
+        jitter_buffer.end_turn(prebuffer_ms=150, underruns=0, start_delay_ms=200)
+        jitter_buffer.end_turn(prebuffer_ms=50, underruns=3, start_delay_ms=100)
+
+        stats = jitter_buffer.stats()
+        assert stats["turns"] == 2
+        assert stats["underruns"] == 3
+        assert stats["turns_with_underruns"] == 1
+        assert stats["mean_prebuffer_ms"] == 100
+        assert jitter_buffer.turns[1]["start_delay_ms"] == 100
@@ -1,8 +1,11 @@
+import asyncio
+import threading
+
 import pytest
 import time
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
-from agenticanimatronics.llm import LLMHandler
+from agenticanimatronics.llm import LLMEventLoop, LLMHandler, close_shared_event_loop, shared_event_loop
 
 
 @pytest.fixture
@@ -43,6 +46,22 @@ def mock_time(monkeypatch):
     return mock_sleep
 
 
+@pytest.fixture
+def mock_acompletion(monkeypatch, mock_completion):
+    """Fixture that mocks litellm acompletion function"""
+    mock_acompletion_func = AsyncMock(return_value=mock_completion['response'])
+    monkeypatch.setattr("agenticanimatronics.llm.acompletion", mock_acompletion_func)
+    return mock_acompletion_func
+
+
+@pytest.fixture
+def llm_loop():
+    """Fixture that runs a private event loop for async requests"""
+    loop = LLMEventLoop(max_concurrency=2)
+    yield loop
+    loop.close()
+
+
 @pytest.fixture
 def llm_handler():
     """Fixture that creates an LLMHandler instance"""
@@ -213,15 +232,31 @@ class TestLLMHandler:
         assert "mysterious stranger" in result2
 
     def test_sleep_timing_between_retries(self, llm_handler, mock_completion, mock_time):
-        """Test that sleep is called between retries with correct timing"""
+        """Test that the delay between retries backs off exponentially, with jitter"""
         mock_completion['function'].side_effect = Exception("API Error")
         
         llm_handler.generate_response("Test")
         
-        # Should sleep 1 second between each retry
+        # 0.25 then 0.5 seconds, each scaled down by up to half
         assert mock_time.call_count == 2
-        for call in mock_time.call_args_list:
-            assert call[0][0] == 1  # 1 second sleep
+        first, second = (call[0][0] for call in mock_time.call_args_list)
+        assert 0.125 <= first <= 0.25
+        assert 0.25 <= second <= 0.5
+
+    def test_circuit_breaker_fails_fast(self, llm_handler, mock_completion, mock_time):
+        """Test that requests go straight to the fallback while the provider is down"""
+        mock_completion['function'].side_effect = Exception("API Error")
+        llm_handler.generate_response("Test")
+        llm_handler.generate_response("Test")
+        assert llm_handler.breaker.state == "open"
+        mock_completion['function'].reset_mock()
+        mock_time.reset_mock()
+
+        result = llm_handler.generate_response("Test")
+
+        assert "foggy" in result
+        mock_completion['function'].assert_not_called()
+        mock_time.assert_not_called()
 
 
 class TestLLMHandlerIntegration:
@@ -264,4 +299,174 @@ class TestLLMHandlerIntegration:
         mock_completion['function'].side_effect = None
         mock_completion['function'].return_value = mock_completion['response']
         result2 = llm_handler.generate_response("Second request")
-        assert result2 == "Test LLM response"
\ No newline at end of file
+        assert result2 == "Test LLM response"
+
+class TestLLMHandlerAsync:
+    """Test cases for the async LLMHandler methods"""
+
+    @pytest.fixture
+    def async_handler(self, llm_loop):
+        return LLMHandler("test-model", event_loop=llm_loop)
+
+    def test_agenerate_success(self, async_handler, llm_loop, mock_acompletion):
+        """Test that agenerate returns the response and uses the shared HTTP client"""
+        result = asyncio.run(async_handler.agenerate("Test prompt"))
+
+        assert result == "Test LLM response"
+        mock_acompletion.assert_called_once_with(
+            model="test-model",
+            messages=[{"role": "user", "content": "Test prompt"}],
+            client=llm_loop.client,
+        )
+
+    def test_agenerate_retry(self, async_handler, mock_acompletion, mock_completion, monkeypatch):
+        """Test that agenerate retries and falls back like generate_response"""
+        monkeypatch.setattr("agenticanimatronics.llm.asyncio.sleep", AsyncMock())
+        mock_acompletion.side_effect = [Exception("API Error"), mock_completion['response']]
+        assert asyncio.run(async_handler.agenerate("Test")) == "Test LLM response"
+
+        mock_acompletion.side_effect = Exception("API Error")
+        assert "foggy" in asyncio.run(async_handler.agenerate("Test"))
+        assert mock_acompletion.call_count == 5
+
+    def test_aexplain_image_success(self, async_handler, mock_acompletion, mock_encode_image):
+        """Test that aexplain_image sends the encoded image"""
+        result = asyncio.run(async_handler.aexplain_image("/path/to/image.jpg", "Describe this image"))
+
+        assert result == "Test LLM response"
+        content = mock_acompletion.call_args.kwargs['messages'][0]['content']
+        assert content[0]['text'] == "Describe this image"
+        assert 'base64_encoded_image_data' in content[1]['image_url']['url']
+
+    def test_aexplain_image_failure(self, async_handler, mock_acompletion, mock_encode_image, monkeypatch):
+        """Test that aexplain_image falls back like explain_image"""
+        monkeypatch.setattr("agenticanimatronics.llm.asyncio.sleep", AsyncMock())
+        mock_encode_image.side_effect = FileNotFoundError("no photo")
+
+        result = asyncio.run(async_handler.aexplain_image("/path/to/image.jpg", "Describe"))
+
+        assert "mysterious stranger" in result
+        mock_acompletion.assert_not_called()
+
+    def test_concurrency_limit(self, async_handler, mock_acompletion, mock_completion):
+        """Test that no more than max_concurrency requests are in flight at once"""
+        in_flight = []
+        peak = []
+
+        async def slow_completion(**kwargs):
+            in_flight.append(1)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.02)
+            in_flight.pop()
+            return mock_completion['response']
+
+        mock_acompletion.side_effect = slow_completion
+
+        async def many():
+            return await asyncio.gather(*(async_handler.agenerate(f"Request {i}") for i in range(6)))
+
+        results = asyncio.run(many())
+
+        assert results == ["Test LLM response"] * 6
+        assert max(peak) == 2
+
+    def test_cancel_abandons_request(self, async_handler, llm_loop, mock_acompletion):
+        """Test that cancelling a request cancels it on the shared loop"""
+        started = threading.Event()
+        cancelled = threading.Event()
+
+        async def hanging_completion(**kwargs):
+            started.set()
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        mock_acompletion.side_effect = hanging_completion
+
+        future = llm_loop.submit(async_handler.agenerate("Test"))
+        assert started.wait(2)
+        future.cancel()
+
+        assert cancelled.wait(2)
+
+    def test_run_timeout_cancels(self, llm_loop):
+        """Test that a request that takes too long is cancelled"""
+        cancelled = threading.Event()
+
+        async def hang():
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(TimeoutError):
+            llm_loop.run(hang(), timeout=0.05)
+        assert cancelled.wait(2)
+
+    def test_shared_event_loop(self):
+        """Test that handlers share one event loop by default"""
+        assert LLMHandler("model1").event_loop is LLMHandler("model2").event_loop is shared_event_loop()
+
+    def test_achat_passes_options(self, async_handler, llm_loop, mock_acompletion, mock_completion):
+        """Test that achat returns the whole response and passes extra options to litellm"""
+        messages = [{"role": "user", "content": "Hello"}]
+
+        response = asyncio.run(async_handler.achat(messages, temperature=0.0))
+
+        assert response is mock_completion['response']
+        mock_acompletion.assert_called_once_with(
+            model="test-model", messages=messages, client=llm_loop.client, temperature=0.0)
+
+    def test_astream_chat_read_through_iterate(self, async_handler, llm_loop, mock_acompletion):
+        """Test that a streamed response can be read from synchronous code"""
+        async def chunks():
+            for chunk in ["Arr", ", ", "matey"]:
+                yield chunk
+
+        mock_acompletion.return_value = chunks()
+
+        assert list(llm_loop.iterate(async_handler.astream_chat([]))) == ["Arr", ", ", "matey"]
+        assert mock_acompletion.call_args.kwargs["stream"] is True
+
+    def test_iterate_raises_stream_errors(self, llm_loop):
+        """Test that an error part way through a stream reaches the reader"""
+        async def broken():
+            yield "Arr"
+            raise ConnectionError("dropped")
+
+        stream = llm_loop.iterate(broken())
+
+        assert next(stream) == "Arr"
+        with pytest.raises(ConnectionError):
+            next(stream)
+
+    def test_iterate_close_cancels_stream(self, llm_loop):
+        """Test that closing the iterator early stops reading the stream"""
+        cancelled = threading.Event()
+
+        async def endless():
+            try:
+                while True:
+                    yield "Arr"
+                    await asyncio.sleep(0.01)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        stream = llm_loop.iterate(endless())
+        next(stream)
+        stream.close()
+
+        assert cancelled.wait(2)
+
+    def test_close_shared_event_loop(self):
+        """Test that the shared loop is closed and a new one started on next use"""
+        loop = shared_event_loop()
+
+        close_shared_event_loop()
+
+        assert loop.closed
+        assert shared_event_loop() is not loop
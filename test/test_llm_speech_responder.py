@@ -1,8 +1,9 @@
 import pytest
 import time
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
-from agenticanimatronics.llm_speech_responder import LLMSpeechResponder
+from agenticanimatronics.llm_speech_responder import FALLBACK_RESPONSE, LLMSpeechResponder
+from agenticanimatronics.resilience import RetryPolicy
 
 
 @pytest.fixture
@@ -20,6 +21,7 @@ def mock_pirate_chatbot(monkeypatch):
     """Fixture that mocks PirateChatBot"""
     mock_chatbot = MagicMock()
     mock_chatbot.forward.return_value = "Arr, test response matey!"
+    mock_chatbot.asummarize = AsyncMock(return_value="")
     monkeypatch.setattr("agenticanimatronics.llm_speech_responder.PirateChatBot", 
                        lambda: mock_chatbot)
     return mock_chatbot
@@ -88,11 +90,29 @@ class TestLLMSpeechResponder:
 
     def test_text_to_speech_stream_success(self, llm_speech_responder, mock_elevenlabs):
         """Test successful text-to-speech conversion"""
+        mock_elevenlabs['response'].__iter__.return_value = iter([b"ab", b"cd"])
+
         result = llm_speech_responder.text_to_speech_stream("Test text")
         
         assert result == b"audio_data"
         mock_elevenlabs['client'].generate.assert_called_once()
-        mock_elevenlabs['stream'].assert_called_once_with(mock_elevenlabs['response'])
+        assert list(mock_elevenlabs['stream'].call_args[0][0]) == [b"ab", b"cd"]
+
+    def test_text_to_speech_stream_retries_lazy_failure(self, llm_speech_responder, mock_elevenlabs, mock_time):
+        """Test that a stream that fails when first read is retried, as the real client only
+        connects once the stream is read"""
+        def failing():
+            raise ConnectionError("API Error")
+            yield
+
+        mock_elevenlabs['client'].generate.side_effect = [failing(), iter([b"arr"])]
+        mock_elevenlabs['stream'].side_effect = lambda audio: b"".join(audio)
+
+        result = llm_speech_responder.text_to_speech_stream("Test text")
+
+        assert result == b"arr"
+        assert mock_elevenlabs['client'].generate.call_count == 2
+        assert mock_time.sleep.call_count == 1
 
     @pytest.mark.parametrize("attempt,should_succeed", [
         (1, True),   # First attempt succeeds
@@ -197,6 +217,33 @@ class TestLLMSpeechResponder:
         assert len(call_args.kwargs['history']) == 4
         assert call_args.kwargs['history'][0]["content"] == "Previous user message"
 
+    def test_long_history_is_windowed(self, llm_speech_responder, mock_pirate_chatbot):
+        """Test that only the recent turns and a summary of the rest are sent to the chatbot"""
+        mock_pirate_chatbot.asummarize.return_value = "The visitor is called Sam"
+        for i in range(6):
+            llm_speech_responder.update_conversational_history(f"question {i}", f"answer {i}")
+        llm_speech_responder.history_window.wait(timeout=1)
+
+        llm_speech_responder.generate("user desc", "new message")
+
+        history = mock_pirate_chatbot.forward.call_args.kwargs['history']
+        assert history[0]["content"].endswith("The visitor is called Sam")
+        assert len(history) < len(llm_speech_responder.conversation_history)
+
+    def test_generate_reuses_speculative_response(self, llm_speech_responder, mock_pirate_chatbot,
+                                                  mock_elevenlabs):
+        """Test that a response speculated from a stable partial is reused"""
+        llm_speech_responder.speculate("user desc", "what is your name")
+        llm_speech_responder.speculator._timer.join(1)
+        llm_speech_responder.speculator._current.future.result(timeout=1)
+        mock_pirate_chatbot.forward.reset_mock()
+
+        llm_speech_responder.generate("user desc", "What is your name?")
+
+        mock_pirate_chatbot.forward.assert_not_called()
+        assert llm_speech_responder.speculator.hits == 1
+        assert llm_speech_responder.conversation_history[1]["content"] == "Arr, test response matey!"
+
     @pytest.mark.parametrize("user_description,expected_description", [
         ("A tall person", "A tall person"),
         ("", ""),
@@ -254,4 +301,408 @@ class TestLLMSpeechResponderIntegration:
         # Should have fallback response from first call and normal response from second
         assert len(llm_speech_responder.conversation_history) == 4
         assert "something went wrong" in llm_speech_responder.conversation_history[1]["content"]
-        assert llm_speech_responder.conversation_history[3]["content"] == "Arr, working again!"
\ No newline at end of file
+        assert llm_speech_responder.conversation_history[3]["content"] == "Arr, working again!"
+
+class TestLLMSpeechResponderStreaming:
+    """Test cases for the streaming response path"""
+
+    @pytest.fixture
+    def streaming_responder(self, mock_llm_handler, mock_pirate_chatbot, mock_elevenlabs, mock_pyaudio):
+        mock_pirate_chatbot.stream.return_value = iter(["Arr, ma", "tey! Welcome ", "aboard me ship."])
+        mock_elevenlabs['client'].generate.side_effect = lambda text, **kwargs: iter([text.encode()])
+        mock_elevenlabs['stream'].side_effect = lambda audio: b"".join(audio)
+        return LLMSpeechResponder("test_voice_id", streaming=True)
+
+    def test_speaks_each_sentence_in_order(self, streaming_responder, mock_pirate_chatbot, mock_elevenlabs):
+        """Test that each sentence is synthesized separately and played through one stream"""
+        streaming_responder.generate("user desc", "Hello")
+
+        spoken = {c.kwargs['text'] for c in mock_elevenlabs['client'].generate.call_args_list}
+        assert spoken == {"Arr, matey!", "Welcome aboard me ship."}
+        mock_elevenlabs['stream'].assert_called_once()
+        mock_pirate_chatbot.forward.assert_not_called()
+
+    def test_full_text_in_history(self, streaming_responder):
+        """Test that the whole streamed response is saved in the conversation history"""
+        streaming_responder.generate("user desc", "Hello")
+
+        assert streaming_responder.conversation_history == [
+            {"role": "user", "content": "Hello"},
+            {"role": "assistant", "content": "Arr, matey! Welcome aboard me ship."},
+        ]
+
+    def test_failed_sentence_is_skipped(self, streaming_responder, mock_elevenlabs, mock_time):
+        """Test that a sentence that cannot be synthesized does not stop the rest"""
+        def generate(text, **kwargs):
+            if text == "Arr, matey!":
+                raise Exception("API Error")
+            return iter([text.encode()])
+
+        mock_elevenlabs['client'].generate.side_effect = generate
+
+        streaming_responder.generate("user desc", "Hello")
+
+        assert mock_elevenlabs['client'].generate.call_count == 4
+        assert streaming_responder.conversation_history[1]["content"] == "Arr, matey! Welcome aboard me ship."
+
+    def test_stream_failure_keeps_spoken_text(self, streaming_responder, mock_pirate_chatbot):
+        """Test that a stream that breaks part way keeps what was already said"""
+        def broken_stream(**kwargs):
+            yield "Arr, matey! Welcome "
+            raise ConnectionError("stream dropped")
+
+        mock_pirate_chatbot.stream.side_effect = broken_stream
+
+        streaming_responder.generate("user desc", "Hello")
+
+        assert streaming_responder.conversation_history[1]["content"] == "Arr, matey!"
+
+    def test_stream_failure_before_speaking(self, streaming_responder, mock_pirate_chatbot):
+        """Test that a stream that fails immediately falls back like a failed response"""
+        mock_pirate_chatbot.stream.side_effect = ConnectionError("no stream")
+
+        streaming_responder.generate("user desc", "Hello")
+
+        assert "something went wrong" in streaming_responder.conversation_history[1]["content"]
+
+
+class TestLLMSpeechResponderCache:
+    """Test cases for speech served from the TTS cache"""
+
+    @pytest.fixture
+    def cached_responder(self, tmp_path, mock_llm_handler, mock_pirate_chatbot, mock_elevenlabs, mock_pyaudio):
+        from agenticanimatronics.tts_cache import TTSCache
+
+        mock_elevenlabs['client'].generate.side_effect = lambda **kwargs: iter([b"arr", b"rr"])
+        mock_elevenlabs['stream'].side_effect = lambda audio: b"".join(audio)
+        return LLMSpeechResponder("test_voice_id", tts_cache=TTSCache(str(tmp_path)))
+
+    def test_repeated_line_uses_cache(self, cached_responder, mock_elevenlabs):
+        """Test that a line said twice is only synthesized once"""
+        first = cached_responder.text_to_speech_stream("Arr, matey!")
+        second = cached_responder.text_to_speech_stream("Arr, matey!")
+
+        assert first == second == b"arrrr"
+        mock_elevenlabs['client'].generate.assert_called_once()
+        assert cached_responder.tts_cache.hits == 1
+
+    def test_different_voice_is_not_shared(self, cached_responder, mock_elevenlabs):
+        """Test that another voice does not reuse the cached audio"""
+        cached_responder.text_to_speech_stream("Arr, matey!")
+        cached_responder.eleven_labs_voice_id = "other_voice"
+        cached_responder.text_to_speech_stream("Arr, matey!")
+
+        assert mock_elevenlabs['client'].generate.call_count == 2
+
+
+class TestLLMSpeechResponderOutputEngine:
+    """Test cases for speech played through the shared audio output"""
+
+    @pytest.fixture
+    def engine_responder(self, mock_llm_handler, mock_pirate_chatbot, mock_elevenlabs):
+        engine = MagicMock()
+        engine.sample_rate = 16000
+        return LLMSpeechResponder("test_voice_id", output_engine=engine)
+
+    def test_requests_pcm_and_plays_in_process(self, engine_responder, mock_elevenlabs):
+        """Test that raw PCM at the engine rate is requested and played without mpv"""
+        engine_responder.text_to_speech_stream("Arr!")
+
+        assert mock_elevenlabs['client'].generate.call_args.kwargs['output_format'] == "pcm_16000"
+        engine_responder.output_engine.play_stream.assert_called_once()
+        assert engine_responder.output_engine.play_stream.call_args.kwargs == dict(
+            name="speech", jitter_buffer=engine_responder.jitter_buffer, fade_in_ms=0, on_start=None)
+        mock_elevenlabs['stream'].assert_not_called()
+
+    def test_each_sentence_restarts_jitter_measurement(self, engine_responder, mock_elevenlabs):
+        """Test that the wait for each sentence's first audio is not measured as jitter"""
+        def play_stream(audio, **kwargs):
+            list(audio)
+            return MagicMock(played_bytes=0)
+
+        mock_elevenlabs['client'].generate.side_effect = lambda **kwargs: iter([b'\x00\x00'])
+        engine_responder.output_engine.play_stream.side_effect = play_stream
+        engine_responder.jitter_buffer = MagicMock()
+
+        engine_responder.speak(["Arr, matey!", "Welcome aboard."])
+
+        assert engine_responder.jitter_buffer.start_segment.call_count == 2
+
+    def test_cancel_speech_stops_playback(self, engine_responder):
+        """Test that abandoning a response stops the speech that is playing"""
+        engine_responder.cancel_speech()
+
+        engine_responder.output_engine.stop_all.assert_called_once_with(name="speech")
+
+    def test_resamples_pcm_to_engine_rate(self, mock_llm_handler, mock_pirate_chatbot, mock_elevenlabs):
+        """Test that PCM at a different rate is resampled before playback"""
+        engine = MagicMock()
+        engine.sample_rate = 16000
+        played = []
+        engine.play_stream.side_effect = lambda audio, **kwargs: played.extend(audio)
+        mock_elevenlabs['client'].generate.return_value = iter([b"\x00\x10" * 2400])
+        responder = LLMSpeechResponder("test_voice_id", output_engine=engine, output_format="pcm_24000")
+
+        responder.text_to_speech_stream("Arr!")
+
+        assert mock_elevenlabs['client'].generate.call_args.kwargs['output_format'] == "pcm_24000"
+        assert abs(len(b"".join(played)) - 1600 * 2) <= 4
+
+    def test_fillers_crossfade_into_response(self, mock_llm_handler, mock_pirate_chatbot, mock_elevenlabs, monkeypatch):
+        """Test that the response fades in over a filler that is still playing and ends it on start"""
+        monkeypatch.setattr("agenticanimatronics.llm_speech_responder.FILLER_LINES", [])
+        engine = MagicMock()
+        engine.sample_rate = 16000
+        responder = LLMSpeechResponder("test_voice_id", output_engine=engine, fillers=True)
+        responder.filler._voice = MagicMock(is_playing=True)
+
+        responder.text_to_speech_stream("Arr!")
+
+        kwargs = engine.play_stream.call_args.kwargs
+        assert kwargs['fade_in_ms'] == responder.filler.crossfade_ms
+        assert kwargs['on_start'] == responder.filler.response_started
+
+    def test_generate_disarms_fillers(self, mock_llm_handler, mock_pirate_chatbot, mock_elevenlabs, mock_time,
+                                      monkeypatch):
+        """Test that the filler deadline is armed for a turn and disarmed when it ends"""
+        monkeypatch.setattr("agenticanimatronics.llm_speech_responder.FILLER_LINES", [])
+        engine = MagicMock()
+        engine.sample_rate = 16000
+        responder = LLMSpeechResponder("test_voice_id", output_engine=engine, fillers=True)
+        responder.filler = MagicMock()
+
+        responder.generate("A person", "Hello")
+
+        responder.filler.arm.assert_called_once()
+        responder.filler.disarm.assert_called_once()
+
+    def test_fillers_need_an_engine(self, mock_llm_handler, mock_pirate_chatbot, mock_elevenlabs):
+        """Test that fillers are left off when there is no shared output to play them through"""
+        responder = LLMSpeechResponder("test_voice_id", fillers=True)
+
+        assert responder.filler is None
+
+    def test_interrupted_response_keeps_what_was_heard(self, mock_llm_handler, mock_pirate_chatbot,
+                                                       mock_elevenlabs, mock_time):
+        """Test that a response the visitor talked over is cut back to what was played"""
+        mock_pirate_chatbot.forward.return_value = "Ahoy there matey, welcome aboard me ship!"
+        mock_elevenlabs['client'].generate.return_value = iter([b"\x00" * 1000])
+        engine = MagicMock()
+        engine.sample_rate = 16000
+        responder = LLMSpeechResponder("test_voice_id", output_engine=engine)
+
+        def play_stream(audio, **kwargs):
+            list(audio)
+            responder.interrupt()
+            return MagicMock(played_bytes=500)
+
+        engine.play_stream.side_effect = play_stream
+
+        responder.generate("A person", "Hello")
+
+        assert responder.conversation_history[-1]["content"] == "Ahoy there matey, welcome..."
+        engine.stop_all.assert_called_with(name="speech")
+
+    def test_interrupted_before_speaking(self, mock_llm_handler, mock_pirate_chatbot, mock_elevenlabs):
+        """Test that nothing is played once the visitor has interrupted the turn"""
+        engine = MagicMock()
+        engine.sample_rate = 16000
+        responder = LLMSpeechResponder("test_voice_id", output_engine=engine)
+        responder.interrupt()
+
+        assert responder.text_to_speech_stream("Arr!") is None
+        engine.play_stream.assert_not_called()
+
+    def test_pcm_without_engine_falls_back(self, mock_llm_handler, mock_pirate_chatbot, mock_elevenlabs):
+        """Test that raw PCM is not requested when there is nothing in process to play it"""
+        responder = LLMSpeechResponder("test_voice_id", output_format="pcm_16000")
+
+        assert responder.output_format == "mp3_22050_32"
+
+    def test_mp3_with_engine_falls_back(self, mock_llm_handler, mock_pirate_chatbot, mock_elevenlabs):
+        """Test that the engine streams raw PCM rather than waiting to decode a whole MP3"""
+        engine = MagicMock(sample_rate=16000)
+        responder = LLMSpeechResponder("test_voice_id", output_engine=engine, output_format="mp3_22050_32")
+
+        assert responder.output_format == "pcm_16000"
+        assert responder.output_codec == "pcm"
+
+
+class TestLLMSpeechResponderResponseCache:
+    """Test cases for answers served from the response cache"""
+
+    @pytest.fixture
+    def responder(self, mock_llm_handler, mock_pirate_chatbot, mock_elevenlabs, mock_pyaudio):
+        from agenticanimatronics.response_cache import ResponseCache
+
+        return LLMSpeechResponder("test_voice_id", response_cache=ResponseCache())
+
+    def test_repeated_question_skips_llm(self, responder, mock_pirate_chatbot, mock_elevenlabs):
+        """Test that a question a previous visitor asked is answered without the llm"""
+        responder._add_variant = MagicMock()
+        responder.generate("A person", "Who are you, pirate?")
+        responder.conversation_history = []
+        responder.generate("A person", "who are you pirate")
+
+        assert mock_pirate_chatbot.forward.call_count == 1
+        assert responder.conversation_history[-1]["content"] == "Arr, test response matey!"
+        assert responder.response_cache.hits == 1
+        assert mock_elevenlabs['client'].generate.call_count == 2
+
+    def test_hit_writes_another_variant(self, responder, mock_pirate_chatbot):
+        """Test that a hit on a question with few answers writes another in the background"""
+        responder._add_variant = MagicMock()
+        responder.response_cache.put("who are you pirate", "Captain Bones!")
+        mock_pirate_chatbot.forward.return_value = "The scourge of the seas!"
+
+        responder.generate("A person", "who are you pirate")
+        responder._add_variant.assert_called_once_with("A person", "who are you pirate")
+        LLMSpeechResponder._add_variant(responder, "A person", "who are you pirate")
+
+        assert responder.conversation_history[-1]["content"] == "Captain Bones!"
+        assert mock_pirate_chatbot.forward.call_args.kwargs["history"] == []
+        assert responder.response_cache.get("who are you pirate") == "The scourge of the seas!"
+
+    def test_later_turns_not_cached(self, responder, mock_pirate_chatbot):
+        """Test that answers deep into a conversation are neither cached nor looked up"""
+        responder.conversation_history = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "Arr"}] * 2
+
+        responder.generate("A person", "who are you pirate")
+
+        assert len(responder.response_cache) == 0
+
+    def test_interrupted_answer_not_cached(self, mock_llm_handler, mock_pirate_chatbot, mock_elevenlabs):
+        """Test that an answer the visitor talked over is not saved for the next visitor"""
+        from agenticanimatronics.response_cache import ResponseCache
+
+        engine = MagicMock()
+        engine.sample_rate = 16000
+        responder = LLMSpeechResponder(
+            "test_voice_id", streaming=True, output_engine=engine, response_cache=ResponseCache())
+        mock_pirate_chatbot.stream.return_value = iter(["Arr, I be ", "Captain Bones. ", "Scourge of the seas!"])
+        engine.play_stream.side_effect = lambda audio, **kwargs: responder.interrupt()
+
+        responder.generate("A person", "who are you pirate")
+
+        assert len(responder.response_cache) == 0
+
+
+class TestLLMSpeechResponderChatEngine:
+    """Test cases for choosing the chat engine"""
+
+    def test_fast_engine(self, mock_llm_handler, mock_pirate_chatbot, mock_elevenlabs, monkeypatch):
+        """Test that the fast engine generates responses instead of the dspy program"""
+        fast_chat = MagicMock()
+        fast_chat.forward.return_value = "Arr, fast response!"
+        monkeypatch.setattr("agenticanimatronics.llm_speech_responder.FastPirateChat", lambda: fast_chat)
+        responder = LLMSpeechResponder("test_voice_id", chat_engine="fast")
+
+        responder.generate("A person", "Hello")
+
+        mock_pirate_chatbot.forward.assert_not_called()
+        assert responder.conversation_history[-1]["content"] == "Arr, fast response!"
+
+    def test_unknown_engine_uses_dspy(self, mock_llm_handler, mock_pirate_chatbot, mock_elevenlabs):
+        """Test that an unknown engine name falls back to the dspy program"""
+        responder = LLMSpeechResponder("test_voice_id", chat_engine="turbo")
+
+        assert responder.pirate_chatbot is mock_pirate_chatbot
+
+
+class TestLLMSpeechResponderResilience:
+    """Test cases for failing fast while a provider is down"""
+
+    def test_tts_fails_fast_while_open(self, llm_speech_responder, mock_elevenlabs, mock_time):
+        """Test that speech is skipped without retries once ElevenLabs is known to be down"""
+        def failing_stream(**kwargs):
+            # The real client only connects once the stream is read
+            raise ConnectionError("API Error")
+            yield
+
+        mock_elevenlabs['client'].generate.side_effect = failing_stream
+        llm_speech_responder.text_to_speech_stream("Arr!")
+        llm_speech_responder.text_to_speech_stream("Arr!")
+        mock_elevenlabs['client'].generate.reset_mock()
+
+        assert llm_speech_responder.text_to_speech_stream("Arr!") is None
+        mock_elevenlabs['client'].generate.assert_not_called()
+        assert llm_speech_responder.tts_breaker.stats()["trips"] == 1
+
+    def test_chat_fails_fast_while_open(self, llm_speech_responder, mock_pirate_chatbot, mock_elevenlabs):
+        """Test that the pirate chat is not called while its circuit is open, and the fallback is spoken"""
+        llm_speech_responder.retry_policy = RetryPolicy(initial_backoff=0)
+        mock_pirate_chatbot.forward.side_effect = Exception("Chatbot error")
+        for _ in range(2):
+            llm_speech_responder.generate("A person", "Hello")
+        mock_pirate_chatbot.forward.reset_mock()
+        mock_elevenlabs['client'].generate.reset_mock()
+
+        llm_speech_responder.generate("A person", "Hello")
+
+        mock_pirate_chatbot.forward.assert_not_called()
+        assert llm_speech_responder.chat_breaker.state == "open"
+        assert llm_speech_responder.conversation_history[-1]["content"] == FALLBACK_RESPONSE
+        assert mock_elevenlabs['client'].generate.call_args.kwargs['text'] == FALLBACK_RESPONSE
+        mock_elevenlabs['stream'].assert_called()
+
+    def test_forward_retries_chat_errors(self, llm_speech_responder, mock_pirate_chatbot):
+        """Test that a failed chat request is retried, whichever chat engine is in use"""
+        llm_speech_responder.retry_policy = RetryPolicy(initial_backoff=0)
+        mock_pirate_chatbot.forward.side_effect = [ConnectionError("API Error"), "Arr, back again!"]
+
+        assert llm_speech_responder.forward([], "Hello") == "Arr, back again!"
+        assert mock_pirate_chatbot.forward.call_count == 2
+
+    def test_stream_breaking_part_way_counts_as_failure(self, llm_speech_responder, mock_elevenlabs):
+        """Test that a TTS stream that fails after its first chunk is recorded on the breaker"""
+        def breaking_stream(**kwargs):
+            yield b"arr"
+            raise ConnectionError("Connection reset")
+
+        mock_elevenlabs['client'].generate.side_effect = breaking_stream
+        audio = llm_speech_responder.synthesize("Arr!")
+
+        assert next(audio) == b"arr"
+        with pytest.raises(ConnectionError):
+            next(audio)
+        assert llm_speech_responder.tts_breaker._failures == 1
+
+    def test_chat_stream_fails_fast_while_open(self, mock_llm_handler, mock_pirate_chatbot, mock_elevenlabs,
+                                               mock_time):
+        """Test that streamed turns go straight to the fallback while the chat provider is down"""
+        def failing_stream(**kwargs):
+            raise ConnectionError("API Error")
+            yield
+
+        mock_pirate_chatbot.stream.side_effect = failing_stream
+        responder = LLMSpeechResponder("test_voice_id", streaming=True)
+        responder.generate("A person", "Hello")
+        responder.generate("A person", "Hello")
+        assert responder.chat_breaker.state == "open"
+        mock_pirate_chatbot.stream.reset_mock()
+
+        mock_elevenlabs['client'].generate.reset_mock()
+
+        responder.generate("A person", "Hello")
+
+        mock_pirate_chatbot.stream.assert_not_called()
+        assert responder.conversation_history[-1]["content"] == FALLBACK_RESPONSE
+        assert mock_elevenlabs['client'].generate.call_args.kwargs['text'] == FALLBACK_RESPONSE
+        mock_elevenlabs['stream'].assert_called()
+
+    def test_chat_stream_retried_before_first_token(self, mock_llm_handler, mock_pirate_chatbot, mock_elevenlabs,
+                                                    mock_time):
+        """Test that a stream that fails before its first token is retried"""
+        def failing_stream(**kwargs):
+            raise ConnectionError("API Error")
+            yield
+
+        mock_pirate_chatbot.stream.side_effect = [failing_stream(), iter(["Arr, matey!"])]
+        mock_elevenlabs['client'].generate.side_effect = lambda text, **kwargs: iter([text.encode()])
+        mock_elevenlabs['stream'].side_effect = lambda audio: b"".join(audio)
+        responder = LLMSpeechResponder("test_voice_id", streaming=True)
+
+        responder.generate("A person", "Hello")
+
+        assert responder.conversation_history[-1]["content"] == "Arr, matey!"
+        assert responder.chat_breaker.state == "closed"
@@ -1,8 +1,9 @@
+import numpy as np
+import pyaudio
 import pytest
-from array import array
 from unittest.mock import MagicMock
 
-from agenticanimatronics.mutable_microphone_stream import MutableMicrophoneStream
+from agenticanimatronics.mutable_microphone_stream import MutableMicrophoneStream, NoiseReducedMicrophoneStream
 
 
 @pytest.fixture
@@ -37,25 +38,7 @@ def mock_pyaudio_module(monkeypatch):
 
 
 @pytest.fixture
-def mock_array(monkeypatch):
-    """Fixture that mocks array operations"""
-    def mock_array_func(type_code, data):
-        mock_arr = MagicMock()
-        # Simulate max() behavior
-        if data:
-            mock_arr.__iter__ = lambda: iter([100, 200, 300])  # Mock audio levels
-            mock_arr.__bool__ = lambda: True
-        else:
-            mock_arr.__iter__ = lambda: iter([])
-            mock_arr.__bool__ = lambda: False
-        return mock_arr
-    
-    monkeypatch.setattr("array.array", mock_array_func)
-    return mock_array_func
-
-
-@pytest.fixture
-def microphone_stream(mock_pyaudio_module, mock_array):
+def microphone_stream(mock_pyaudio_module):
     """Fixture that creates a MutableMicrophoneStream with mocked dependencies"""
     return MutableMicrophoneStream(sample_rate=16000, threshold=500)
 
@@ -79,7 +62,7 @@ class TestMutableMicrophoneStream:
         (22050, 1, 250),
         (16000, 0, 100),
     ])
-    def test_init_different_parameters(self, mock_pyaudio_module, mock_array, 
+    def test_init_different_parameters(self, mock_pyaudio_module, 
                                       sample_rate, device_index, threshold):
         """Test initialization with different parameters"""
         stream = MutableMicrophoneStream(
@@ -102,35 +85,91 @@ class TestMutableMicrophoneStream:
 
     @pytest.mark.parametrize("is_muted,threshold,audio_level,expected_silence", [
         (False, 500, 400, True),   # Unmuted, below threshold - should return silence
+        (False, 500, 600, False),  # Unmuted, above threshold - should return audio
+        (False, 500, -600, False), # Negative peaks count as loud too
         (True, 500, 600, True),    # Muted, above threshold - should return silence
         (True, 500, 400, True),    # Muted, below threshold - should return silence
     ])
-    def test_next_audio_processing(self, microphone_stream, mock_pyaudio_module, mock_array,
+    def test_next_audio_processing(self, microphone_stream, mock_pyaudio_module,
                                   is_muted, threshold, audio_level, expected_silence):
         """Test audio processing logic in __next__"""
         microphone_stream.is_muted = is_muted
         microphone_stream.threshold = threshold
-        
-        # Mock the audio level by controlling what max() returns
-        def mock_array_with_level(type_code, data):
-            mock_arr = MagicMock()
-            mock_arr.__iter__ = lambda: iter([audio_level])
-            mock_arr.__bool__ = lambda: True
-            return mock_arr
-        
-        import builtins
-        original_max = builtins.max
-        builtins.max = lambda arr: audio_level if arr else 0
-        
-        try:
-            result = next(microphone_stream)
-            
-            if expected_silence:
-                assert result == b'\x00' * (microphone_stream._chunk_size * 2)
-            else:
-                assert result == b'\x00\x01' * 50  # Mock audio data
-        finally:
-            builtins.max = original_max
+
+        # A constant-level chunk has an RMS equal to its level
+        audio = np.full(microphone_stream._chunk_size, audio_level, dtype=np.int16).tobytes()
+        mock_pyaudio_module['stream'].read.return_value = audio
+
+        result = next(microphone_stream)
+
+        if expected_silence:
+            assert result == b'\x00' * (microphone_stream._chunk_size * 2)
+        else:
+            assert result == audio
+
+    def test_next_cancels_echo_before_gate(self, microphone_stream, mock_pyaudio_module):
+        """Test that the echo canceller runs before the speech gate, so echo alone stays silent"""
+        chunk_size = microphone_stream._chunk_size
+        echo = np.full(chunk_size, 2000, dtype=np.int16).tobytes()
+        mock_pyaudio_module['stream'].read.return_value = echo
+        microphone_stream.echo_canceller = MagicMock()
+        microphone_stream.echo_canceller.process.return_value = b'\x00' * (chunk_size * 2)
+
+        result = next(microphone_stream)
+
+        microphone_stream.echo_canceller.process.assert_called_once_with(echo)
+        assert result == b'\x00' * (chunk_size * 2)
+
+    @pytest.mark.parametrize("closed", [True, False])
+    def test_next_gated_during_playback(self, microphone_stream, mock_pyaudio_module, closed):
+        """Test that a closed gate produces silence and an open one lets speech straight through"""
+        chunk_size = microphone_stream._chunk_size
+        loud = np.full(chunk_size, 2000, dtype=np.int16).tobytes()
+        mock_pyaudio_module['stream'].read.return_value = loud
+        microphone_stream.gate = MagicMock(is_closed=closed)
+
+        result = next(microphone_stream)
+
+        assert result == (b'\x00' * (chunk_size * 2) if closed else loud)
+        mock_pyaudio_module['stream'].read.assert_called_once()
+
+    def test_next_hangover_keeps_speech_open(self, microphone_stream, mock_pyaudio_module):
+        """Test that short dips below the threshold do not cut speech off"""
+        chunk_size = microphone_stream._chunk_size
+        loud = np.full(chunk_size, 2000, dtype=np.int16).tobytes()
+        quiet = np.full(chunk_size, 10, dtype=np.int16).tobytes()
+        mock_pyaudio_module['stream'].read.side_effect = [loud, quiet, quiet]
+
+        results = [next(microphone_stream) for _ in range(3)]
+
+        assert results == [loud, quiet, quiet]
+
+    def test_next_pre_roll_flushed_at_speech_onset(self, microphone_stream, mock_pyaudio_module):
+        """Test that audio from just before speech starts is sent ahead of the first voiced chunk"""
+        chunk_size = microphone_stream._chunk_size
+        soft = np.full(chunk_size, 50, dtype=np.int16).tobytes()
+        loud = np.full(chunk_size, 2000, dtype=np.int16).tobytes()
+        mock_pyaudio_module['stream'].read.side_effect = [soft, loud, loud]
+
+        results = [next(microphone_stream) for _ in range(3)]
+
+        assert results[0] == b'\x00' * (chunk_size * 2)
+        assert results[1] == soft + loud
+        assert results[2] == loud
+
+    def test_next_muted_clears_pre_roll(self, microphone_stream, mock_pyaudio_module):
+        """Test that audio captured while muted is never flushed as pre-roll"""
+        chunk_size = microphone_stream._chunk_size
+        soft = np.full(chunk_size, 50, dtype=np.int16).tobytes()
+        loud = np.full(chunk_size, 2000, dtype=np.int16).tobytes()
+        mock_pyaudio_module['stream'].read.side_effect = [soft, soft, loud]
+
+        next(microphone_stream)
+        microphone_stream.mute()
+        next(microphone_stream)
+        microphone_stream.unmute()
+
+        assert next(microphone_stream) == loud
 
     def test_next_stream_read_error(self, microphone_stream, mock_pyaudio_module):
         """Test handling of stream read errors"""
@@ -206,7 +245,7 @@ class TestMutableMicrophoneStream:
         microphone_stream.unmute()
         assert microphone_stream.is_muted is False
 
-    def test_context_manager(self, mock_pyaudio_module, mock_array):
+    def test_context_manager(self, mock_pyaudio_module):
         """Test context manager functionality"""
         with MutableMicrophoneStream(sample_rate=16000) as stream:
             assert stream._open is True
@@ -236,7 +275,7 @@ class TestMutableMicrophoneStream:
         call_args = mock_pyaudio_module['stream'].read.call_args
         assert call_args[1]['exception_on_overflow'] is False
 
-    def test_chunk_size_calculation(self, mock_pyaudio_module, mock_array):
+    def test_chunk_size_calculation(self, mock_pyaudio_module):
         """Test chunk size calculation"""
         sample_rate = 44100
         stream = MutableMicrophoneStream(sample_rate=sample_rate)
@@ -245,6 +284,49 @@ class TestMutableMicrophoneStream:
         assert stream._chunk_size == expected_chunk_size
 
 
+class TestMutableMicrophoneStreamCallbackCapture:
+    """Test cases for the callback-driven capture mode"""
+
+    @pytest.fixture
+    def callback_stream(self, mock_pyaudio_module):
+        """Fixture that creates a MutableMicrophoneStream in callback mode"""
+        return MutableMicrophoneStream(sample_rate=16000, threshold=500, use_callback=True, read_timeout_ms=10)
+
+    def test_opens_with_callback(self, callback_stream, mock_pyaudio_module):
+        """Test that the PortAudio stream is opened with a capture callback"""
+        call_args = mock_pyaudio_module['instance'].open.call_args
+        assert call_args[1]['stream_callback'] == callback_stream._on_audio
+
+    def test_callback_feeds_iterator(self, callback_stream, mock_pyaudio_module):
+        """Test that audio written by the callback is drained by the iterator"""
+        loud = np.full(callback_stream._chunk_size, 2000, dtype=np.int16).tobytes()
+
+        result = callback_stream._on_audio(loud, callback_stream._chunk_size, {}, 0)
+
+        assert result == (None, pyaudio.paContinue)
+        assert next(callback_stream) == loud
+        mock_pyaudio_module['stream'].read.assert_not_called()
+
+    def test_underrun_returns_silence(self, callback_stream):
+        """Test that a stalled callback yields silence within the read timeout"""
+        assert next(callback_stream) == b'\x00' * (callback_stream._chunk_size * 2)
+        assert callback_stream.underruns == 1
+
+    def test_overrun_is_counted(self, callback_stream):
+        """Test that the callback counts overruns when nobody drains the ring"""
+        chunk = b'\x00' * (callback_stream._chunk_size * 2)
+        for _ in range(41):
+            callback_stream._on_audio(chunk, callback_stream._chunk_size, {}, pyaudio.paInputOverflow)
+
+        assert callback_stream.overruns == 1
+        assert callback_stream.input_overflows == 41
+
+    def test_blocking_mode_has_no_counters(self, microphone_stream):
+        """Test that blocking capture reports no ring buffer activity"""
+        assert microphone_stream.overruns == 0
+        assert microphone_stream.underruns == 0
+
+
 class TestMutableMicrophoneStreamIntegration:
     """Integration-style tests for MutableMicrophoneStream"""
     
@@ -277,4 +359,25 @@ class TestMutableMicrophoneStreamIntegration:
         
         # Second call should succeed
         result2 = next(microphone_stream)
-        assert result2 != silence
\ No newline at end of file
+        assert result2 != silence
+
+class TestNoiseReducedMicrophoneStream:
+    """Test cases for NoiseReducedMicrophoneStream class"""
+
+    @pytest.fixture
+    def noise_reduced_stream(self, monkeypatch):
+        """Fixture that creates a NoiseReducedMicrophoneStream over a fake microphone"""
+        rng = np.random.default_rng(0)
+        chunks = iter([(rng.standard_normal(1600) * 300).astype(np.int16).tobytes() for _ in range(20)])
+        monkeypatch.setattr("assemblyai.extras.MicrophoneStream", lambda **kwargs: chunks)
+        return NoiseReducedMicrophoneStream(sample_rate=16000)
+
+    def test_chunks_keep_their_size(self, noise_reduced_stream):
+        """Test that every chunk is returned immediately at its original size"""
+        for _ in range(20):
+            assert len(next(noise_reduced_stream)) == 3200
+
+    def test_muted_returns_silence(self, noise_reduced_stream):
+        """Test that muting yields silence of the same size"""
+        noise_reduced_stream.mute()
+        assert next(noise_reduced_stream) == b'\x00' * 3200
@@ -1,10 +1,13 @@
 import pytest
 import multiprocessing
 import threading
+import time
 from unittest.mock import MagicMock
 import assemblyai as aai
 
+from agenticanimatronics.audio_bus import AudioBus
 from agenticanimatronics.pirate_agent import PirateAgent
+from agenticanimatronics.transcription import Transcript
 
 
 @pytest.fixture
@@ -20,12 +23,17 @@ def mock_all_dependencies(monkeypatch, mock_pyaudio, mock_microphone_stream,
                        lambda **kwargs: mock_image_analysis)
     monkeypatch.setattr("agenticanimatronics.pirate_agent.LLMSpeechResponder", 
                        lambda **kwargs: mock_llm_speech_responder)
-    monkeypatch.setattr("agenticanimatronics.pirate_agent.IdleMode", lambda: mock_idle_mode)
+    monkeypatch.setattr("agenticanimatronics.pirate_agent.IdleMode", lambda **kwargs: mock_idle_mode)
+    monkeypatch.setattr("agenticanimatronics.pirate_agent.TTSCache", lambda directory: MagicMock())
+    mock_output_engine = MagicMock()
+    mock_output_engine.sample_rate = 16000
+    monkeypatch.setattr("agenticanimatronics.pirate_agent.AudioOutputEngine", lambda **kwargs: mock_output_engine)
     monkeypatch.setattr("multiprocessing.Queue", lambda: mock_queue)
     
     return {
         'pyaudio': mock_pyaudio,
         'microphone_stream': mock_microphone_stream,
+        'output_engine': mock_output_engine,
         'transcriber': mock_assemblyai_transcriber,
         'image_analysis': mock_image_analysis,
         'llm_speech_responder': mock_llm_speech_responder,
@@ -138,6 +146,85 @@ class TestPirateAgent:
             pirate_agent.start_photo_updates.assert_not_called()
             assert result is None
 
+    @pytest.mark.parametrize("speculative,should_speculate", [
+        (True, True),
+        (False, False),
+    ])
+    def test_on_data_partial_speculates(self, pirate_agent, mock_all_dependencies, speculative, should_speculate):
+        """Test that partial transcripts are passed on for speculation only when enabled"""
+        pirate_agent.speculative = speculative
+        pirate_agent.start_photo_updates = MagicMock()
+        transcript = Transcript(text="what is your name", is_final=False)
+
+        pirate_agent.on_data(transcript)
+
+        speculate = mock_all_dependencies['llm_speech_responder'].speculate
+        assert speculate.called == should_speculate
+
+    @pytest.mark.parametrize("is_paused,in_idle_mode,should_force", [
+        (False, False, True),
+        (True, False, False),
+        (False, True, False),
+    ])
+    def test_on_endpoint_forces_end_of_utterance(self, pirate_agent, mock_all_dependencies,
+                                                 is_paused, in_idle_mode, should_force):
+        """Test that a local endpoint finalizes the utterance unless paused or idle"""
+        pirate_agent.is_paused = is_paused
+        pirate_agent.in_idle_mode = in_idle_mode
+
+        pirate_agent.on_endpoint()
+
+        assert mock_all_dependencies['transcriber'].force_end_utterance.called == should_force
+
+    @pytest.mark.parametrize("is_paused,should_interrupt", [
+        (False, True),
+        (True, False),
+    ])
+    def test_on_barge_in_interrupts_pirate(self, pirate_agent, mock_all_dependencies, is_paused, should_interrupt):
+        """Test that the visitor talking over the pirate stops his response unless paused"""
+        pirate_agent.is_paused = is_paused
+
+        pirate_agent.on_barge_in()
+
+        assert mock_all_dependencies['llm_speech_responder'].interrupt.called == should_interrupt
+        assert pirate_agent.barged_in == should_interrupt
+
+    def test_final_after_barge_in_answered_next(self, pirate_agent, mock_all_dependencies):
+        """Test that the utterance that interrupted the pirate is answered as soon as his turn ends"""
+        pirate_agent.responding = True
+        pirate_agent.start_photo_updates = MagicMock()
+        pirate_agent.on_barge_in()
+
+        pirate_agent.on_data(Transcript(text="wait, stop", is_final=True))
+
+        assert pirate_agent.pending_utterance == "wait, stop"
+
+    @pytest.mark.parametrize("audible,expected_pending", [
+        (True, None),          # Still talking - the pirate's own voice or crosstalk is dropped
+        (False, "aye, why?"),  # Playback has drained - the quick reply is kept
+    ])
+    def test_final_while_turn_wraps_up(self, pirate_agent, mock_all_dependencies, audible, expected_pending):
+        """Test that a reply is only kept once the pirate's audio has actually stopped playing"""
+        mock_all_dependencies['output_engine'].is_audible.return_value = audible
+        pirate_agent.responding = True
+        pirate_agent.start_photo_updates = MagicMock()
+
+        pirate_agent.on_data(Transcript(text="aye, why?", is_final=True))
+
+        assert pirate_agent.pending_utterance == expected_pending
+
+    def test_respond_answers_pending_reply(self, pirate_agent, mock_all_dependencies):
+        """Test that a reply held while the last response finished is answered straight after it"""
+        responder = mock_all_dependencies['llm_speech_responder']
+        responder.generate.side_effect = lambda description, text: setattr(
+            pirate_agent, 'pending_utterance', "and then?" if text == "hello" else None)
+        pirate_agent.responding = True
+
+        pirate_agent.respond("hello")
+
+        assert [c.args[1] for c in responder.generate.call_args_list] == ["hello", "and then?"]
+        assert pirate_agent.responding is False
+
     @pytest.mark.parametrize("interval,expected_interval", [
         (60, 60),    # Valid interval
         (5, 10),     # Below minimum - should be clamped
@@ -188,6 +275,34 @@ class TestPirateAgent:
         assert pirate_agent.image_analysis_thread is None
         assert pirate_agent.user_transcript == []
         assert pirate_agent.pirate_agent.conversation_history == []
+        pirate_agent.pirate_agent.cancel_speech.assert_called_once()
+        pirate_agent.pirate_agent.history_window.reset.assert_called_once()
+
+    def test_restart_dialog_keeps_response_cache(self, pirate_agent):
+        """Test that cached answers are kept for the next visitor"""
+        pirate_agent.response_cache.put("who are you pirate", "Captain Bones!")
+
+        pirate_agent.restart_dialog()
+
+        assert pirate_agent.response_cache.get("who are you pirate") == "Captain Bones!"
+
+    def test_listeners_share_microphone_audio(self, pirate_agent):
+        """Test that the endpointer and barge-in detector both hear every chunk from one bus"""
+        chunks = [bytes([i]) * 1600 for i in range(3)]
+        pirate_agent.audio_bus = AudioBus(chunks)
+        pirate_agent.listeners = {"endpointer": MagicMock(), "barge-in": MagicMock()}
+        uplink = pirate_agent.audio_bus.subscribe(name="uplink")
+
+        pirate_agent.start_listeners()
+        pirate_agent.audio_bus.start()
+
+        assert [bytes(chunk) for chunk in uplink] == chunks
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline and any(
+                listener.call_count < 3 for listener in pirate_agent.listeners.values()):
+            time.sleep(0.01)
+        for listener in pirate_agent.listeners.values():
+            assert [bytes(call.args[0]) for call in listener.call_args_list] == chunks
 
     def test_cleanup(self, pirate_agent, mock_all_dependencies, mock_thread):
         """Test cleanup functionality"""
@@ -201,38 +316,40 @@ class TestPirateAgent:
         mock_all_dependencies['transcriber'].close.assert_called_once()
         mock_all_dependencies['microphone_stream'].close.assert_called_once()
         mock_all_dependencies['idle_mode'].stop.assert_called_once()
-        mock_all_dependencies['pyaudio'].terminate.assert_called_once()
+        mock_all_dependencies['output_engine'].close.assert_called_once()
         pirate_agent.stop_photo_updates.assert_called_once()
 
-    def test_update_user_photo_success(self, pirate_agent, mock_all_dependencies, monkeypatch, mock_process):
+    def test_update_user_photo_success(self, pirate_agent, mock_all_dependencies, monkeypatch):
         """Test successful photo update"""
-        # Mock multiprocessing components
-        mock_photo_queue = MagicMock()
-        mock_photo_queue.get.return_value = "New user description"
-        monkeypatch.setattr("multiprocessing.Queue", lambda: mock_photo_queue)
-        monkeypatch.setattr("multiprocessing.Process", lambda **kwargs: mock_process)
+        photo_future = MagicMock()
+        photo_future.result.return_value = "New user description"
+        mock_loop = MagicMock()
+        mock_loop.submit.return_value = photo_future
+        monkeypatch.setattr("agenticanimatronics.pirate_agent.shared_event_loop", lambda: mock_loop)
         
         pirate_agent._update_user_photo()
         
         assert pirate_agent.user_description == "New user description"
-        mock_process.start.assert_called_once()
+        mock_loop.submit.assert_called_once_with(mock_all_dependencies['image_analysis'].analyse.return_value)
+        photo_future.cancel.assert_not_called()
 
-    def test_update_user_photo_timeout(self, pirate_agent, mock_all_dependencies, monkeypatch, mock_process):
+    def test_update_user_photo_timeout(self, pirate_agent, mock_all_dependencies, monkeypatch):
         """Test photo update with timeout"""
-        # Mock multiprocessing components
-        mock_photo_queue = MagicMock()
-        mock_photo_queue.get.side_effect = Exception("Timeout")
-        monkeypatch.setattr("multiprocessing.Queue", lambda: mock_photo_queue)
-        monkeypatch.setattr("multiprocessing.Process", lambda **kwargs: mock_process)
+        photo_future = MagicMock()
+        photo_future.result.side_effect = TimeoutError()
+        mock_loop = MagicMock()
+        mock_loop.submit.return_value = photo_future
+        monkeypatch.setattr("agenticanimatronics.pirate_agent.shared_event_loop", lambda: mock_loop)
         
         original_description = "Original description"
         pirate_agent.user_description = original_description
         
         pirate_agent._update_user_photo()
         
-        # Should keep original description on timeout
+        # Should keep original description on timeout, and abandon the request
         assert pirate_agent.user_description == original_description
-        mock_process.start.assert_called_once()
+        photo_future.result.assert_called_once_with(timeout=10)
+        photo_future.cancel.assert_called_once()
 
 
 class TestPirateAgentStaticMethods:
@@ -0,0 +1,241 @@
+import asyncio
+import random
+
+import pytest
+from unittest.mock import MagicMock
+
+from agenticanimatronics.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, prime
+
+
+@pytest.fixture
+def clock():
+    """A clock the test moves by hand"""
+    now = [0.0]
+
+    def clock():
+        return now[0]
+
+    clock.now = now
+    return clock
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("test service", failure_threshold=2, reset_timeout=10, clock=clock)
+
+
+@pytest.fixture
+def mock_sleep(monkeypatch):
+    """Fixture that mocks time.sleep"""
+    sleep = MagicMock()
+    monkeypatch.setattr("time.sleep", sleep)
+    return sleep
+
+
+def fail():
+    raise ConnectionError("down")
+
+
+class TestPrime:
+    """Test cases for prime function"""
+
+    def test_error_raised_straight_away(self):
+        """Test that a stream failing on its first read raises when primed"""
+        def failing():
+            raise ConnectionError("down")
+            yield
+
+        with pytest.raises(ConnectionError):
+            prime(failing())
+
+    def test_whole_stream_kept(self):
+        """Test that the first item is not lost"""
+        assert list(prime(iter([1, 2, 3]))) == [1, 2, 3]
+
+    def test_empty_stream(self):
+        """Test that an empty stream primes to an empty iterator"""
+        assert list(prime([])) == []
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker class"""
+
+    def test_opens_after_threshold(self, breaker):
+        """Test that the circuit opens after enough failures in a row"""
+        breaker.record_failure()
+        assert breaker.state == "closed"
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+        assert breaker.trips == 1
+        assert not breaker.allow()
+        assert breaker.rejected == 1
+
+    def test_success_resets_failures(self, breaker):
+        """Test that only failures in a row count"""
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == "closed"
+
+    def test_half_open_probe(self, breaker, clock):
+        """Test that one probe is let through after the reset timeout"""
+        breaker.record_failure()
+        breaker.record_failure()
+        clock.now[0] = 10
+
+        assert breaker.state == "half_open"
+        assert breaker.allow()
+        assert not breaker.allow()
+
+    def test_probe_success_closes(self, breaker, clock):
+        """Test that a successful probe closes the circuit"""
+        breaker.record_failure()
+        breaker.record_failure()
+        clock.now[0] = 10
+        breaker.allow()
+        breaker.record_success()
+
+        assert breaker.state == "closed"
+        assert breaker.allow()
+
+    def test_probe_failure_reopens(self, breaker, clock):
+        """Test that a failed probe opens the circuit for another reset timeout"""
+        breaker.record_failure()
+        breaker.record_failure()
+        clock.now[0] = 10
+        breaker.allow()
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+        assert breaker.trips == 2
+        clock.now[0] = 19
+        assert breaker.state == "open"
+        clock.now[0] = 20
+        assert breaker.state == "half_open"
+
+    def test_abandoned_probe_frees_slot(self, breaker, clock):
+        """Test that a cancelled probe lets another probe through"""
+        breaker.record_failure()
+        breaker.record_failure()
+        clock.now[0] = 10
+        breaker.allow()
+        breaker.abandon()
+
+        assert breaker.allow()
+
+    def test_call(self, breaker):
+        """Test that call records the outcome and fails fast once open"""
+        assert breaker.call(lambda: "ok") == "ok"
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                breaker.call(fail)
+        func = MagicMock()
+
+        with pytest.raises(CircuitOpenError):
+            breaker.call(func)
+        func.assert_not_called()
+
+    def test_guard(self, breaker):
+        """Test that a stream breaking part way is recorded as a failure"""
+        def breaking():
+            yield 1
+            raise ConnectionError("reset")
+
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                list(breaker.guard(breaking()))
+
+        assert breaker.state == "open"
+
+    def test_guard_success(self, breaker):
+        """Test that a stream read to the end is recorded as a success"""
+        breaker.record_failure()
+
+        assert list(breaker.guard([1, 2])) == [1, 2]
+        breaker.record_failure()
+        assert breaker.state == "closed"
+
+    def test_stats(self, breaker):
+        """Test that the state and counters are exposed"""
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.allow()
+
+        assert breaker.stats() == {"state": "open", "trips": 1, "rejected": 1}
+
+
+class TestRetryPolicy:
+    """Test cases for RetryPolicy class"""
+
+    def test_backoff_grows_to_limit(self):
+        """Test that delays double up to the limit, jittered down by up to half"""
+        policy = RetryPolicy(initial_backoff=1, max_backoff=4, rng=random.Random(1))
+
+        assert 0.5 <= policy.backoff(0) <= 1
+        assert 1 <= policy.backoff(1) <= 2
+        assert 2 <= policy.backoff(5) <= 4
+
+    def test_no_jitter(self):
+        """Test that jitter can be turned off"""
+        policy = RetryPolicy(initial_backoff=1, jitter=0)
+
+        assert [policy.backoff(i) for i in range(3)] == [1, 2, 4]
+
+    def test_retries_until_success(self, mock_sleep):
+        """Test that a call is retried with a backoff between attempts"""
+        func = MagicMock(side_effect=[ConnectionError("down"), "ok"])
+
+        assert RetryPolicy().call(func) == "ok"
+        assert func.call_count == 2
+        mock_sleep.assert_called_once()
+
+    def test_raises_last_error(self, mock_sleep):
+        """Test that the last error is raised once the attempts run out"""
+        func = MagicMock(side_effect=ConnectionError("down"))
+
+        with pytest.raises(ConnectionError):
+            RetryPolicy(max_attempts=3).call(func)
+        assert func.call_count == 3
+        assert mock_sleep.call_count == 2
+
+    def test_open_breaker_stops_retries(self, breaker, mock_sleep):
+        """Test that retries stop as soon as the breaker opens"""
+        func = MagicMock(side_effect=ConnectionError("down"))
+
+        with pytest.raises(CircuitOpenError):
+            RetryPolicy(max_attempts=5).call(func, breaker)
+        assert func.call_count == 2
+        assert breaker.trips == 1
+
+    def test_acall(self, breaker, monkeypatch):
+        """Test that async calls retry and record the outcome on the breaker"""
+        sleeps = []
+
+        async def fake_sleep(delay):
+            sleeps.append(delay)
+
+        monkeypatch.setattr("agenticanimatronics.resilience.asyncio.sleep", fake_sleep)
+        results = iter([ConnectionError("down"), "ok"])
+
+        async def func():
+            result = next(results)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        assert asyncio.run(RetryPolicy().acall(func, breaker)) == "ok"
+        assert len(sleeps) == 1
+        assert breaker.state == "closed"
+
+    def test_acall_fails_fast(self, breaker):
+        """Test that async calls fail fast while the breaker is open"""
+        breaker.record_failure()
+        breaker.record_failure()
+
+        async def func():
+            return "ok"
+
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(RetryPolicy().acall(func, breaker))
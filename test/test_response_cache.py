@@ -0,0 +1,150 @@
+import pytest
+
+from agenticanimatronics.response_cache import ResponseCache, description_bucket, embed
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(max_entries=4, ttl_seconds=60, max_variants=2)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controls the time answers were cached at"""
+    now = [1000.0]
+    monkeypatch.setattr("agenticanimatronics.response_cache.time.monotonic", lambda: now[0])
+    return now
+
+
+class TestDescriptionBucket:
+    """Test cases for description_bucket function"""
+
+    def test_keeps_only_keywords(self):
+        """Test that descriptions are reduced to a few sorted keywords"""
+        assert description_bucket("A small child dressed as a Witch, smiling.") == "child witch"
+
+    def test_plural_keywords(self):
+        """Test that plurals match their keyword"""
+        assert description_bucket("Two kids in ghost costumes") == "ghost kid"
+
+    def test_empty_description(self):
+        """Test that no description is its own bucket"""
+        assert description_bucket("") == ""
+
+
+class TestEmbed:
+    """Test cases for embed function"""
+
+    def test_unit_length(self):
+        """Test that embeddings are normalized"""
+        assert float(embed("who are you").dot(embed("who are you"))) == pytest.approx(1.0)
+
+    def test_similar_text_is_close(self):
+        """Test that a small rewording scores higher than a different question"""
+        question = embed("are you a real pirate")
+
+        assert question.dot(embed("are you real pirate")) > question.dot(embed("where is your treasure"))
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache class"""
+
+    def test_exact_hit(self, cache):
+        """Test that a question asked again, punctuated differently, is answered from the cache"""
+        cache.put("Who are you?", "I be Captain Bones!")
+
+        assert cache.get("who are you") == "I be Captain Bones!"
+        assert cache.hits == 1
+
+    def test_miss(self, cache):
+        """Test that an unknown question misses"""
+        assert cache.get("who are you") is None
+        assert cache.misses == 1
+
+    def test_short_questions_not_cached(self, cache):
+        """Test that replies like "yes" are never cached, since they depend on the conversation"""
+        cache.put("Why?", "Because, matey!")
+
+        assert cache.get("Why?") is None
+        assert len(cache) == 0
+
+    def test_similar_question_hits(self, cache):
+        """Test that a slightly different transcript reuses the answer"""
+        cache.put("are you a real pirate", "Aye, real as me bones!")
+
+        assert cache.get("are you real pirate") == "Aye, real as me bones!"
+        assert cache.similar_hits == 1
+
+    def test_different_question_misses(self, cache):
+        """Test that an unrelated question does not match"""
+        cache.put("where is your ship", "In the harbour!")
+
+        assert cache.get("where is your treasure") is None
+
+    def test_description_bucket_separates_answers(self, cache):
+        """Test that answers written for one look are not given to a visitor who looks different"""
+        cache.put("do you like my costume", "A fine witch ye be!", "A witch")
+
+        assert cache.get("do you like my costume", "A tall witch with a broom") == "A fine witch ye be!"
+        assert cache.get("do you like my costume", "A vampire") is None
+
+    def test_variants_rotate(self, cache):
+        """Test that several answers to a question are handed out in turn"""
+        cache.put("who are you", "Captain Bones!")
+        cache.put("who are you", "The scourge of the seas!")
+
+        assert [cache.get("who are you") for _ in range(3)] == [
+            "Captain Bones!", "The scourge of the seas!", "Captain Bones!"]
+
+    def test_oldest_variant_replaced(self, cache):
+        """Test that the oldest answer makes way once a question has enough variants"""
+        for answer in ["One", "Two", "Three"]:
+            cache.put("who are you", answer)
+
+        assert {cache.get("who are you"), cache.get("who are you")} == {"Two", "Three"}
+        assert not cache.wants_variant("who are you")
+
+    def test_wants_variant(self, cache):
+        """Test that a question with fewer than max_variants answers asks for another"""
+        assert not cache.wants_variant("who are you")
+        cache.put("who are you", "Captain Bones!")
+
+        assert cache.wants_variant("who are you")
+
+    def test_answers_expire(self, cache, clock):
+        """Test that answers are not reused after the TTL"""
+        cache.put("who are you", "Captain Bones!")
+        clock[0] += 61
+
+        assert cache.get("who are you") is None
+        assert len(cache) == 0
+
+    def test_expired_similar_question_skipped(self, cache, clock):
+        """Test that an expired entry is not matched by similarity"""
+        cache.put("are you a real pirate", "Aye!")
+        clock[0] += 61
+
+        assert cache.get("are you real pirate") is None
+
+    def test_least_recently_used_evicted(self, cache):
+        """Test that the question used longest ago is evicted when the cache is full"""
+        questions = ["who are you", "where is your ship", "do you like candy", "what is your name"]
+        for question in questions:
+            cache.put(question, question.upper())
+        cache.get("who are you")
+        cache.put("trick or treat", "Arr, a treat!")
+
+        assert len(cache) == 4
+        assert cache.get("where is your ship") is None
+        assert cache.get("who are you") == "WHO ARE YOU"
+        assert cache.get("trick or treat") == "Arr, a treat!"
+
+    def test_clear(self, cache):
+        """Test that clear forgets every answer and frees the rows"""
+        cache.put("who are you", "Captain Bones!")
+        cache.clear()
+
+        assert cache.get("who are you") is None
+        for i in range(4):
+            cache.put(f"question number {i}", "answer")
+        assert len(cache) == 4
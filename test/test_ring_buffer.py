@@ -0,0 +1,131 @@
+import threading
+import time
+
+import pytest
+
+from agenticanimatronics.ring_buffer import PreRollBuffer, SPSCRingBuffer
+
+
+class TestPreRollBuffer:
+    """Test cases for PreRollBuffer class"""
+
+    def test_empty_drain(self):
+        """Test draining an empty buffer"""
+        buffer = PreRollBuffer(8)
+        assert buffer.drain() == b''
+        assert len(buffer) == 0
+
+    def test_partial_fill(self):
+        """Test draining a buffer that has not wrapped yet"""
+        buffer = PreRollBuffer(8)
+        buffer.write(b'abc')
+        buffer.write(b'de')
+
+        assert len(buffer) == 5
+        assert buffer.drain() == b'abcde'
+        assert len(buffer) == 0
+
+    @pytest.mark.parametrize("chunks,expected", [
+        ([b'abcd', b'efgh', b'ij'], b'cdefghij'),       # Wraps mid-chunk
+        ([b'abcdef', b'ghijkl'], b'efghijkl'),          # Chunk splits across the end
+        ([b'abcdefgh', b'ijklmnop'], b'ijklmnop'),      # Chunks exactly the capacity
+        ([b'ab', b'abcdefghijkl'], b'efghijkl'),        # Chunk larger than the capacity
+    ])
+    def test_keeps_most_recent_audio(self, chunks, expected):
+        """Test that the oldest audio is overwritten once the ring is full"""
+        buffer = PreRollBuffer(8)
+        for chunk in chunks:
+            buffer.write(chunk)
+
+        assert buffer.drain() == expected
+
+    def test_reuse_after_drain(self):
+        """Test that the ring keeps working after a drain"""
+        buffer = PreRollBuffer(4)
+        buffer.write(b'abcdef')
+        buffer.drain()
+        buffer.write(b'xy')
+
+        assert buffer.drain() == b'xy'
+
+    def test_clear(self):
+        """Test clearing the ring"""
+        buffer = PreRollBuffer(4)
+        buffer.write(b'abc')
+        buffer.clear()
+
+        assert buffer.drain() == b''
+
+    def test_zero_capacity(self):
+        """Test that a zero-sized pre-roll is a no-op"""
+        buffer = PreRollBuffer(0)
+        buffer.write(b'abc')
+
+        assert buffer.drain() == b''
+
+
+class TestSPSCRingBuffer:
+    """Test cases for SPSCRingBuffer class"""
+
+    def test_write_then_read(self):
+        """Test a simple write and read"""
+        ring = SPSCRingBuffer(8)
+
+        assert ring.write(b'abcd') == 4
+        assert ring.available() == 4
+        assert ring.read(4, timeout=0) == b'abcd'
+        assert ring.available() == 0
+
+    def test_wraps_around(self):
+        """Test reads and writes that cross the end of the ring"""
+        ring = SPSCRingBuffer(8)
+        ring.write(b'abcdef')
+        ring.read(6, timeout=0)
+        ring.write(b'ghijkl')
+
+        assert ring.read(6, timeout=0) == b'ghijkl'
+
+    def test_overrun_drops_chunk(self):
+        """Test that a write that does not fit is dropped and counted"""
+        ring = SPSCRingBuffer(8)
+        ring.write(b'abcdef')
+
+        assert ring.write(b'ghij') == 0
+        assert ring.overruns == 1
+        assert ring.dropped_bytes == 4
+        assert ring.read(6, timeout=0) == b'abcdef'
+
+    def test_underrun_pads_with_silence(self):
+        """Test that a read that times out returns padded audio and counts an underrun"""
+        ring = SPSCRingBuffer(8)
+        ring.write(b'ab')
+
+        assert ring.read(4, timeout=0.01) == b'ab\x00\x00'
+        assert ring.underruns == 1
+        assert ring.available() == 0
+
+    def test_read_waits_for_producer(self):
+        """Test that a read blocks until the producer delivers enough audio"""
+        ring = SPSCRingBuffer(64)
+
+        def produce():
+            for chunk in (b'ab', b'cd'):
+                time.sleep(0.01)
+                ring.write(chunk)
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        result = ring.read(4, timeout=2)
+        producer.join()
+
+        assert result == b'abcd'
+        assert ring.underruns == 0
+
+    def test_clear(self):
+        """Test discarding unread audio"""
+        ring = SPSCRingBuffer(8)
+        ring.write(b'abcd')
+        ring.clear()
+
+        assert ring.available() == 0
+        assert ring.free() == 8
@@ -0,0 +1,50 @@
+import pytest
+
+from agenticanimatronics.sentence_segmenter import SentenceSegmenter
+
+
+def tokens(text, size=3):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class TestSentenceSegmenter:
+    """Test cases for SentenceSegmenter class"""
+
+    def test_cuts_sentences_as_they_complete(self):
+        """Test that each sentence is released as soon as the text after it starts"""
+        segmenter = SentenceSegmenter()
+
+        assert segmenter.feed("Arr, matey") == []
+        assert segmenter.feed("! Welcome ") == ["Arr, matey!"]
+        assert segmenter.feed("aboard.") == []
+        assert segmenter.flush() == "Welcome aboard."
+        assert segmenter.flush() is None
+
+    @pytest.mark.parametrize("text,expected", [
+        ("Dr. Bones be me name. Ahoy!", ["Dr. Bones be me name.", "Ahoy!"]),
+        ("It costs 3.50 doubloons. Pay up!", ["It costs 3.50 doubloons.", "Pay up!"]),
+        ("What?! No treasure... Blast!", ["What?!", "No treasure...", "Blast!"]),
+        ("He said \"Arr.\" Then left.", ["He said \"Arr.\"", "Then left."]),
+    ])
+    def test_sentence_boundaries(self, text, expected):
+        """Test that abbreviations and numbers do not end sentences"""
+        assert list(SentenceSegmenter().segment(tokens(text))) == expected
+
+    def test_long_clauses_are_cut(self):
+        """Test that a long sentence is cut at a clause break"""
+        text = "Ye look like a fine landlubber with a shiny boom box, aye, that ye do"
+        segments = list(SentenceSegmenter(min_clause_chars=40).segment(tokens(text)))
+
+        assert segments == ["Ye look like a fine landlubber with a shiny boom box,", "aye, that ye do"]
+
+    def test_short_clauses_are_kept(self):
+        """Test that a comma early in a sentence does not cut it"""
+        assert list(SentenceSegmenter().segment(["Arr, ye scallywag"])) == ["Arr, ye scallywag"]
+
+    def test_runaway_text_is_cut_at_a_word(self):
+        """Test that text without punctuation is cut at a space once it is too long"""
+        text = " ".join(["arr"] * 30)
+        segments = list(SentenceSegmenter(max_chars=20).segment(tokens(text)))
+
+        assert all(len(segment) <= 20 for segment in segments)
+        assert " ".join(segments) == text
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from agenticanimatronics.spectral_noise_gate import SpectralNoiseGate
+
+
+SAMPLE_RATE = 16000
+CHUNK_SIZE = 800
+
+
+def white_noise(num_samples, level=300, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(num_samples) * level).astype(np.int16)
+
+
+def tone(num_samples, level=8000, frequency=440):
+    t = np.arange(num_samples) / SAMPLE_RATE
+    return (level * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+
+
+def run(gate, samples, chunk_size=CHUNK_SIZE):
+    """Feeds samples through the gate chunk by chunk and returns the joined output"""
+    out = []
+    for start in range(0, samples.size, chunk_size):
+        chunk = samples[start:start + chunk_size].tobytes()
+        processed = gate.process(chunk)
+        assert len(processed) == len(chunk)
+        out.append(np.frombuffer(processed, dtype=np.int16))
+    return np.concatenate(out)
+
+
+def rms(samples):
+    return float(np.sqrt(np.mean(samples.astype(np.float64) ** 2)))
+
+
+class TestSpectralNoiseGate:
+    """Test cases for SpectralNoiseGate class"""
+
+    @pytest.mark.parametrize("chunk_size", [800, 1600, 100, 333])
+    def test_output_same_size_as_input(self, chunk_size):
+        """Test that every chunk comes back the same size, whatever the chunk size"""
+        gate = SpectralNoiseGate(SAMPLE_RATE, max_chunk_size=512)
+        out = run(gate, white_noise(chunk_size * 10), chunk_size=chunk_size)
+        assert out.size == chunk_size * 10
+
+    def test_perfect_reconstruction_without_reduction(self):
+        """Test that the overlap-add path only delays the signal when no noise is removed"""
+        gate = SpectralNoiseGate(SAMPLE_RATE, n_fft=512, prop_decrease=0.0)
+        samples = tone(SAMPLE_RATE)
+
+        out = run(gate, samples)
+
+        # Skip the first frame, where the window has not filled yet
+        np.testing.assert_allclose(out[1024:], samples[1024 - 512:-512], atol=2)
+
+    def test_stationary_noise_is_reduced(self):
+        """Test that background noise loses most of its energy once the profile is learned"""
+        gate = SpectralNoiseGate(SAMPLE_RATE, prop_decrease=1.0)
+        run(gate, white_noise(SAMPLE_RATE, seed=1))
+        assert gate.is_learned
+
+        out = run(gate, white_noise(SAMPLE_RATE, seed=2))
+
+        assert rms(out) < 0.5 * rms(white_noise(SAMPLE_RATE, seed=2))
+
+    def test_speech_band_tone_is_kept(self):
+        """Test that a loud tone over the noise keeps most of its energy"""
+        gate = SpectralNoiseGate(SAMPLE_RATE, prop_decrease=1.0)
+        run(gate, white_noise(SAMPLE_RATE, seed=1))
+
+        noisy_tone = tone(SAMPLE_RATE) + white_noise(SAMPLE_RATE, seed=2)
+        out = run(gate, noisy_tone)
+
+        assert rms(out[1024:]) > 0.9 * rms(tone(SAMPLE_RATE))
+
+    def test_learn_noise(self):
+        """Test learning the profile from a clip of background noise"""
+        gate = SpectralNoiseGate(SAMPLE_RATE)
+        gate.learn_noise(white_noise(SAMPLE_RATE).tobytes())
+
+        assert gate.is_learned
+        assert gate.noise_profile.sum() > 0
+
+    def test_learn_noise_too_short(self):
+        """Test that a clip shorter than one frame is rejected"""
+        gate = SpectralNoiseGate(SAMPLE_RATE)
+        with pytest.raises(ValueError):
+            gate.learn_noise(white_noise(100).tobytes())
+
+    def test_refresh_only_on_silence(self):
+        """Test that the learned profile only moves when the caller flags silence"""
+        gate = SpectralNoiseGate(SAMPLE_RATE)
+        gate.learn_noise(white_noise(SAMPLE_RATE, level=100).tobytes())
+        learned = gate.noise_profile.copy()
+
+        loud = white_noise(CHUNK_SIZE, level=3000).tobytes()
+        gate.process(loud)
+        np.testing.assert_array_equal(gate.noise_profile, learned)
+
+        gate.process(loud, refresh_noise=True)
+        assert gate.noise_profile.sum() > learned.sum()
@@ -0,0 +1,186 @@
+import threading
+
+import pytest
+from unittest.mock import MagicMock
+
+from agenticanimatronics.speculation import SpeculativeGenerator
+from agenticanimatronics.text_normalization import normalize_utterance
+
+
+@pytest.fixture
+def generate():
+    """Mock generate function standing in for PirateChatBot.forward"""
+    return MagicMock(return_value="Arr, speculative answer!")
+
+
+@pytest.fixture
+def speculator(generate):
+    """Fixture that creates a SpeculativeGenerator"""
+    return SpeculativeGenerator(generate, stable_ms=20, min_words=3)
+
+
+def wait_until_stable(speculator):
+    timer = speculator._timer
+    if timer:
+        timer.join(1)
+
+
+def stabilize(speculator, text, history=None, description="pirate fan"):
+    speculator.on_partial(text, history if history is not None else [], description)
+    wait_until_stable(speculator)
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("What's your NAME?", "what's your name"),
+    ("  where   is the treasure ", "where is the treasure"),
+    ("Trick-or-treat!", "trick or treat"),
+    ("", ""),
+])
+def test_normalize_utterance(text, expected):
+    """Test transcript normalization"""
+    assert normalize_utterance(text) == expected
+
+
+class TestSpeculativeGenerator:
+    """Test cases for SpeculativeGenerator class"""
+
+    def test_no_speculation_returns_none(self, speculator):
+        """Test that take returns None when nothing was speculated"""
+        assert speculator.take("hello there pirate", [], "") is None
+        assert speculator.hits == 0
+        assert speculator.misses == 0
+
+    def test_unstable_partial_does_not_speculate(self, generate):
+        """Test that a partial that changes before it is stable does not start generation"""
+        speculator = SpeculativeGenerator(generate, stable_ms=10_000, min_words=3)
+        speculator.on_partial("what is your name", [], "")
+        speculator.on_partial("what is your name captain", [], "")
+
+        assert speculator.attempts == 0
+        generate.assert_not_called()
+        speculator.cancel()
+
+    def test_only_latest_partial_is_speculated(self, speculator, generate):
+        """Test that a partial superseded within stable_ms is never speculated on"""
+        speculator.on_partial("what is your name", [], "pirate fan")
+        stabilize(speculator, "what is your name captain")
+
+        assert speculator.attempts == 1
+        generate.assert_called_once_with(
+            history=[], user_prompt="what is your name captain", user_description="pirate fan")
+
+    def test_vosk_style_partials(self, speculator, generate):
+        """Test speculating on partials that are reported only when their text changes, as Vosk does"""
+        for partial in ["what", "what is", "what is your", "what is your name"]:
+            speculator.on_partial(partial, [], "pirate fan")
+        wait_until_stable(speculator)
+
+        assert speculator.take("What is your name?", [], "pirate fan") == "Arr, speculative answer!"
+        assert speculator.hits == 1
+
+    def test_short_partial_does_not_speculate(self, speculator):
+        """Test that very short partials are not speculated on"""
+        stabilize(speculator, "hi there")
+        assert speculator.attempts == 0
+
+    def test_hit_reuses_response(self, speculator, generate):
+        """Test that a matching final transcript reuses the speculative response"""
+        history = [{"role": "user", "content": "ahoy"}]
+        stabilize(speculator, "what is your name", history)
+
+        result = speculator.take("What is your name?", history, "pirate fan")
+
+        assert result == "Arr, speculative answer!"
+        generate.assert_called_once_with(
+            history=history, user_prompt="what is your name", user_description="pirate fan")
+        assert speculator.hits == 1
+        assert speculator.hit_rate == 1.0
+        assert speculator.time_saved >= 0
+
+    def test_close_match_is_a_hit(self, speculator):
+        """Test that a final differing by a small transcription change still matches"""
+        stabilize(speculator, "where is your treasure buried")
+        assert speculator.take("where is your treasure buried?", [], "pirate fan") is not None
+
+    def test_one_extra_word_is_a_hit(self, speculator):
+        """Test that a final adding a word after the speculated partial still matches"""
+        stabilize(speculator, "what is your name")
+        assert speculator.take("What is your name, captain?", [], "pirate fan") is not None
+
+    @pytest.mark.parametrize("final,history,description", [
+        ("tell me a joke instead please", [], "pirate fan"),       # Different words
+        ("what is not your name", [], "pirate fan"),               # Negation inserted
+        ("what is your game", [], "pirate fan"),                   # One word swapped
+        ("what is your name and your ship's", [], "pirate fan"),   # Too much added
+        ("what is your", [], "pirate fan"),                        # Cut short
+        ("what is your name", [{"role": "user"}], "pirate fan"),   # History changed
+        ("what is your name", [], "someone else"),                 # Description changed
+    ])
+    def test_miss_discards_speculation(self, speculator, final, history, description):
+        """Test that a speculation made for a different turn is thrown away"""
+        stabilize(speculator, "what is your name")
+
+        assert speculator.take(final, history, description) is None
+        assert speculator.misses == 1
+        assert speculator.hit_rate == 0.0
+
+    def test_new_stable_partial_replaces_speculation(self, speculator, generate):
+        """Test that a newer stable partial supersedes the older speculation"""
+        stabilize(speculator, "what is your")
+        stabilize(speculator, "what is your name")
+
+        assert speculator.attempts == 2
+        assert speculator.take("what is your name", [], "pirate fan") is not None
+
+    def test_same_partial_not_speculated_twice(self, speculator):
+        """Test that repeating a stable partial does not start another generation"""
+        stabilize(speculator, "what is your name")
+        speculator.on_partial("what is your name", [], "pirate fan")
+
+        assert speculator.attempts == 1
+
+    def test_failed_speculation_is_a_miss(self, speculator, generate):
+        """Test that a speculation that raised falls back to normal generation"""
+        generate.side_effect = Exception("LLM error")
+        stabilize(speculator, "what is your name")
+
+        assert speculator.take("what is your name", [], "pirate fan") is None
+        assert speculator.misses == 1
+
+    def test_history_is_snapshotted(self, speculator, generate):
+        """Test that later history changes do not leak into the speculative call"""
+        started = threading.Event()
+        release = threading.Event()
+        seen = []
+
+        def slow_generate(history, user_prompt, user_description):
+            seen.append(list(history))
+            started.set()
+            release.wait(1)
+            return "answer"
+
+        speculator.generate = slow_generate
+        history = []
+        stabilize(speculator, "what is your name", history)
+        started.wait(1)
+        history.append({"role": "user", "content": "later"})
+        release.set()
+
+        assert seen == [[]]
+
+    def test_cancel(self, speculator):
+        """Test abandoning an in-flight speculation"""
+        stabilize(speculator, "what is your name")
+        speculator.cancel()
+
+        assert speculator.take("what is your name", [], "pirate fan") is None
+
+    def test_stats(self, speculator):
+        """Test the stats summary"""
+        stabilize(speculator, "what is your name")
+        speculator.take("what is your name", [], "pirate fan")
+
+        stats = speculator.stats()
+        assert stats["attempts"] == 1
+        assert stats["hits"] == 1
+        speculator.log_stats()
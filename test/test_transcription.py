@@ -0,0 +1,371 @@
+import json
+import sys
+
+import assemblyai as aai
+import pytest
+from unittest.mock import MagicMock
+
+from agenticanimatronics.transcription import (
+    AssemblyAITranscriber, SupervisedTranscriber, Transcript, VoskTranscriber, create_transcriber
+)
+
+
+@pytest.fixture
+def callbacks():
+    return {
+        'on_data': MagicMock(),
+        'on_error': MagicMock(),
+        'on_open': MagicMock(),
+        'on_close': MagicMock(),
+    }
+
+
+@pytest.fixture
+def mock_realtime_transcriber(monkeypatch):
+    """Fixture that captures how the AssemblyAI transcriber is created"""
+    created = {}
+
+    def factory(**kwargs):
+        created.update(kwargs)
+        created['instance'] = MagicMock()
+        return created['instance']
+
+    monkeypatch.setattr("assemblyai.RealtimeTranscriber", factory)
+    return created
+
+
+@pytest.fixture
+def mock_vosk(monkeypatch):
+    """Fixture that installs a fake vosk module with a scripted recognizer"""
+    recognizer = MagicMock()
+    recognizer.AcceptWaveform.return_value = False
+    recognizer.PartialResult.return_value = json.dumps({"partial": ""})
+    recognizer.FinalResult.return_value = json.dumps({"text": ""})
+
+    vosk = MagicMock()
+    vosk.KaldiRecognizer.return_value = recognizer
+    monkeypatch.setitem(sys.modules, "vosk", vosk)
+    monkeypatch.setattr("agenticanimatronics.transcription.vosk_model_path", "/models/vosk-small")
+    return {'module': vosk, 'recognizer': recognizer}
+
+
+class TestAssemblyAITranscriber:
+    """Test cases for AssemblyAITranscriber class"""
+
+    def test_configures_realtime_transcriber(self, callbacks, mock_realtime_transcriber):
+        """Test that the AssemblyAI session is configured from the backend options"""
+        AssemblyAITranscriber(**callbacks, end_utterance_silence_threshold=500)
+
+        assert mock_realtime_transcriber['sample_rate'] == 16000
+        assert mock_realtime_transcriber['end_utterance_silence_threshold'] == 500
+        assert mock_realtime_transcriber['disable_partial_transcripts'] is True
+
+    @pytest.mark.parametrize("transcript_class,is_final", [
+        (aai.RealtimeFinalTranscript, True),
+        (aai.RealtimePartialTranscript, False),
+    ])
+    def test_converts_transcripts(self, callbacks, mock_realtime_transcriber, transcript_class, is_final):
+        """Test that AssemblyAI transcripts become Transcript events"""
+        AssemblyAITranscriber(**callbacks)
+        transcript = MagicMock(spec=transcript_class)
+        transcript.text = "ahoy"
+
+        mock_realtime_transcriber['on_data'](transcript)
+
+        callbacks['on_data'].assert_called_once_with(Transcript(text="ahoy", is_final=is_final))
+
+    def test_on_open_passes_session_id(self, callbacks, mock_realtime_transcriber):
+        """Test that the session id is passed to on_open"""
+        AssemblyAITranscriber(**callbacks)
+        session = MagicMock()
+        session.session_id = "abc-123"
+
+        mock_realtime_transcriber['on_open'](session)
+
+        callbacks['on_open'].assert_called_once_with("abc-123")
+
+    def test_delegates_session_control(self, callbacks, mock_realtime_transcriber):
+        """Test that session calls go to the AssemblyAI transcriber"""
+        transcriber = AssemblyAITranscriber(**callbacks)
+        audio = [b'\x00\x00']
+
+        transcriber.connect()
+        transcriber.stream(audio)
+        transcriber.force_end_utterance()
+        transcriber.close()
+
+        instance = mock_realtime_transcriber['instance']
+        instance.connect.assert_called_once()
+        instance.stream.assert_called_once_with(audio)
+        instance.force_end_utterance.assert_called_once()
+        instance.close.assert_called_once()
+
+
+class TestVoskTranscriber:
+    """Test cases for VoskTranscriber class"""
+
+    def test_missing_vosk(self, callbacks, monkeypatch):
+        """Test that a missing vosk install gives a helpful error"""
+        monkeypatch.setitem(sys.modules, "vosk", None)
+        with pytest.raises(ImportError, match="pip install vosk"):
+            VoskTranscriber(**callbacks)
+
+    def test_model_path(self, callbacks, mock_vosk):
+        """Test that an explicit model path is loaded"""
+        VoskTranscriber(**callbacks, model_path="/models/vosk-en")
+        mock_vosk['module'].Model.assert_called_once_with("/models/vosk-en")
+
+    def test_model_path_from_env(self, callbacks, mock_vosk):
+        """Test that VOSK_MODEL_PATH is used when no path is given"""
+        VoskTranscriber(**callbacks)
+        mock_vosk['module'].Model.assert_called_once_with("/models/vosk-small")
+
+    def test_missing_model_path(self, callbacks, mock_vosk, monkeypatch):
+        """Test that a missing model path fails clearly instead of downloading a model"""
+        monkeypatch.setattr("agenticanimatronics.transcription.vosk_model_path", None)
+        with pytest.raises(ValueError, match="VOSK_MODEL_PATH"):
+            VoskTranscriber(**callbacks)
+        mock_vosk['module'].Model.assert_not_called()
+
+    def test_stream_before_connect(self, callbacks, mock_vosk):
+        """Test that streaming without a session fails"""
+        with pytest.raises(RuntimeError):
+            VoskTranscriber(**callbacks).stream([b'\x00\x00'])
+
+    def test_final_transcripts(self, callbacks, mock_vosk):
+        """Test that completed utterances are emitted as final transcripts"""
+        recognizer = mock_vosk['recognizer']
+        recognizer.AcceptWaveform.side_effect = [False, True]
+        recognizer.Result.return_value = json.dumps({"text": "where be the treasure"})
+        transcriber = VoskTranscriber(**callbacks)
+
+        transcriber.connect()
+        transcriber.stream([b'\x00\x00', b'\x00\x00'])
+
+        callbacks['on_open'].assert_called_once()
+        callbacks['on_data'].assert_called_once_with(Transcript(text="where be the treasure", is_final=True))
+
+    def test_partial_transcripts(self, callbacks, mock_vosk):
+        """Test that changing partials are emitted when enabled"""
+        recognizer = mock_vosk['recognizer']
+        recognizer.PartialResult.side_effect = [
+            json.dumps({"partial": "where"}),
+            json.dumps({"partial": "where"}),
+            json.dumps({"partial": "where be"}),
+        ]
+        transcriber = VoskTranscriber(**callbacks, disable_partial_transcripts=False)
+
+        transcriber.connect()
+        transcriber.stream([b'\x00\x00'] * 3)
+
+        assert [c.args[0] for c in callbacks['on_data'].call_args_list] == [
+            Transcript(text="where", is_final=False),
+            Transcript(text="where be", is_final=False),
+        ]
+
+    def test_force_end_utterance(self, callbacks, mock_vosk):
+        """Test that a forced end finalizes the utterance on the streaming thread"""
+        mock_vosk['recognizer'].FinalResult.return_value = json.dumps({"text": "ahoy"})
+        transcriber = VoskTranscriber(**callbacks)
+        transcriber.connect()
+
+        def audio():
+            yield b'\x00\x00'
+            transcriber.force_end_utterance()
+            yield b'\x00\x00'
+
+        transcriber.stream(audio())
+
+        callbacks['on_data'].assert_called_once_with(Transcript(text="ahoy", is_final=True))
+
+    def test_close_stops_stream(self, callbacks, mock_vosk):
+        """Test that closing ends streaming and calls on_close"""
+        transcriber = VoskTranscriber(**callbacks)
+        transcriber.connect()
+        transcriber.close()
+
+        transcriber.stream([b'\x00\x00'])
+
+        mock_vosk['recognizer'].AcceptWaveform.assert_not_called()
+        callbacks['on_close'].assert_called_once()
+
+    def test_errors_reported(self, callbacks, mock_vosk):
+        """Test that recognizer errors go to on_error"""
+        mock_vosk['recognizer'].AcceptWaveform.side_effect = Exception("kaldi error")
+        transcriber = VoskTranscriber(**callbacks)
+        transcriber.connect()
+
+        transcriber.stream([b'\x00\x00'])
+
+        callbacks['on_error'].assert_called_once()
+
+
+class TestCreateTranscriber:
+    """Test cases for create_transcriber"""
+
+    def test_assemblyai(self, callbacks, mock_realtime_transcriber):
+        assert isinstance(create_transcriber("assemblyai", **callbacks), AssemblyAITranscriber)
+
+    def test_local(self, callbacks, mock_vosk):
+        assert isinstance(create_transcriber("local", **callbacks), VoskTranscriber)
+
+    def test_unknown_backend(self, callbacks):
+        with pytest.raises(ValueError, match="Unknown transcription backend"):
+            create_transcriber("whisper", **callbacks)
+
+
+class FakeSession:
+    """Backend that records the audio it receives and can be told to fail"""
+
+    def __init__(self, on_data, on_error, on_open, on_close, sample_rate,
+                 fail_after=None, fail_connect=False, final_after=None, close_after=None, raise_after=None):
+        self.on_data = on_data
+        self.on_error = on_error
+        self.on_close = on_close
+        self.fail_after = fail_after
+        self.close_after = close_after
+        self.raise_after = raise_after
+        self.final_after = final_after
+        self.fail_connect = fail_connect
+        self.received = []
+        self.closed = False
+
+    def connect(self):
+        if self.fail_connect:
+            self.on_error(ConnectionError("refused"))
+
+    def stream(self, audio):
+        for chunk in audio:
+            self.received.append(chunk)
+            if len(self.received) == self.final_after:
+                self.on_data(Transcript(text="ahoy", is_final=True))
+            if self.fail_after is not None and len(self.received) >= self.fail_after:
+                self.on_error(ConnectionError("dropped"))
+            if len(self.received) == self.close_after:
+                # The server closes the session without an error, e.g. an idle timeout
+                self.on_close()
+                return
+            if len(self.received) == self.raise_after:
+                raise ConnectionError("socket closed")
+
+    def force_end_utterance(self):
+        pass
+
+    def close(self):
+        self.closed = True
+        self.on_close()
+
+
+@pytest.fixture
+def session_factory():
+    """Factory that hands out FakeSessions configured from a script, one per session"""
+    sessions = []
+    script = []
+
+    def factory(**kwargs):
+        options = script.pop(0) if script else {}
+        session = FakeSession(**kwargs, **options)
+        sessions.append(session)
+        return session
+
+    factory.sessions = sessions
+    factory.script = script
+    return factory
+
+
+def supervised(session_factory, callbacks, **kwargs):
+    supervisor = SupervisedTranscriber(session_factory, **callbacks, initial_backoff=0.01, **kwargs)
+    supervisor.connect()
+    return supervisor
+
+
+class TestSupervisedTranscriber:
+    """Test cases for SupervisedTranscriber class"""
+
+    def test_streams_without_failures(self, session_factory, callbacks):
+        """Test that audio passes straight through a healthy session"""
+        supervisor = supervised(session_factory, callbacks)
+        supervisor.stream([b'a', b'b', b'c'])
+
+        assert len(session_factory.sessions) == 1
+        assert session_factory.sessions[0].received == [b'a', b'b', b'c']
+        assert supervisor.reconnects == 0
+
+    def test_reconnects_and_replays_audio(self, session_factory, callbacks):
+        """Test that a dropped session is replaced and hears the unfinished utterance again"""
+        session_factory.script.append({'fail_after': 2})
+        supervisor = supervised(session_factory, callbacks)
+        supervisor.stream([b'a', b'b', b'c', b'd'])
+
+        first, second = session_factory.sessions
+        assert first.received == [b'a', b'b']
+        assert second.received == [b'a', b'b', b'c', b'd']
+        assert supervisor.reconnects == 1
+        assert supervisor.outage_seconds > 0
+        callbacks['on_error'].assert_called_once()
+
+    def test_final_transcript_clears_replay(self, session_factory, callbacks):
+        """Test that audio already transcribed is not replayed"""
+        session_factory.script.append({'final_after': 2, 'fail_after': 3})
+        supervisor = supervised(session_factory, callbacks)
+        supervisor.stream([b'a', b'b', b'c', b'd'])
+
+        assert session_factory.sessions[1].received == [b'c', b'd']
+        callbacks['on_data'].assert_called_once_with(Transcript(text="ahoy", is_final=True))
+
+    def test_replay_is_bounded(self, session_factory, callbacks):
+        """Test that only the most recent audio is kept for replay"""
+        session_factory.script.append({'fail_after': 4})
+        supervisor = supervised(session_factory, callbacks, sample_rate=2, replay_seconds=1)
+        supervisor.stream([b'1111', b'2222', b'3333', b'4444'])
+
+        assert session_factory.sessions[1].received == [b'4444']
+
+    def test_retries_failed_connects(self, session_factory, callbacks):
+        """Test that connection attempts are retried until one succeeds"""
+        session_factory.script.extend([{'fail_after': 1}, {'fail_connect': True}])
+        supervisor = supervised(session_factory, callbacks)
+        supervisor.stream([b'a', b'b'])
+
+        assert len(session_factory.sessions) == 3
+        assert session_factory.sessions[2].received == [b'a', b'b']
+        assert supervisor.reconnects == 1
+        assert supervisor.stats()['reconnects'] == 1
+
+    def test_reconnects_after_server_close(self, session_factory, callbacks):
+        """Test that a session closed by the server without an error is replaced"""
+        session_factory.script.append({'close_after': 2})
+        supervisor = supervised(session_factory, callbacks)
+        supervisor.stream([b'a', b'b', b'c'])
+
+        first, second = session_factory.sessions
+        assert first.received == [b'a', b'b']
+        assert second.received == [b'a', b'b', b'c']
+        assert supervisor.reconnects == 1
+        callbacks['on_close'].assert_not_called()
+
+    def test_reconnects_after_stream_raises(self, session_factory, callbacks):
+        """Test that an exception from the session's stream is handled like an error"""
+        session_factory.script.append({'raise_after': 1})
+        supervisor = supervised(session_factory, callbacks)
+        supervisor.stream([b'a', b'b'])
+
+        assert session_factory.sessions[1].received == [b'a', b'b']
+        assert supervisor.reconnects == 1
+        callbacks['on_error'].assert_called_once()
+
+    def test_backoff_grows_to_limit(self, session_factory, callbacks):
+        """Test that the reconnect delay doubles and is capped"""
+        supervisor = SupervisedTranscriber(session_factory, **callbacks, initial_backoff=1, max_backoff=4)
+
+        assert 0.5 <= supervisor._backoff(0) <= 1
+        assert 1 <= supervisor._backoff(1) <= 2
+        assert 2 <= supervisor._backoff(5) <= 4
+
+    def test_close_closes_session(self, session_factory, callbacks):
+        """Test that closing the supervisor closes the live session"""
+        supervisor = supervised(session_factory, callbacks)
+        supervisor.close()
+
+        assert session_factory.sessions[0].closed
+        callbacks['on_close'].assert_called_once()
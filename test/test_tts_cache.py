@@ -0,0 +1,112 @@
+import os
+import threading
+
+import pytest
+
+from agenticanimatronics.tts_cache import TTSCache
+
+SETTINGS = {"stability": 0.5, "similarity_boost": 0.75}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TTSCache(str(tmp_path / "tts"), max_bytes=100, read_chunk_size=4)
+
+
+class TestTTSCache:
+    """Test cases for TTSCache class"""
+
+    def test_key_ignores_whitespace(self):
+        """Test that the same line with different spacing shares a key"""
+        assert TTSCache.key("voice", "Arr,  matey!\n", "model", "mp3", SETTINGS) == \
+               TTSCache.key("voice", "Arr, matey!", "model", "mp3", SETTINGS)
+
+    @pytest.mark.parametrize("changed", [
+        ("other voice", "Arr, matey!", "model", "mp3", SETTINGS),
+        ("voice", "Arr, matey?", "model", "mp3", SETTINGS),
+        ("voice", "Arr, matey!", "other model", "mp3", SETTINGS),
+        ("voice", "Arr, matey!", "model", "pcm_16000", SETTINGS),
+        ("voice", "Arr, matey!", "model", "mp3", {**SETTINGS, "stability": 0.9}),
+    ])
+    def test_key_covers_everything_that_changes_audio(self, changed):
+        """Test that the voice, text, model, format and settings all change the key"""
+        assert TTSCache.key(*changed) != TTSCache.key("voice", "Arr, matey!", "model", "mp3", SETTINGS)
+
+    def test_miss_then_hit(self, cache):
+        """Test that stored audio is served back and counted"""
+        assert cache.get("line") is None
+
+        cache.put("line", b"audio")
+
+        assert cache.get("line") == b"audio"
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+        assert cache.hit_rate == 0.5
+        assert cache.bytes_saved == 5
+
+    def test_record_caches_complete_streams(self, cache):
+        """Test that a live stream is passed through and cached once read to the end"""
+        assert list(cache.record("line", [b"ab", b"cd"])) == [b"ab", b"cd"]
+        assert cache.get("line") == b"abcd"
+
+    def test_record_skips_abandoned_streams(self, cache):
+        """Test that a stream cut off part way is not cached"""
+        stream = cache.record("line", [b"ab", b"cd"])
+        next(stream)
+        stream.close()
+
+        assert cache.get("line") is None
+
+    def test_stream_chunks_cached_audio(self, cache):
+        """Test that cached audio is played back in chunks"""
+        assert list(cache.stream(b"0123456789")) == [b"0123", b"4567", b"89"]
+
+    def test_least_recently_used_is_evicted(self, cache):
+        """Test that the cache is trimmed to its size limit, keeping recently used lines"""
+        cache.put("a", b"x" * 40)
+        cache.put("b", b"x" * 40)
+        cache.get("a")
+        cache.put("c", b"x" * 40)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.size_bytes <= 100
+
+    def test_index_survives_restart(self, cache):
+        """Test that a new cache over the same folder finds the existing audio"""
+        cache.put("line", b"audio")
+
+        reopened = TTSCache(cache.directory)
+
+        assert reopened.get("line") == b"audio"
+        assert reopened.size_bytes == 5
+
+    def test_no_temporary_files_left(self, cache):
+        """Test that writes leave only complete entries behind"""
+        cache.put("line", b"audio")
+
+        assert os.listdir(cache.directory) == ["line.audio"]
+
+    def test_concurrent_readers_and_writers(self, cache):
+        """Test that readers only ever see complete audio while it is being rewritten"""
+        cache.put("line", b"A" * 50)
+        seen = set()
+
+        def write():
+            for i in range(200):
+                cache.put("line", (b"A" if i % 2 else b"B") * 50)
+
+        def read():
+            for _ in range(200):
+                audio = cache.get("line")
+                if audio is not None:
+                    seen.add(audio)
+
+        threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert seen <= {b"A" * 50, b"B" * 50}
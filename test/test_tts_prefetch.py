@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+
+from agenticanimatronics.tts_prefetch import TTSPrefetcher
+
+
+class SlowSynthesizer:
+    """Synthesizer with a per-text delay that records how many requests overlap"""
+
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.active = 0
+        self.max_active = 0
+        self.requested = []
+        self.lock = threading.Lock()
+
+    def __call__(self, text):
+        with self.lock:
+            self.requested.append(text)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delays.get(text, 0.01))
+            if text == "fail":
+                return None
+            return [f"{text}-1".encode(), f"{text}-2".encode()]
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def synthesizer():
+    return SlowSynthesizer(delays={"one": 0.2, "two": 0.01, "three": 0.05})
+
+
+@pytest.fixture
+def prefetcher(synthesizer):
+    prefetcher = TTSPrefetcher(synthesizer, lookahead=3)
+    yield prefetcher
+    prefetcher.close()
+
+
+class TestTTSPrefetcher:
+    """Test cases for TTSPrefetcher class"""
+
+    def test_audio_is_played_in_order(self, prefetcher):
+        """Test that audio comes out in segment order even when later segments finish first"""
+        audio = list(prefetcher.audio(["one", "two", "three"]))
+
+        assert audio == [b"one-1", b"one-2", b"two-1", b"two-2", b"three-1", b"three-2"]
+
+    def test_segments_are_synthesized_in_parallel(self, prefetcher, synthesizer):
+        """Test that upcoming segments are requested while the first is still synthesizing"""
+        start = time.perf_counter()
+        list(prefetcher.audio(["one", "two", "three"]))
+
+        assert synthesizer.max_active > 1
+        assert time.perf_counter() - start < 0.2 + 0.01 + 0.05
+
+    def test_lookahead_is_bounded(self, synthesizer):
+        """Test that no more than lookahead segments are in flight"""
+        prefetcher = TTSPrefetcher(synthesizer, lookahead=2)
+        list(prefetcher.audio(["a", "b", "c", "d", "e"]))
+        prefetcher.close()
+
+        assert synthesizer.max_active <= 2
+
+    def test_on_segment_marks_each_segment(self, prefetcher):
+        """Test that each segment is announced just before its audio"""
+        events = []
+        for chunk in prefetcher.audio(["one", "two"], on_segment=events.append):
+            events.append(chunk)
+
+        assert events == ["one", b"one-1", b"one-2", "two", b"two-1", b"two-2"]
+
+    def test_failed_segment_is_skipped(self, prefetcher):
+        """Test that a segment with no audio does not stop the ones after it"""
+        assert list(prefetcher.audio(["fail", "two"])) == [b"two-1", b"two-2"]
+
+    def test_closing_the_turn_cancels_queued_segments(self, synthesizer):
+        """Test that abandoning playback cancels syntheses that have not started"""
+        prefetcher = TTSPrefetcher(synthesizer, lookahead=1)
+        audio = prefetcher.audio(["one", "two", "three", "four"])
+        next(audio)
+        audio.close()
+        time.sleep(0.3)
+        prefetcher.close()
+
+        assert "four" not in synthesizer.requested
+
+    def test_cancel_stops_playback(self, prefetcher):
+        """Test that cancelling ends the current turn's audio"""
+        audio = prefetcher.audio(["one", "two", "three"])
+        assert next(audio) == b"one-1"
+        prefetcher.cancel()
+
+        assert list(audio) == []
+
+    def test_segment_errors_are_raised(self, prefetcher):
+        """Test that an error reading the segments reaches the consumer"""
+        def segments():
+            yield "two"
+            raise ConnectionError("stream dropped")
+
+        audio = prefetcher.audio(segments())
+        with pytest.raises(ConnectionError):
+            list(audio)
@@ -0,0 +1,90 @@
+import pytest
+
+from agenticanimatronics.uplink import UplinkStream
+
+
+# 50 ms chunks at 1 kHz keep the byte counts small: 50 samples, 100 bytes
+SAMPLE_RATE = 1000
+SILENCE = b'\x00' * 100
+SPEECH = b'\x01\x02' * 50
+
+
+def make_uplink(chunks, **kwargs):
+    kwargs.setdefault("sample_rate", SAMPLE_RATE)
+    kwargs.setdefault("frame_ms", 100)
+    kwargs.setdefault("trailing_silence_ms", 200)
+    kwargs.setdefault("keepalive_ms", 1000)
+    return UplinkStream(chunks, **kwargs)
+
+
+class TestUplinkStream:
+    """Test cases for UplinkStream class"""
+
+    @pytest.mark.parametrize("chunk,expected", [
+        (SILENCE, True),
+        (SPEECH, False),
+        (b'\x00' * 99 + b'\x01', False),
+        (b'', True),
+    ])
+    def test_is_silent(self, chunk, expected):
+        """Test detection of all-zero chunks"""
+        assert UplinkStream.is_silent(chunk) is expected
+
+    def test_batches_chunks_into_frames(self):
+        """Test that 50 ms chunks are combined into 100 ms frames"""
+        uplink = make_uplink([SPEECH] * 4)
+
+        frames = list(uplink)
+
+        assert frames == [SPEECH * 2, SPEECH * 2]
+        assert uplink.frames_sent == 2
+        assert uplink.bytes_sent == 400
+
+    def test_startup_silence_is_suppressed(self):
+        """Test that silence before anyone speaks is not sent"""
+        uplink = make_uplink([SILENCE] * 10)
+
+        assert list(uplink) == []
+        assert uplink.chunks_suppressed == 10
+        assert uplink.bytes_in == 1000
+        assert uplink.stats()["bytes_saved_pct"] == 100.0
+
+    def test_trailing_silence_is_sent(self):
+        """Test that silence right after speech is sent so the server can end the utterance"""
+        uplink = make_uplink([SPEECH, SPEECH] + [SILENCE] * 8)
+
+        frames = list(uplink)
+
+        assert b''.join(frames) == SPEECH * 2 + SILENCE * 4
+        assert uplink.chunks_suppressed == 4
+
+    def test_partial_frame_flushed_when_suppression_starts(self):
+        """Test that a half-built frame is not held back while silence is suppressed"""
+        uplink = make_uplink([SPEECH] + [SILENCE] * 6, frame_ms=400)
+
+        frames = list(uplink)
+
+        assert frames == [SPEECH + SILENCE * 4]
+
+    def test_keepalive_during_long_silence(self):
+        """Test that a keep-alive frame is sent after a long run of suppressed silence"""
+        uplink = make_uplink([SILENCE] * 45)
+
+        frames = list(uplink)
+
+        assert frames == [SILENCE, SILENCE]
+        assert uplink.keepalives_sent == 2
+
+    def test_speech_resumes_after_suppression(self):
+        """Test that speech is sent immediately once it returns"""
+        uplink = make_uplink([SILENCE] * 5 + [SPEECH, SPEECH])
+
+        assert list(uplink) == [SPEECH * 2]
+
+    def test_stats_with_no_audio(self):
+        """Test stats before any audio has been seen"""
+        uplink = make_uplink([])
+
+        assert list(uplink) == []
+        assert uplink.stats()["bytes_saved_pct"] == 0.0
+        uplink.log_stats()
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from agenticanimatronics.voice_activity import VoiceActivityDetector
+
+
+CHUNK_SIZE = 800
+
+
+def tone(level, chunk_size=CHUNK_SIZE):
+    """A 200 Hz sine chunk with the given peak level"""
+    t = np.arange(chunk_size) / 16000
+    return (level * np.sin(2 * np.pi * 200 * t)).astype(np.int16).tobytes()
+
+
+def noise(level, chunk_size=CHUNK_SIZE, seed=0):
+    """A white noise chunk with roughly the given RMS level"""
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(chunk_size) * level).astype(np.int16).tobytes()
+
+
+@pytest.fixture
+def vad():
+    """Fixture that creates a VoiceActivityDetector with a two-chunk hangover"""
+    return VoiceActivityDetector(sample_rate=16000, chunk_size=CHUNK_SIZE, threshold=200, hangover_ms=100)
+
+
+class TestVoiceActivityDetector:
+    """Test cases for VoiceActivityDetector class"""
+
+    def test_silence_is_not_speech(self, vad):
+        """Test that digital silence is never speech"""
+        assert vad.process(b'\x00' * CHUNK_SIZE * 2) is False
+        assert vad.rms == 0.0
+
+    def test_loud_tone_is_speech(self, vad):
+        """Test that a tone well above the threshold is speech"""
+        assert vad.process(tone(3000)) is True
+
+    def test_features(self, vad):
+        """Test RMS and zero-crossing features"""
+        vad.process(tone(1000))
+
+        assert vad.rms == pytest.approx(1000 / np.sqrt(2), rel=0.01)
+        # 200 Hz crosses zero 400 times a second, 20 times in 50 ms
+        assert vad.zcr == pytest.approx(20 / CHUNK_SIZE, abs=2 / CHUNK_SIZE)
+
+    def test_hangover(self, vad):
+        """Test that speech stays open for the hangover after the last voiced chunk"""
+        silence = b'\x00' * CHUNK_SIZE * 2
+
+        assert vad.process(tone(3000)) is True
+        assert vad.process(silence) is True
+        assert vad.process(silence) is True
+        assert vad.process(silence) is False
+
+    def test_hangover_restarts_on_voiced_chunk(self, vad):
+        """Test that a voiced chunk during the hangover keeps speech open"""
+        silence = b'\x00' * CHUNK_SIZE * 2
+
+        vad.process(tone(3000))
+        vad.process(silence)
+        vad.process(tone(3000))
+        assert vad.process(silence) is True
+        assert vad.process(silence) is True
+
+    def test_quiet_fricative_counts_as_speech(self, vad):
+        """Test that a quiet but noisy chunk is picked up by the zero-crossing rate"""
+        assert vad.process(noise(150)) is True
+        assert vad.zcr > vad.fricative_zcr
+
+    def test_noise_floor_raises_threshold(self, vad):
+        """Test that the threshold recalibrates to a loud room"""
+        for seed in range(300):
+            vad.process(noise(60, seed=seed))
+        # Quiet room: a 400 RMS tone is speech
+        assert vad.adaptive_threshold < 400
+
+        vad.reset()
+        for seed in range(300):
+            vad.process(tone(400 + seed % 2))
+        # Loud room: the same tone has become the background
+        assert vad.adaptive_threshold > 300
+        vad.reset()
+        assert vad.process(tone(400)) is False
+
+    def test_threshold_is_a_floor(self, vad):
+        """Test that the adaptive threshold never drops below the configured threshold"""
+        silence = b'\x00' * CHUNK_SIZE * 2
+        for _ in range(100):
+            vad.process(silence)
+
+        assert vad.noise_floor < 1
+        assert vad.adaptive_threshold == vad.threshold
+
+    def test_larger_chunk_than_expected(self, vad):
+        """Test that chunks larger than the preallocated buffer are handled"""
+        assert vad.process(tone(3000, chunk_size=CHUNK_SIZE * 2)) is True
+
+    def test_reset(self, vad):
+        """Test that reset closes the speech segment"""
+        vad.process(tone(3000))
+        vad.reset()
+        assert vad.is_speech is False